@@ -1,17 +1,31 @@
 import os
+import time
+import atexit
+import threading
 import logging
 import json
-from flask import Flask, render_template, request, redirect, url_for, flash, make_response
+import base64
+import click
+from datetime import date, timedelta
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, Response, stream_with_context
 from werkzeug.middleware.proxy_fix import ProxyFix
-import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
 
 # Import from your actual project files
 from database import DatabaseManager
-from scraper import get_scraper
-from sample_data import CASE_TYPES, MOCK_CASES
+from scraper import get_scraper, get_site_guard, make_case_key, split_case_key, load_backends, BACKEND_MODULES
+from site_guard import SITE_UNAVAILABLE_ERROR
+from cache import CaseCache
+from audit_log import BufferedAuditLogger
+from coalescing import SingleFlight
+from jobs import JobManager, JobQueueFull
+from batch import parse_case_list, run_batch, DEFAULT_WORKERS
+from pdf_renderer import PdfCache, order_history, load_reportlab
+from pdf_export import PdfExporter, ExportBusy, PDF_EXPORT_MAX_CASES
+from case_parser import CASE_FIELDS
+from watchlist import WatchlistScheduler
+from retention import RetentionManager
+import metrics
+from sample_data import CASE_TYPES, MOCK_CASE_STORE
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,17 +35,166 @@ app.secret_key = os.environ.get("SESSION_SECRET", "a-strong-dev-secret-key")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
 db_manager = DatabaseManager()
-db_manager.initialize_database()
+_db_ready = False
+_db_ready_lock = threading.Lock()
+
+def ensure_database():
+    """Creates and migrates the database once per process, on first use rather than at import."""
+    global _db_ready
+    if _db_ready:
+        return
+    with _db_ready_lock:
+        if not _db_ready:
+            db_manager.initialize_database()
+            _db_ready = True
+
+@app.before_request
+def before_request():
+    ensure_database()
+
+# Selenium, the CAPTCHA solver, the HTML parsers and ReportLab are imported on
+# first use. For a prefork server (gunicorn --preload) list the ones to import
+# in the master instead, so workers start warm and share the loaded pages:
+# comma-separated names from BACKEND_MODULES plus "pdf", or "all".
+PRELOAD_BACKENDS = [name.strip() for name in os.environ.get("PRELOAD_BACKENDS", "").split(',') if name.strip()]
+
+def preload_backends(names):
+    """Imports the named heavy backends now; returns the modules loaded."""
+    if 'all' in names:
+        names = list(BACKEND_MODULES) + ['pdf']
+    loaded = load_backends(names)
+    if 'pdf' in names:
+        load_reportlab()
+        loaded.append('reportlab')
+    return loaded
+
+if PRELOAD_BACKENDS:
+    logger.info(f"Preloaded backends: {', '.join(preload_backends(PRELOAD_BACKENDS))}")
+
+# Audit logging of queries/responses: 'direct' writes synchronously on the request
+# path, 'async' and 'group' go through the write-behind BufferedAuditLogger.
+AUDIT_LOG_MODE = os.environ.get("AUDIT_LOG_MODE", "direct")
+if AUDIT_LOG_MODE == 'direct':
+    audit_log = db_manager
+else:
+    audit_log = BufferedAuditLogger(db_manager, crash_safety=AUDIT_LOG_MODE)
+    atexit.register(audit_log.close)
+
+# Two-tier (in-process LRU + SQLite) cache in front of the scraper
+case_cache = CaseCache(db_manager, max_entries=int(os.environ.get("CASE_CACHE_SIZE", "1024")))
+# Concurrent lookups of the same case share one scrape
+scrape_flight = SingleFlight()
+# Rendered case PDFs, cached on disk per case version
+pdf_cache = PdfCache()
+# Bulk ZIP export of case PDFs, rendered on a process pool
+pdf_exporter = PdfExporter(pdf_cache, lambda case_key: load_case_document(case_key))
+atexit.register(pdf_exporter.close)
 
 # --- This is the main switch for your application ---
 # Set to True to use your reliable mock data (for development and demonstration)
 # Set to False to attempt a live scrape against the real court website
 USE_MOCK_SCRAPER = True 
 
+def scrape_case(case_type, case_number, filing_year):
+    """Scrapes a case, sharing the scrape with concurrent lookups of the same case."""
+    def scrape():
+        # The get_scraper function will now return either the MockScraper or the DelhiHighCourtScraper
+        # based on the USE_MOCK_SCRAPER flag above.
+        scraper = get_scraper(use_mock=USE_MOCK_SCRAPER)
+        return scraper.search_case(
+            case_type=case_type, 
+            case_number=case_number, 
+            filing_year=filing_year
+        )
+    return scrape_flight.do(make_case_key(case_type, case_number, filing_year), scrape)
+
+def lookup_case(query_id, case_type, case_number, filing_year, audit=None):
+    """
+    Resolves a logged query through the cache and the scraper and logs the response
+    to `audit` (the configured audit log by default).
+    Returns the scraper's (success, case_data, error_message) tuple.
+    """
+    audit = audit or audit_log
+    started = time.perf_counter()
+    with metrics.span('lookup'):
+        success, case_data, error_message, source = case_cache.get_or_fetch(
+            case_type, case_number, filing_year, lambda: scrape_case(case_type, case_number, filing_year)
+        )
+    latency_ms = int((time.perf_counter() - started) * 1000)
+
+    if not success and error_message == SITE_UNAVAILABLE_ERROR:
+        # The circuit breaker is open: answer with the last saved copy if there is one
+        entry = case_cache.last_known(case_type, case_number, filing_year)
+        if entry is not None:
+            logger.warning(f"Court site unavailable; serving saved copy of {case_type}/{case_number}/{filing_year}")
+            success, case_data, error_message, source = True, entry.data, '', 'fallback'
+    
+    if source == 'live':
+        audit.log_response(
+            query_id=query_id,
+            response_data=case_data,
+            status='success' if success else 'failed',
+            error_message=error_message if not success else None,
+            raw_response=json.dumps(case_data) if case_data else None,
+            latency_ms=latency_ms,
+            case_key=make_case_key(case_type, case_number, filing_year)
+        )
+    else:
+        # Cache hits are audited without refreshing the persistent cache tier
+        audit.log_response(
+            query_id=query_id,
+            response_data=case_data,
+            status='cached',
+            error_message=error_message if not success else None,
+            latency_ms=latency_ms
+        )
+    return success, case_data, error_message
+
+# Background scrape jobs polled through /jobs/<id>
+# Job results are read back from the responses table, so jobs log synchronously.
+job_manager = JobManager(
+    db_manager,
+    lambda *args: lookup_case(*args, audit=db_manager),
+    max_workers=int(os.environ.get("SCRAPE_JOB_WORKERS", "4")),
+    max_pending=int(os.environ.get("SCRAPE_JOB_MAX_PENDING", "100"))
+)
+
+def record_watch_update(watch, case_data):
+    """Stores a changed tracked case like a search result and refreshes the cache."""
+    query_id = db_manager.log_query(
+        watch['case_type'], watch['case_number'], watch['filing_year'], user_agent='watchlist'
+    )
+    db_manager.log_response(query_id=query_id, response_data=case_data, status='success', case_key=watch['case_key'])
+    case_cache.put(watch['case_key'], True, case_data, '')
+
+# Scheduled refresh of tracked cases; bypasses the cache so changes are seen
+watchlist = WatchlistScheduler(db_manager, scrape_case, on_change=record_watch_update)
+if os.environ.get("WATCHLIST_SCHEDULER", "False").lower() == 'true':
+    ensure_database()
+    watchlist.start(poll_interval=int(os.environ.get("WATCHLIST_POLL_SECONDS", "60")))
+    atexit.register(watchlist.stop)
+
+# Compression, archival and incremental VACUUM of the response log
+retention = RetentionManager(db_manager)
+if os.environ.get("RETENTION_SCHEDULER", "False").lower() == 'true':
+    ensure_database()
+    retention.start(interval=int(os.environ.get("RETENTION_INTERVAL_SECONDS", "86400")))
+    atexit.register(retention.stop)
+
 @app.route('/')
 def index():
-    """Renders the main page with the case search form."""
-    return render_template('index.html', case_types=CASE_TYPES, mock_cases=MOCK_CASES)
+    """Renders the main page with the case search form and sample cases, optionally filtered."""
+    filters = {
+        'case_type': request.args.get('sample_type') or None,
+        'judge_name': request.args.get('sample_judge') or None,
+        'court_hall': request.args.get('sample_hall') or None,
+        'filing_year': request.args.get('sample_year', type=int),
+    }
+    sample_cases = dict(MOCK_CASE_STORE.find(limit=8, **filters))
+    return render_template(
+        'index.html', case_types=CASE_TYPES, mock_cases=sample_cases, sample_filters=filters,
+        judges=MOCK_CASE_STORE.values_of('judge_name'), court_halls=MOCK_CASE_STORE.values_of('court_hall')
+    )
 
 @app.route('/search', methods=['POST'])
 def search_case():
@@ -45,7 +208,7 @@ def search_case():
             flash('All fields (case type, case number, filing year) are required.', 'warning')
             return redirect(url_for('index'))
 
-        query_id = db_manager.log_query(
+        query_id = audit_log.log_query(
             case_type=case_type,
             case_number=case_number,
             filing_year=filing_year,
@@ -53,23 +216,7 @@ def search_case():
             user_agent=request.headers.get('User-Agent', '')
         )
         
-        # The get_scraper function will now return either the MockScraper or the DelhiHighCourtScraper
-        # based on the USE_MOCK_SCRAPER flag above.
-        scraper = get_scraper(use_mock=USE_MOCK_SCRAPER)
-        
-        success, case_data, error_message = scraper.search_case(
-            case_type=case_type, 
-            case_number=case_number, 
-            filing_year=filing_year
-        )
-        
-        db_manager.log_response(
-            query_id=query_id,
-            response_data=case_data,
-            status='success' if success else 'failed',
-            error_message=error_message if not success else None,
-            raw_response=json.dumps(case_data) if case_data else None
-        )
+        success, case_data, error_message = lookup_case(query_id, case_type, case_number, filing_year)
         
         if success:
             return render_template('results.html', case_data=case_data)
@@ -82,55 +229,415 @@ def search_case():
         flash('An internal server error occurred. Please try again later.', 'danger')
         return redirect(url_for('index'))
 
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queues a case lookup and returns the job ID to poll."""
+    payload = request.get_json(silent=True) or request.form
+    case_type = str(payload.get('case_type', '')).strip()
+    case_number = str(payload.get('case_number', '')).strip()
+    filing_year = str(payload.get('filing_year', '')).strip()
+
+    if not all([case_type, case_number, filing_year]):
+        return jsonify({'error': 'All fields (case type, case number, filing year) are required.'}), 400
+
+    try:
+        job_id = job_manager.submit(
+            case_type, case_number, filing_year,
+            ip_address=request.remote_addr,
+            user_agent=request.headers.get('User-Agent', '')
+        )
+    except JobQueueFull:
+        return jsonify({'error': 'Too many lookups in progress. Please try again later.'}), 503
+
+    response = jsonify({'job_id': job_id, 'status': 'queued'})
+    response.status_code = 202
+    response.headers['Location'] = url_for('get_job', job_id=job_id)
+    return response
+
+@app.route('/jobs/<int:job_id>')
+def get_job(job_id):
+    """Returns a job's status, and its result once it has finished."""
+    job = db_manager.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found.'}), 404
+
+    body = {
+        'job_id': job['id'],
+        'status': job['status'],
+        'case_type': job['case_type'],
+        'case_number': job['case_number'],
+        'filing_year': job['filing_year'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at'],
+    }
+    if job['status'] == 'succeeded':
+        body['result'] = json.loads(job['parsed_data']) if job['parsed_data'] else None
+    elif job['status'] == 'failed':
+        body['error'] = job['error_message']
+    return jsonify(body)
+
+@app.route('/batch', methods=['POST'])
+def batch_lookup():
+    """Looks up a CSV/JSONL case list and streams the results back as NDJSON."""
+    try:
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict):
+            cases = parse_case_list('\n'.join(json.dumps(case) for case in payload.get('cases', [])), 'jsonl')
+        else:
+            fmt = 'csv' if request.mimetype == 'text/csv' else None
+            cases = parse_case_list(request.get_data(as_text=True), fmt)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid case list: {e}'}), 400
+
+    if not cases:
+        return jsonify({'error': 'The case list is empty.'}), 400
+
+    records = run_batch(
+        cases, db_manager, case_cache, lookup_case,
+        workers=request.args.get('workers', DEFAULT_WORKERS, type=int),
+        batch_id=request.args.get('batch_id')
+    )
+    return Response(
+        stream_with_context(json.dumps(record) + '\n' for record in records),
+        mimetype='application/x-ndjson'
+    )
+
+@app.route('/cases/search')
+def search_stored_cases():
+    """Full-text search over stored case data, paginated with an opaque cursor."""
+    text = request.args.get('q', '').strip()
+    if not text:
+        return jsonify({'error': 'The q parameter is required.'}), 400
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            score, _, row_id = cursor.partition(':')
+            after = (float(score), int(row_id))
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor.'}), 400
+
+    rows = db_manager.search_cases_fulltext(text, limit=limit, after=after)
+    results = [{
+        'case_key': row['case_key'],
+        'case_title': row['case_title'],
+        'case_type': row['case_type'],
+        'case_number': row['case_number'],
+        'petitioner_name': row['petitioner_name'],
+        'respondent_name': row['respondent_name'],
+        'judge_name': row['judge_name'],
+        'court_hall': row['court_hall'],
+        'case_status': row['case_status'],
+        'next_hearing_date': row['next_hearing_date'],
+        'snippet': row['snippet'],
+        'score': row['score'],
+    } for row in rows]
+
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = f"{rows[-1]['score']!r}:{rows[-1]['id']}"
+    return jsonify({'results': results, 'next_cursor': next_cursor})
+
+# Hearing calendar: widest range one request may cover, and how long clients may cache a page
+CALENDAR_MAX_DAYS = int(os.environ.get("CALENDAR_MAX_DAYS", "92"))
+CALENDAR_MAX_AGE = int(os.environ.get("CALENDAR_MAX_AGE", "60"))
+
+def parse_calendar_range():
+    """
+    (start, end, court_hall) ISO strings from the from/to (or date) and
+    court_hall query parameters; defaults to the coming week. Raises ValueError.
+    """
+    day = request.args.get('date')
+    start = date.fromisoformat(day or request.args.get('from') or date.today().isoformat())
+    end = start if day else date.fromisoformat(request.args.get('to') or (start + timedelta(days=6)).isoformat())
+    if end < start:
+        raise ValueError("to is before from")
+    if (end - start).days >= CALENDAR_MAX_DAYS:
+        raise ValueError(f"at most {CALENDAR_MAX_DAYS} days per request")
+    return start.isoformat(), end.isoformat(), request.args.get('court_hall') or None
+
+def cacheable_json(payload):
+    """JSON response with an ETag and Cache-Control, answered with 304 when the client's copy is current."""
+    response = jsonify(payload)
+    response.add_etag()
+    response.cache_control.public = True
+    response.cache_control.max_age = CALENDAR_MAX_AGE
+    return response.make_conditional(request)
+
+@app.route('/calendar')
+def hearing_calendar():
+    """
+    Cause list: stored cases by next hearing date and court hall, for one day
+    (?date=) or a range (?from=&to=), optionally one court hall. Paginated with
+    an opaque cursor; a day or hall can continue on the next page.
+    """
+    try:
+        start, end, court_hall = parse_calendar_range()
+    except ValueError as e:
+        return jsonify({'error': f"Invalid date range: {e}"}), 400
+    limit = max(1, min(request.args.get('limit', 100, type=int), 500))
+
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            after = tuple(json.loads(base64.urlsafe_b64decode(cursor.encode())))
+            if len(after) != 3:
+                raise ValueError(cursor)
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor.'}), 400
+
+    rows = db_manager.get_hearing_calendar(start, end, court_hall=court_hall, limit=limit, after=after)
+    days = []
+    for row in rows:
+        if not days or days[-1]['date'] != row['next_hearing_on']:
+            days.append({'date': row['next_hearing_on'], 'court_halls': []})
+        halls = days[-1]['court_halls']
+        if not halls or halls[-1]['court_hall'] != row['court_hall']:
+            halls.append({'court_hall': row['court_hall'], 'cases': []})
+        halls[-1]['cases'].append({
+            'case_key': row['case_key'],
+            'case_type': row['case_type'],
+            'case_number': row['case_number'],
+            'case_title': row['case_title'],
+            'petitioner_name': row['petitioner_name'],
+            'respondent_name': row['respondent_name'],
+            'judge_name': row['judge_name'],
+            'case_status': row['case_status'],
+            'next_hearing_date': row['next_hearing_date'],
+        })
+
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = base64.urlsafe_b64encode(
+            json.dumps([last['next_hearing_on'], last['court_hall'], last['id']]).encode()
+        ).decode()
+    return cacheable_json({'from': start, 'to': end, 'court_hall': court_hall, 'days': days, 'next_cursor': next_cursor})
+
+@app.route('/calendar/summary')
+def hearing_calendar_summary():
+    """Number of hearings per day and court hall over the /calendar range."""
+    try:
+        start, end, court_hall = parse_calendar_range()
+    except ValueError as e:
+        return jsonify({'error': f"Invalid date range: {e}"}), 400
+    days = {}
+    for row in db_manager.count_hearings(start, end, court_hall=court_hall):
+        day = days.setdefault(row['next_hearing_on'], {'date': row['next_hearing_on'], 'total': 0, 'court_halls': {}})
+        day['court_halls'][row['court_hall']] = row['count']
+        day['total'] += row['count']
+    return cacheable_json({'from': start, 'to': end, 'court_hall': court_hall, 'days': list(days.values())})
+
+def load_case_document(case_key):
+    """
+    Load what a case PDF is rendered from: returns (case_key, case_data, history)
+    for a stored (or mock) case, or None if the case is unknown.
+    """
+    parts = split_case_key(case_key)
+    if parts is None:
+        return None
+    case_key = make_case_key(*parts)
+    row = db_manager.get_latest_case_data(case_key)
+    if row is not None:
+        case_data = {field: row[field] for field in CASE_FIELDS}
+        case_data['pdf_links'] = json.loads(case_data['pdf_links'] or '[]')
+    else:
+        case_data = MOCK_CASE_STORE.get(case_key)
+    if not case_data:
+        return None
+    return case_key, case_data, order_history(case_data, db_manager.get_case_responses(*parts))
+
 @app.route('/download_pdf/<case_key>')
 def download_pdf(case_key):
-    """Generate and download a mock PDF for the case"""
+    """Download the PDF for a stored (or mock) case, rendered once per version of the case"""
     try:
-        case_data = MOCK_CASES.get(case_key)
-        if not case_data:
+        document = load_case_document(case_key)
+        if document is None:
             flash('Case not found for PDF generation.', 'error')
             return redirect(url_for('index'))
 
-        buffer = io.BytesIO()
-        p = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
-
-        p.setFont("Helvetica-Bold", 16)
-        p.drawString(inch, height - inch, "DELHI HIGH COURT - CASE DETAILS")
+        case_key, case_data, history = document
+        path, etag = pdf_cache.get(case_key, case_data, history)
+        # send_file streams the cached file and answers If-None-Match /
+        # If-Modified-Since with 304 from the ETag and the file's mtime
+        return send_file(
+            path,
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=f'case_{case_key.replace(".", "_")}.pdf',
+            etag=etag,
+            conditional=True,
+            max_age=0,
+        )
 
-        p.setFont("Helvetica", 12)
-        y = height - inch * 1.5
-        
-        details = [
-            ("Case Title:", case_data.get('case_title', 'N/A')),
-            ("Case Number:", case_data.get('case_number', 'N/A')),
-            ("Case Type:", case_data.get('case_type', 'N/A')),
-            ("Filing Date:", case_data.get('filing_date', 'N/A')),
-            ("Petitioner:", case_data.get('petitioner_name', 'N/A')),
-            ("Respondent:", case_data.get('respondent_name', 'N/A')),
-            ("Next Hearing:", case_data.get('next_hearing_date', 'N/A')),
-            ("Status:", case_data.get('case_status', 'N/A')),
-        ]
-        
-        for label, value in details:
-            p.drawString(inch, y, f"{label} {value}")
-            y -= 20
-        
-        p.save()
-        buffer.seek(0)
-        
-        response = make_response(buffer.getvalue())
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f'attachment; filename=case_{case_key.replace(".", "_")}.pdf'
-        
-        logger.info(f"PDF generated for case: {case_key}")
-        return response
-        
     except Exception as e:
         logger.error(f"Error generating PDF: {str(e)}")
         flash('An error occurred while generating the PDF. Please try again.', 'error')
         return redirect(url_for('index'))
 
+@app.route('/export/pdfs', methods=['POST'])
+def export_pdfs():
+    """
+    Streams a ZIP of case PDFs for a list of case keys ({"case_keys": [...]})
+    or for the results of a stored-case search ({"q": "...", "limit": N}).
+    Progress can be polled at the URL in the X-Export-Progress header.
+    """
+    payload = request.get_json(silent=True) or {}
+    if payload.get('q'):
+        try:
+            limit = max(1, min(int(payload.get('limit', 100)), PDF_EXPORT_MAX_CASES))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'The limit must be a whole number.'}), 400
+        case_keys = [row['case_key'] for row in db_manager.search_cases_fulltext(str(payload['q']), limit=limit)]
+    else:
+        case_keys = payload.get('case_keys')
+        if not isinstance(case_keys, list):
+            return jsonify({'error': 'Provide case_keys (a list) or q (a search).'}), 400
+        case_keys = [str(key).strip() for key in case_keys if str(key).strip()]
+
+    # Normalize and drop duplicates, keeping the requested order
+    normalized = {}
+    for key in case_keys:
+        parts = split_case_key(key)
+        normalized.setdefault(make_case_key(*parts) if parts else key, None)
+    case_keys = list(normalized)
+    if not case_keys:
+        return jsonify({'error': 'No cases to export.'}), 400
+    if len(case_keys) > PDF_EXPORT_MAX_CASES:
+        return jsonify({'error': f'At most {PDF_EXPORT_MAX_CASES} cases can be exported at once.'}), 400
+
+    try:
+        progress = pdf_exporter.start(case_keys)
+    except ExportBusy:
+        return jsonify({'error': 'Too many exports in progress. Please try again later.'}), 503
+
+    response = Response(pdf_exporter.stream(progress, case_keys), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename=cases_{progress.id[:8]}.zip'
+    response.headers['X-Export-Id'] = progress.id
+    response.headers['X-Export-Progress'] = url_for('export_progress', export_id=progress.id)
+    # Releases the export slot even if the client disconnects before streaming starts
+    response.call_on_close(lambda: pdf_exporter.finish(progress))
+    return response
+
+@app.route('/export/<export_id>')
+def export_progress(export_id):
+    """Returns the progress counters of a running or recent PDF export."""
+    progress = pdf_exporter.progress(export_id)
+    if progress is None:
+        return jsonify({'error': 'Export not found.'}), 404
+    return jsonify(progress.to_dict())
+
+
+@app.route('/watchlist', methods=['GET'])
+def list_watchlist():
+    """Returns the tracked cases and when each is next checked."""
+    return jsonify({'watchlist': [dict(row) for row in db_manager.get_watchlist()]})
+
+@app.route('/watchlist', methods=['POST'])
+def add_to_watchlist():
+    """Starts tracking a case for changes."""
+    payload = request.get_json(silent=True) or request.form
+    case_type = str(payload.get('case_type', '')).strip()
+    case_number = str(payload.get('case_number', '')).strip()
+    filing_year = str(payload.get('filing_year', '')).strip()
+
+    if not all([case_type, case_number, filing_year]):
+        return jsonify({'error': 'All fields (case type, case number, filing year) are required.'}), 400
+
+    watch_id, created = watchlist.add(case_type, case_number, filing_year)
+    case_key = make_case_key(case_type, case_number, filing_year)
+    return jsonify({'watch_id': watch_id, 'case_key': case_key}), 201 if created else 200
+
+@app.route('/watchlist/<case_key>', methods=['DELETE'])
+def remove_from_watchlist(case_key):
+    """Stops tracking a case."""
+    parts = split_case_key(case_key)
+    if parts is None or not watchlist.remove(make_case_key(*parts)):
+        return jsonify({'error': 'Case is not on the watchlist.'}), 404
+    return '', 204
+
+@app.route('/watchlist/events')
+def watchlist_events():
+    """
+    Returns change events after the `after` event ID (oldest first), optionally
+    for one case_key. Poll again with the returned next_after.
+    """
+    after = request.args.get('after', 0, type=int)
+    limit = max(1, min(request.args.get('limit', 100, type=int), 500))
+    case_key = request.args.get('case_key')
+    if case_key:
+        parts = split_case_key(case_key)
+        case_key = make_case_key(*parts) if parts else case_key
+    rows = db_manager.get_case_events(after, limit, case_key)
+    events = [{
+        'id': row['id'],
+        'case_key': row['case_key'],
+        'event_type': row['event_type'],
+        'changes': json.loads(row['changes']) if row['changes'] else {},
+        'detected_at': row['detected_at'],
+    } for row in rows]
+    return jsonify({'events': events, 'next_after': events[-1]['id'] if events else after})
+
+@app.cli.command('watchlist-refresh')
+def watchlist_refresh_command():
+    """Check every tracked case that is due (for running from cron)."""
+    ensure_database()
+    checked = watchlist.run_once()
+    print(f"Checked {checked} tracked cases: {watchlist.stats()}")
+
+@app.route('/stats')
+def stats():
+    """Returns search statistics from the rollup tables."""
+    stats = db_manager.get_stats(hours=request.args.get('hours', 24, type=int))
+    stats['top_case_types'] = [dict(row) for row in stats['top_case_types']]
+    if not USE_MOCK_SCRAPER:
+        stats['live_scraper'] = get_site_guard().stats()
+    return jsonify(stats)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Span timings and hot-path counters in the Prometheus text format."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.cli.command('rebuild-stats')
+def rebuild_stats_command():
+    """Reconcile the stats rollup tables against the raw query log."""
+    ensure_database()
+    db_manager.rebuild_stats()
+    print("Stats rollups rebuilt.")
+
+
+@app.route('/retention')
+def retention_runs():
+    """Returns the reports of recent retention runs, newest first."""
+    limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+    runs = [{
+        'id': row['id'],
+        'started_at': row['started_at'],
+        'finished_at': row['finished_at'],
+        'report': json.loads(row['report']) if row['report'] else None,
+    } for row in db_manager.get_retention_runs(limit)]
+    return jsonify({'runs': runs})
+
+@app.cli.command('retention-run')
+@click.option('--full-vacuum', is_flag=True, help="Rewrite the whole database (locks it meanwhile).")
+def retention_run_command(full_vacuum):
+    """Compress, archive and vacuum the response log once (for running from cron)."""
+    ensure_database()
+    report = retention.run_once(full_vacuum=full_vacuum)
+    print(json.dumps(report, indent=2) if report else "Another retention run is in progress.")
+
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create and migrate the database (otherwise done on the first request)."""
+    ensure_database()
+    print("Database initialized.")
+
 
 @app.errorhandler(404)
 def not_found_error(error):
@@ -0,0 +1,228 @@
+import queue
+import threading
+import time
+import logging
+
+from database import (
+    INSERT_QUERY_SQL, INSERT_RESPONSE_SQL, INSERT_CASE_DATA_SQL,
+    response_rows, case_data_row, stores_case_data,
+)
+from retention import INSERT_BLOB_SQL
+
+logger = logging.getLogger(__name__)
+
+# Crash-safety modes:
+#   'async' - log calls return once the record is queued; a crash can lose
+#             at most the records buffered since the last flush.
+#   'group' - log calls block until the batch holding their record is
+#             committed (group commit), so acknowledged records are durable.
+CRASH_SAFETY_MODES = ('async', 'group')
+
+
+class AuditQueueFull(Exception):
+    """Raised when the audit queue stays full for longer than the enqueue timeout."""
+
+
+class AuditWriteError(Exception):
+    """Raised when a 'group' record is not committed in time or the writer thread has stopped."""
+
+
+class _Record:
+    __slots__ = ('kind', 'params', 'committed', 'error')
+
+    def __init__(self, kind, params, wait):
+        self.kind = kind
+        self.params = params
+        self.committed = threading.Event() if wait else None
+        self.error = None
+
+
+class BufferedAuditLogger:
+    """
+    Write-behind replacement for DatabaseManager.log_query/log_response.
+
+    Records are queued in memory and written by a background thread with
+    executemany() in a single transaction every `batch_size` records or
+    `flush_interval_ms` milliseconds, whichever comes first. Query IDs are
+    handed out from blocks reserved in the AUTOINCREMENT sequence, so
+    log_query() returns a usable ID before the row is written. When the queue
+    is full, callers block (backpressure) for up to `enqueue_timeout` seconds.
+
+    A failed write is retried `flush_retries` times with exponential backoff.
+    If it still fails, 'group' callers get the error raised from their log
+    call, while 'async' records are kept and retried with the next batch (at
+    most `max_queue` of them; older ones are dropped and counted).
+    """
+    def __init__(self, db_manager, batch_size=100, flush_interval_ms=200, max_queue=10000,
+                 id_block_size=100, crash_safety='async', enqueue_timeout=5.0,
+                 commit_timeout=30.0, flush_retries=3, retry_backoff_ms=50):
+        if crash_safety not in CRASH_SAFETY_MODES:
+            raise ValueError(f"crash_safety must be one of {CRASH_SAFETY_MODES}")
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.id_block_size = id_block_size
+        self.crash_safety = crash_safety
+        self.enqueue_timeout = enqueue_timeout
+        self.commit_timeout = commit_timeout
+        self.flush_retries = flush_retries
+        self.retry_backoff = retry_backoff_ms / 1000
+        self.max_pending = max_queue
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._id_lock = threading.Lock()
+        self._next_id = 0
+        self._last_id = -1
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {'queued': 0, 'written': 0, 'flushes': 0, 'failed_flushes': 0, 'blocked_enqueues': 0,
+                       'dropped': 0}
+
+        self._writer = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._writer.start()
+
+    def _reserve_id(self):
+        with self._id_lock:
+            if self._next_id > self._last_id:
+                first = self.db_manager.reserve_query_ids(self.id_block_size)
+                self._next_id, self._last_id = first, first + self.id_block_size - 1
+            query_id = self._next_id
+            self._next_id += 1
+            return query_id
+
+    def _enqueue(self, kind, params):
+        if self._stop.is_set():
+            raise RuntimeError("Audit logger is closed")
+        if not self._writer.is_alive():
+            raise AuditWriteError("Audit writer thread is not running")
+        record = _Record(kind, params, wait=self.crash_safety == 'group')
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats['blocked_enqueues'] += 1
+            try:
+                self._queue.put(record, timeout=self.enqueue_timeout)
+            except queue.Full:
+                raise AuditQueueFull(f"Audit queue full for {self.enqueue_timeout}s")
+        with self._stats_lock:
+            self._stats['queued'] += 1
+        if record.committed is not None:
+            self._wait_committed(record)
+
+    def _wait_committed(self, record):
+        """Block until the record's batch is committed; raise if it failed or the writer is gone."""
+        deadline = time.monotonic() + self.commit_timeout
+        while not record.committed.wait(min(0.5, self.commit_timeout)):
+            if not self._writer.is_alive():
+                raise AuditWriteError("Audit writer thread stopped before the record was committed")
+            if time.monotonic() >= deadline:
+                raise AuditWriteError(f"Audit record not committed within {self.commit_timeout}s")
+        if record.error is not None:
+            raise record.error
+
+    def log_query(self, case_type, case_number, filing_year, ip_address=None, user_agent=None):
+        """Queue a search query and return its (reserved) query ID"""
+        query_id = self._reserve_id()
+        self._enqueue('query', (query_id, case_type, case_number, filing_year, ip_address, user_agent))
+        return query_id
+
+    def log_response(self, query_id, response_data, status, error_message=None, raw_response=None, latency_ms=None,
+                     case_key=None):
+        """Queue the response for a query"""
+        stores_case_data(status, response_data, case_key)
+        self._enqueue('response', (query_id, response_data, status, error_message, raw_response, latency_ms, case_key))
+
+    def _write(self, records):
+        queries, blobs, responses, cases = [], [], [], []
+        for record in records:
+            if record.kind == 'query':
+                queries.append(record.params)
+            else:
+                query_id, response_data, status, error_message, raw_response, latency_ms, case_key = record.params
+                blob, response = response_rows(query_id, response_data, status, error_message, raw_response, latency_ms)
+                blobs.append(blob)
+                responses.append(response)
+                if stores_case_data(status, response_data, case_key):
+                    cases.append(case_data_row(query_id, case_key, response_data))
+
+        with self.db_manager.get_connection() as conn:
+            self.db_manager.begin_immediate(conn)
+            conn.executemany(INSERT_QUERY_SQL, queries)
+            conn.executemany(INSERT_BLOB_SQL, blobs)
+            conn.executemany(INSERT_RESPONSE_SQL, responses)
+            conn.executemany(INSERT_CASE_DATA_SQL, cases)
+
+    def _flush(self, records):
+        """Write a batch, retrying with backoff; returns the 'async' records still unwritten."""
+        for attempt in range(self.flush_retries + 1):
+            try:
+                self._write(records)
+            except Exception as e:
+                error = e
+                logger.warning(f"Failed to flush {len(records)} audit records (attempt {attempt + 1}): {e}")
+                with self._stats_lock:
+                    self._stats['failed_flushes'] += 1
+                if attempt < self.flush_retries:
+                    time.sleep(self.retry_backoff * 2 ** attempt)
+                continue
+            with self._stats_lock:
+                self._stats['written'] += len(records)
+                self._stats['flushes'] += 1
+            for record in records:
+                if record.committed is not None:
+                    record.committed.set()
+            return []
+
+        logger.error(f"Giving up on {len(records)} audit records after {self.flush_retries + 1} attempts: {error}",
+                     exc_info=error)
+        pending = []
+        for record in records:
+            if record.committed is not None:
+                record.error = error
+                record.committed.set()
+            else:
+                pending.append(record)
+        if len(pending) > self.max_pending:
+            dropped = len(pending) - self.max_pending
+            logger.error(f"Dropping {dropped} unwritten audit records")
+            with self._stats_lock:
+                self._stats['dropped'] += dropped
+            pending = pending[dropped:]
+        return pending
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = self.flush_interval if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                record = self._queue.get(timeout=timeout)
+                batch.append(record)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (len(batch) >= self.batch_size or due):
+                # Records that could not be written are retried with the next batch
+                batch = self._flush(batch)
+                deadline = time.monotonic() + self.flush_interval if batch else None
+            elif self._stop.is_set() and self._queue.empty():
+                unwritten = self._flush(batch) if batch else []
+                if unwritten:
+                    logger.error(f"Audit logger closed with {len(unwritten)} unwritten records")
+                return
+
+    def close(self, timeout=10):
+        """Stop accepting records and flush everything still queued"""
+        self._stop.set()
+        self._writer.join(timeout)
+
+    def stats(self):
+        """Get queue depth and write counters"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize()
+        return stats
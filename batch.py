@@ -0,0 +1,179 @@
+"""
+Bulk case lookups.
+
+Reads a CSV or JSONL list of (case_type, case_number, filing_year), drops
+duplicates, answers fresh cache hits straight away and fans the remaining
+lookups out over a pool of scraper workers, yielding NDJSON-ready records as
+they complete. Every query of a run is logged with the user agent
+'batch:<batch_id>', so re-running with the same batch id after a crash replays
+finished cases from the audit log and only looks up the rest.
+
+Usage:
+    python batch.py cases.csv [--workers 4] [--batch-id ID] > results.ndjson
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cache import is_not_found
+from scraper import make_case_key
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('case_type', 'case_number', 'filing_year')
+DEFAULT_WORKERS = 4
+MAX_WORKERS = 16
+
+
+def _case_from_values(values):
+    case = tuple(str(v).strip() for v in values)
+    if len(case) != 3 or not all(case):
+        raise ValueError(f"Expected case_type, case_number, filing_year but got {list(values)}")
+    return case
+
+
+def parse_case_list(text, fmt=None):
+    """
+    Parse a CSV (with or without a header row) or JSONL case list into
+    (case_type, case_number, filing_year) tuples. JSONL lines may be objects
+    with those keys or 3-element arrays.
+    """
+    text = text.strip()
+    if fmt is None:
+        fmt = 'jsonl' if text.startswith(('{', '[')) else 'csv'
+
+    cases = []
+    if fmt == 'jsonl':
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if isinstance(item, dict):
+                cases.append(_case_from_values([item.get(field, '') for field in FIELDS]))
+            else:
+                cases.append(_case_from_values(item))
+    else:
+        rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+        if rows and [cell.strip().lower() for cell in rows[0]][:3] == list(FIELDS):
+            rows = rows[1:]
+        for row in rows:
+            cases.append(_case_from_values(row[:3]))
+    return cases
+
+
+def deduplicate(cases):
+    """Drop repeated cases by normalized case key, keeping first-seen order."""
+    unique = {}
+    for case in cases:
+        unique.setdefault(make_case_key(*case), case)
+    return unique
+
+
+def _record(case_key, case, success, case_data, error_message, source):
+    case_type, case_number, filing_year = case
+    return {
+        'type': 'result',
+        'case_key': case_key,
+        'case_type': case_type,
+        'case_number': case_number,
+        'filing_year': filing_year,
+        'success': success,
+        'source': source,
+        'case_data': case_data if success else None,
+        'error': None if success else error_message,
+    }
+
+
+def run_batch(cases, db_manager, case_cache, lookup, workers=DEFAULT_WORKERS, batch_id=None):
+    """
+    Look up a list of cases, yielding a header record, one result record per
+    unique case as it completes, and a final summary record.
+
+    `lookup(query_id, case_type, case_number, filing_year)` must log the
+    response and return the scraper's (success, case_data, error_message).
+    """
+    batch_id = batch_id or uuid.uuid4().hex[:12]
+    batch_tag = f"batch:{batch_id}"
+    workers = max(1, min(int(workers), MAX_WORKERS))
+    unique = deduplicate(cases)
+    summary = {'type': 'summary', 'batch_id': batch_id, 'succeeded': 0, 'failed': 0,
+               'resumed': 0, 'cached': 0, 'scraped': 0}
+
+    yield {'type': 'batch', 'batch_id': batch_id, 'total': len(cases), 'unique': len(unique), 'workers': workers}
+
+    def emit(record):
+        summary['succeeded' if record['success'] else 'failed'] += 1
+        summary[record['source']] += 1
+        return record
+
+    # Replay cases a previous run of this batch already finished
+    for row in db_manager.get_batch_results(batch_tag):
+        case_key = make_case_key(row['case_type'], row['case_number'], row['filing_year'])
+        if case_key not in unique:
+            continue
+        case_data = json.loads(row['parsed_data']) if row['parsed_data'] else None
+        success = row['status'] in ('success', 'cached') and bool(case_data)
+        if not success and not is_not_found(row['error_message']):
+            # Transient failures are retried
+            continue
+        case = unique.pop(case_key)
+        yield emit(_record(case_key, case, success, case_data, row['error_message'], 'resumed'))
+
+    def run_one(case):
+        query_id = db_manager.log_query(*case, user_agent=batch_tag)
+        return lookup(query_id, *case)
+
+    # Fresh cache hits are answered inline without occupying a worker
+    remaining = {}
+    for case_key, case in unique.items():
+        _, state, _ = case_cache.lookup(*case)
+        if state == 'fresh':
+            yield emit(_record(case_key, case, *run_one(case), 'cached'))
+        else:
+            remaining[case_key] = case
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as executor:
+        futures = {executor.submit(run_one, case): (case_key, case) for case_key, case in remaining.items()}
+        for future in as_completed(futures):
+            case_key, case = futures[future]
+            try:
+                success, case_data, error_message = future.result()
+            except Exception as e:
+                logger.error(f"Batch {batch_id}: lookup for {case_key} crashed: {e}")
+                success, case_data, error_message = False, {}, "An unexpected error occurred during the lookup."
+            yield emit(_record(case_key, case, success, case_data, error_message, 'scraped'))
+
+    yield summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk Delhi High Court case lookup; writes NDJSON to stdout.")
+    parser.add_argument('case_list', help="CSV or JSONL file of case_type, case_number, filing_year ('-' for stdin)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="Input format (detected if omitted)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Parallel scraper workers")
+    parser.add_argument('--batch-id', help="Resume a previous run with this batch id")
+    args = parser.parse_args(argv)
+
+    if args.case_list == '-':
+        text = sys.stdin.read()
+    else:
+        with open(args.case_list, encoding='utf-8') as f:
+            text = f.read()
+
+    # Share the web app's database, cache and scraper configuration
+    from app import db_manager, case_cache, lookup_case
+
+    for record in run_batch(parse_case_list(text, args.format), db_manager, case_cache, lookup_case,
+                            workers=args.workers, batch_id=args.batch_id):
+        sys.stdout.write(json.dumps(record) + '\n')
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
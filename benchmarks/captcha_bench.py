@@ -0,0 +1,99 @@
+"""
+Offline CAPTCHA solver benchmark.
+
+Scores solver configurations and OCR backends against a folder of labelled
+CAPTCHA images. The label is the file name up to the first '_' or '.', e.g.
+'a3k9x.png' or 'a3k9x_2.png'. Reports first-try accuracy, solve latency and
+solves per second per configuration.
+
+Usage:
+    python benchmarks/captcha_bench.py path/to/captchas [--workers 4]
+        [--backends tesseract tesserocr-worker]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from captcha import CaptchaSolver, ALL_VARIANTS, LEGACY_VARIANTS
+from ocr_backends import OCR_BACKENDS, TesseractBackend, create_ocr_backend
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
+
+
+def load_samples(folder):
+    samples = []
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        label = name.split('.')[0].split('_')[0]
+        with open(os.path.join(folder, name), 'rb') as f:
+            samples.append((label, f.read()))
+    return samples
+
+
+def score(solver, samples):
+    latencies, correct, answered = [], 0, 0
+    started_all = time.perf_counter()
+    for label, image_bytes in samples:
+        started = time.perf_counter()
+        answer = solver.solve(image_bytes)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if answer:
+            answered += 1
+            correct += answer.lower() == label.lower()
+    total = time.perf_counter() - started_all
+    latencies.sort()
+    return {
+        'solves_per_sec': len(samples) / total,
+        'accuracy': correct / len(samples),
+        'answered': answered / len(samples),
+        'mean_ms': statistics.mean(latencies),
+        'p95_ms': latencies[int(0.95 * (len(latencies) - 1))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score CAPTCHA solver accuracy and latency on labelled images")
+    parser.add_argument('folder')
+    parser.add_argument('--workers', type=int, default=None, help="OCR worker processes for the multi-variant solver")
+    parser.add_argument('--backends', nargs='+', default=list(OCR_BACKENDS), choices=list(OCR_BACKENDS),
+                        help="OCR backends to compare with the multi-variant solver")
+    args = parser.parse_args()
+
+    samples = load_samples(args.folder)
+    if not samples:
+        sys.exit(f"No labelled images found in {args.folder}")
+
+    configurations = [
+        ('legacy (fixed threshold)', lambda: CaptchaSolver(LEGACY_VARIANTS, TesseractBackend(parallel=False))),
+        ('multi-variant, serial', lambda: CaptchaSolver(ALL_VARIANTS, TesseractBackend(parallel=False))),
+    ]
+    for backend in args.backends:
+        kwargs = {'max_workers': args.workers} if backend == 'tesseract' else {'workers': args.workers}
+        configurations.append((
+            f'multi-variant, {backend}',
+            lambda backend=backend, kwargs=kwargs: CaptchaSolver(ALL_VARIANTS, create_ocr_backend(backend, **kwargs))
+        ))
+
+    print(f"{len(samples)} labelled CAPTCHAs")
+    for name, make_solver in configurations:
+        try:
+            solver = make_solver()
+        except ImportError as e:
+            print(f"{name:>34}: skipped ({e})")
+            continue
+        # Warm the process pool so start-up is not billed to the first image
+        solver.solve(samples[0][1])
+        result = score(solver, samples)
+        solver.close()
+        print(f"{name:>34}: accuracy {result['accuracy']:6.1%}  answered {result['answered']:6.1%}  "
+              f"mean {result['mean_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+              f"{result['solves_per_sec']:6.1f} solves/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Memory and lookup benchmark for CaseStore against a plain dict of dicts.
+
+Builds the same synthetic cases (court_simulator.iter_synthetic_cases) both
+ways, measuring the memory each holds with tracemalloc (which also slows
+both builds), then times key lookups and filtered queries: pages of cases by
+type, court hall and year, one judge's cases for a year, and the hearings in
+a given week. The dict side answers filters by scanning, as the app did before.
+
+Usage:
+    python benchmarks/case_store_bench.py [--cases 1000000] [--lookups 100000]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from case_store import CaseStore, date_ordinal
+from court_simulator import iter_synthetic_cases
+
+
+def build(factory, count, seed):
+    """Build a container with `factory`; returns (container, bytes allocated, seconds)."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    container = factory(iter_synthetic_cases(count, seed=seed))
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return container, size, elapsed
+
+
+def build_store(pairs):
+    store = CaseStore()
+    for case_key, case_data in pairs:
+        store.put(case_key, case_data)
+    return store
+
+
+def timed(fn, repeat=1):
+    """Best wall time of `repeat` calls, and the last result."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def scan(cases, case_type=None, filing_year=None, judge_name=None, court_hall=None, hearing_from=None, hearing_to=None,
+         limit=None):
+    """The dict-of-dicts way: look at every case."""
+    low = hearing_from.toordinal() if hearing_from else None
+    high = hearing_to.toordinal() if hearing_to else None
+    results = []
+    for case_key, case in cases.items():
+        if case_type is not None and case.get('case_type') != case_type:
+            continue
+        if judge_name is not None and case.get('judge_name') != judge_name:
+            continue
+        if court_hall is not None and case.get('court_hall') != court_hall:
+            continue
+        if filing_year is not None and case_key.rsplit('.', 1)[1] != str(filing_year):
+            continue
+        if low is not None or high is not None:
+            hearing = date_ordinal(case.get('next_hearing_date'))
+            if not hearing or (low is not None and hearing < low) or (high is not None and hearing > high):
+                continue
+        results.append((case_key, case))
+        if limit is not None and len(results) >= limit:
+            break
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cases', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"Building {args.cases:,} synthetic cases...")
+    cases, dict_bytes, dict_seconds = build(dict, args.cases, args.seed)
+    store, store_bytes, store_seconds = build(build_store, args.cases, args.seed)
+    print(f"  dict of dicts: {dict_bytes / 2**20:8.1f} MiB  ({dict_bytes / args.cases:6.0f} B/case, built in {dict_seconds:.1f}s)")
+    print(f"  CaseStore:     {store_bytes / 2**20:8.1f} MiB  ({store_bytes / args.cases:6.0f} B/case, built in {store_seconds:.1f}s)")
+
+    rng = random.Random(args.seed)
+    keys = list(cases)
+    probe = [rng.choice(keys) for _ in range(args.lookups)] + [f"W.P.(C).{n}.2024" for n in range(1000)]
+    dict_time, _ = timed(lambda: [cases.get(k) for k in probe])
+    store_time, _ = timed(lambda: [store.get(k) for k in probe])
+    print(f"\nkey lookups ({len(probe):,}, incl. 1,000 misses):")
+    print(f"  dict of dicts: {dict_time / len(probe) * 1e6:7.2f} us/lookup")
+    print(f"  CaseStore:     {store_time / len(probe) * 1e6:7.2f} us/lookup  (record rebuilt as a dict)")
+
+    judge = store.values_of('judge_name')[0]
+    week = dict(hearing_from=date(2025, 3, 3), hearing_to=date(2025, 3, 9))
+    queries = [
+        ("page of 8: one type, one hall", dict(case_type='CRL.A.', court_hall='Court No. 7', limit=8)),
+        ("page of 50: one hall, one year", dict(court_hall='Court No. 7', filing_year=2024, limit=50)),
+        ("one judge, one filing year", dict(judge_name=judge, filing_year=2024)),
+        ("hearings in one week", week),
+        ("one type, hearings in one week", dict(case_type='W.P.(C)', **week)),
+    ]
+    print("\nfiltered queries (best of 3):")
+    store.find(hearing_from=date(2025, 1, 1), limit=1)  # build the hearing index outside the timings
+    for name, filters in queries:
+        scan_time, scanned = timed(lambda: scan(cases, **filters), repeat=3)
+        find_time, found = timed(lambda: store.find(**filters), repeat=3)
+        agree = sorted(k for k, _ in scanned) == sorted(k for k, _ in found)
+        print(f"  {name:<32} {len(found):>7,} rows   scan {scan_time * 1000:9.2f} ms   "
+              f"find {find_time * 1000:8.2f} ms   {scan_time / find_time:7.1f}x{'' if agree else '   MISMATCH'}")
+    count_filters = dict(queries[2][1])
+    scan_time, scanned = timed(lambda: len(scan(cases, **count_filters)), repeat=3)
+    count_time, counted = timed(lambda: store.count(**count_filters), repeat=3)
+    print(f"  {'count: one judge, one year':<32} {counted:>7,} rows   scan {scan_time * 1000:9.2f} ms   "
+          f"count {count_time * 1000:7.2f} ms   {scan_time / count_time:7.1f}x{'' if counted == scanned else '   MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Multi-threaded write benchmark for DatabaseManager.
+
+Each thread logs a query and its response, the same two writes /search makes,
+in a loop. The 'legacy' configuration reproduces the original behaviour (a new
+connection per call in rollback-journal mode); 'tuned' is the current
+DatabaseManager with per-thread connections, WAL and pragmas.
+
+Usage:
+    python benchmarks/db_write_bench.py [--threads 8] [--writes 200]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from sample_data import MOCK_CASES
+
+
+class LegacyDatabaseManager(DatabaseManager):
+    """DatabaseManager with the original connect-per-call, rollback-journal behaviour."""
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+
+def run(db_manager, threads, writes):
+    case = next(iter(MOCK_CASES.values()))
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(writes):
+                query_id = db_manager.log_query('W.P.(C)', '1234', '2024', '127.0.0.1', 'bench')
+                db_manager.log_response(query_id, case, 'success', case_key='W.P.(C).1234.2024')
+        except sqlite3.OperationalError as e:
+            errors.append(str(e))
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return threads * writes / elapsed, elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=200, help="Searches logged per thread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, cls, kwargs in [
+            ('legacy', LegacyDatabaseManager, {'journal_mode': 'DELETE', 'synchronous': 'FULL'}),
+            ('tuned', DatabaseManager, {}),
+        ]:
+            db_manager = cls(os.path.join(tmp, f'{name}.db'), **kwargs)
+            if cls is LegacyDatabaseManager:
+                # Pragmas only come from _connect(); set the journal mode once for the file
+                db_manager._connect().close()
+            db_manager.initialize_database()
+            rate, elapsed, errors = run(db_manager, args.threads, args.writes)
+            print(f"{name:>7}: {rate:8.1f} searches/s  ({elapsed:.2f}s, {len(errors)} lock errors)")
+
+
+if __name__ == '__main__':
+    main()
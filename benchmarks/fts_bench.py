@@ -0,0 +1,104 @@
+"""
+Compares the LIKE-based search_cases() with FTS5 search_cases_fulltext()
+on a synthetic case_data corpus.
+
+Usage:
+    python benchmarks/fts_bench.py [--rows 1000000] [--db path/to/bench.db]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from sample_data import CASE_TYPES, MOCK_CASES
+
+FIRST_NAMES = ['Sunita', 'Rakesh', 'Anil', 'Priya', 'Vikram', 'Meena', 'Arjun', 'Kavita', 'Rohit', 'Neha']
+LAST_NAMES = ['Singh', 'Mehra', 'Sharma', 'Gupta', 'Verma', 'Kapoor', 'Jain', 'Malhotra', 'Bansal', 'Arora']
+RESPONDENTS = ['Union of India', 'State of Delhi (NCT)', 'Delhi Development Authority', 'Municipal Corporation of Delhi',
+               'National Highways Authority', 'Ministry of Environment & Ors.']
+STATUSES = ['Pending', 'Admitted', 'Disposed', 'Reserved for Judgment', 'Stay Granted']
+ORDERS = [case['latest_order'] for case in MOCK_CASES.values()]
+JUDGES = sorted({case['judge_name'] for case in MOCK_CASES.values()})
+
+SEARCHES = [
+    ('petitioner', {'petitioner_name': 'Kapoor'}, 'Kapoor'),
+    ('case number', {'case_number': '4711'}, '4711'),
+    ('order text', None, 'arbitral award'),
+    ('judge', None, 'Swarana'),
+    ('no match', {'petitioner_name': 'Chaudhary'}, 'Chaudhary'),
+]
+
+
+def populate(db_manager, rows, seed=7):
+    rng = random.Random(seed)
+    batch = []
+    conn = db_manager.get_connection()
+    for i in range(rows):
+        petitioner = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        respondent = rng.choice(RESPONDENTS)
+        case_type = rng.choice(CASE_TYPES)
+        number, year = rng.randint(1, 20000), rng.randint(2015, 2024)
+        batch.append((
+            f"{case_type.rstrip('.')}.{number}.{year}.{i}", f"{number}/{year}", case_type, str(year),
+            petitioner, respondent, f"{petitioner} vs. {respondent}", rng.choice(JUDGES),
+            f"Court No. {rng.randint(1, 40)}", rng.choice(STATUSES), rng.choice(ORDERS),
+        ))
+        if len(batch) == 10000:
+            _insert(conn, batch)
+            batch = []
+    if batch:
+        _insert(conn, batch)
+
+
+def _insert(conn, batch):
+    with conn:
+        conn.executemany('''
+            INSERT INTO case_data (case_key, case_number, case_type, filing_year, petitioner_name,
+                                   respondent_name, case_title, judge_name, court_hall, case_status, latest_order)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LIKE vs FTS5 case search benchmark")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--db', help="Reuse a database file instead of a temporary one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, 'fts_bench.db')
+        db_manager = DatabaseManager(path)
+        db_manager.initialize_database()
+        existing = db_manager.get_connection().execute("SELECT COUNT(*) FROM case_data").fetchone()[0]
+        if existing < args.rows:
+            started = time.perf_counter()
+            populate(db_manager, args.rows - existing)
+            print(f"Inserted {args.rows - existing} rows in {time.perf_counter() - started:.1f}s")
+
+        for name, like_kwargs, text in SEARCHES:
+            if like_kwargs:
+                like_time, like_rows = timed(lambda: db_manager.search_cases(**like_kwargs))
+                like = f"LIKE {like_time * 1000:9.2f} ms ({len(like_rows)} rows)"
+            else:
+                like = "LIKE       n/a (column not searchable)"
+            fts_time, fts_rows = timed(lambda: db_manager.search_cases_fulltext(text, limit=100, prefix=False))
+            print(f"{name:>12}: {like}   FTS5 {fts_time * 1000:9.2f} ms ({len(fts_rows)} rows)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+End-to-end load test of /search against the local court-site simulator.
+
+Starts court_simulator.py with synthetic cases, points the app's live HTTP
+scraper at it (COURT_BASE_URL), serves the app on a local threaded server and
+drives POST /search at a fixed arrival rate. Arrivals are open-loop: each
+request is due at start + i / rps and its latency is measured from that due
+time, so queueing behind a slow server shows up in the percentiles instead of
+lowering the offered load.
+
+Reports latency percentiles, throughput, response codes, cache and scrape
+outcomes from the app's metrics, the simulator's counters and the process's
+CPU time, peak RSS and thread count (the load generator runs in the same
+process, so CPU includes it).
+
+CAPTCHAs are answered by court_simulator.AnswerKeySolver unless --ocr is
+given, so the default run measures everything except OCR.
+
+Usage:
+    python benchmarks/load_test.py [--rps 20] [--duration 30] [--cases 2000]
+                                   [--latency 0.05] [--jitter 0.05] [--error-rate 0.01]
+                                   [--captcha-difficulty 1] [--not-found-ratio 0.05]
+                                   [--concurrency 64] [--ocr] [--mock] [--seed 1]
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from court_simulator import AnswerKeySolver, start_simulator, synthetic_cases
+from sample_data import MOCK_CASES
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def build_workload(cases, count, not_found_ratio, seed):
+    """`count` (case_type, case_number, filing_year) searches drawn from `cases`, some for missing cases."""
+    rng = random.Random(seed)
+    keys = sorted(cases)
+    searches = []
+    for i in range(count):
+        if rng.random() < not_found_ratio:
+            searches.append(('W.P.(C)', str(900000 + i), '2024'))
+            continue
+        case = cases[rng.choice(keys)]
+        number, year = case['case_number'].split('/')
+        searches.append((case['case_type'], number, year))
+    return searches
+
+
+class ResourceSampler:
+    """CPU time, peak RSS and (sampled) thread count of this process while the test runs."""
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.max_threads = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.max_threads = max(self.max_threads, threading.active_count())
+
+    def __enter__(self):
+        self.cpu_started = os.times()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        ended = os.times()
+        self.cpu_seconds = (ended.user - self.cpu_started.user) + (ended.system - self.cpu_started.system)
+        self.max_rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+        return False
+
+
+def run_load(app_url, searches, rps, concurrency):
+    """Fire `searches` at `rps`; returns ([(latency_s, status)], wall_seconds)."""
+    import requests
+
+    local = threading.local()
+    results = []
+    results_lock = threading.Lock()
+
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+
+    def search(due, case_type, case_number, filing_year):
+        try:
+            response = session().post(
+                f"{app_url}/search",
+                data={'case_type': case_type, 'case_number': case_number, 'filing_year': filing_year},
+                allow_redirects=False, timeout=60
+            )
+            status = response.status_code
+        except requests.RequestException:
+            status = 'error'
+        latency = time.perf_counter() - due
+        with results_lock:
+            results.append((latency, status))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        for i, (case_type, case_number, filing_year) in enumerate(searches):
+            due = started + i / rps
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(search, due, case_type, case_number, filing_year)
+    return results, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rps', type=float, default=20.0, help="Target searches per second")
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds of load")
+    parser.add_argument('--concurrency', type=int, default=64, help="Max requests in flight")
+    parser.add_argument('--cases', type=int, default=2000, help="Synthetic cases served by the simulator")
+    parser.add_argument('--not-found-ratio', type=float, default=0.05)
+    parser.add_argument('--latency', type=float, default=0.05, help="Simulator seconds per page")
+    parser.add_argument('--jitter', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Simulator 503 rate")
+    parser.add_argument('--captcha-difficulty', type=int, default=1)
+    parser.add_argument('--ocr', action='store_true', help="Solve CAPTCHAs with the real OCR solver")
+    parser.add_argument('--mock', action='store_true', help="Use MockScraper instead (baseline)")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    cases = dict(MOCK_CASES, **synthetic_cases(args.cases, seed=args.seed))
+    simulator, simulator_url = start_simulator(
+        cases=cases, expose_answers=not args.ocr, seed=args.seed, latency=args.latency,
+        jitter=args.jitter, error_rate=args.error_rate, captcha_difficulty=args.captcha_difficulty
+    )
+
+    # The app reads these at import; keep the site guard from throttling the test itself
+    os.environ['COURT_BASE_URL'] = simulator_url
+    os.environ['SCRAPER_BACKEND'] = 'http'
+    os.environ.setdefault('SCRAPE_RATE_PER_MINUTE', str(max(600, args.rps * 60 * 4)))
+    os.environ.setdefault('SCRAPE_BURST', str(max(10, int(args.rps * 2))))
+    workdir = tempfile.TemporaryDirectory()
+    os.chdir(workdir.name)  # the app keeps its database under ./data
+
+    import logging
+    logging.disable(logging.WARNING)
+    import app as court_app
+    import metrics
+    from scraper import set_captcha_solver
+    from werkzeug.serving import make_server
+
+    court_app.USE_MOCK_SCRAPER = args.mock
+    if not args.ocr:
+        set_captcha_solver(AnswerKeySolver())
+    server = make_server('127.0.0.1', 0, court_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    app_url = f"http://127.0.0.1:{server.server_port}"
+
+    # MockScraper only knows MOCK_CASES
+    searches = build_workload(MOCK_CASES if args.mock else cases, int(args.rps * args.duration),
+                              args.not_found_ratio, args.seed)
+    print(f"Driving {len(searches)} searches at {args.rps:g}/s against "
+          f"{'MockScraper' if args.mock else 'the simulator'} ({len(cases)} cases)...")
+    with ResourceSampler() as usage:
+        results, wall = run_load(app_url, searches, args.rps, args.concurrency)
+
+    latencies = sorted(latency for latency, _ in results)
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    print(f"\nthroughput: {len(results) / wall:.1f} searches/s over {wall:.1f}s (target {args.rps:g}/s)")
+    print(f"latency:    p50 {percentile(latencies, 0.50) * 1000:.0f} ms   p95 {percentile(latencies, 0.95) * 1000:.0f} ms   "
+          f"p99 {percentile(latencies, 0.99) * 1000:.0f} ms   max {latencies[-1] * 1000:.0f} ms")
+    print(f"responses:  {', '.join(f'{status}: {count}' for status, count in sorted(statuses.items(), key=str))}"
+          "  (200 = case shown, 302 = error flashed)")
+    print(f"cache:      {', '.join(f'{r}: {metrics.CACHE_LOOKUPS.value(result=r)}' for r in ('memory', 'db', 'stale', 'miss', 'fallback'))}")
+    print(f"scrapes:    {', '.join(f'{o}: {metrics.SCRAPE_RESULTS.value(outcome=o)}' for o in ('ok', 'captcha', 'error', 'local', 'rate_limited', 'short_circuited'))}")
+    if not args.mock:
+        import requests
+        print(f"simulator:  {requests.get(f'{simulator_url}/sim/stats').json()}")
+    print(f"resources:  {usage.cpu_seconds:.1f} s CPU ({usage.cpu_seconds / wall * 100:.0f}% of one core), "
+          f"peak RSS {usage.max_rss_mib:.0f} MiB, up to {usage.max_threads} threads")
+
+    server.shutdown()
+    simulator.shutdown()
+
+
+if __name__ == '__main__':
+    main()
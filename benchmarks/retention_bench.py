@@ -0,0 +1,218 @@
+"""
+Storage and latency effect of payload deduplication and retention.
+
+Builds a response log the way it was written before migration 7 (every
+response carrying its payload inline, twice: parsed_data and an identical
+raw_response), spread evenly over --days, for --cases synthetic cases whose
+details change every --changes-every lookups. It then measures the database
+at three stages:
+
+1. legacy: payloads inline;
+2. deduplicated: after migration 7 moves payloads into response_blobs
+   (the freed pages stay in the file until they are vacuumed);
+3. retained: after one RetentionManager run, which compresses cold
+   payloads, archives responses older than --archive-days to NDJSON,
+   deletes them and releases free pages with incremental VACUUM;
+4. repacked: after a full VACUUM (`flask retention-run --full-vacuum`), which
+   also gets back the space left inside pages.
+
+For each stage it reports the file size, the space still in use, and the
+latency of the two payload reads on the request path:
+get_latest_response (the cache's database tier) and get_case_responses
+(order history for PDFs).
+
+Usage:
+    python benchmarks/retention_bench.py [--rows 100000] [--cases 5000] [--days 365]
+                                         [--changes-every 20] [--archive-days 90]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import DatabaseManager, INSERT_QUERY_SQL, INSERT_CASE_DATA_SQL, case_data_row
+from migrations import MIGRATIONS, apply_migrations
+from retention import RetentionManager, sql_timestamp
+from court_simulator import iter_synthetic_cases
+from scraper import make_case_key
+
+DAY = 24 * 3600
+LEGACY_VERSION = 6  # the last schema version with inline payloads
+
+# get_latest_response and get_case_responses as they were before migration 7
+LEGACY_LATEST_SQL = '''
+    SELECT r.parsed_data, r.status, r.error_message, r.timestamp
+    FROM queries q
+    JOIN responses r ON q.id = r.query_id
+    WHERE rtrim(q.case_type, '.') = ? AND q.case_number = ? AND q.filing_year = ?
+      AND (r.status = 'success'
+           OR (r.status = 'failed' AND lower(r.error_message) LIKE '%not found%'))
+    ORDER BY r.id DESC
+    LIMIT 1
+'''
+LEGACY_HISTORY_SQL = '''
+    SELECT parsed_data FROM (
+        SELECT r.id, r.parsed_data
+        FROM queries q
+        JOIN responses r ON q.id = r.query_id
+        WHERE rtrim(q.case_type, '.') = ? AND q.case_number = ? AND q.filing_year = ?
+          AND r.status = 'success'
+        ORDER BY r.id DESC
+        LIMIT 500
+    ) ORDER BY id
+'''
+
+
+def build_legacy_log(db, rows, cases, days, changes_every, seed):
+    """Write `rows` queries and responses with inline payloads; returns the (type, number, year) of every case."""
+    rng = random.Random(seed)
+    records = [case for _, case in iter_synthetic_cases(cases, seed=seed)]
+    lookups = [0] * len(records)
+    started = time.time() - days * DAY
+    step = days * DAY / rows
+    with db.get_connection() as conn:
+        for i in range(rows):
+            index = rng.randrange(len(records))
+            case = records[index]
+            number, year = case['case_number'].split('/')
+            stamp = sql_timestamp(started + i * step)
+            conn.execute(INSERT_QUERY_SQL, (None, case['case_type'], number, year, '127.0.0.1', 'bench'))
+            query_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.execute("UPDATE queries SET timestamp = ? WHERE id = ?", (stamp, query_id))
+
+            roll = rng.random()
+            if roll < 0.03:
+                status, data, error = 'failed', {}, 'Case not found'
+            else:
+                lookups[index] += 1
+                # The case's hearing date and order move on every `changes_every` lookups
+                version = lookups[index] // changes_every
+                data = dict(case, latest_order=f"{case.get('latest_order', '')} (listing {version})")
+                status, error = ('success' if roll < 0.3 else 'cached'), None
+            payload = json.dumps(data)
+            conn.execute('''
+                INSERT INTO responses (query_id, raw_response, parsed_data, status, error_message, latency_ms, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (query_id, payload if status == 'success' else None, payload, status, error,
+                  rng.randint(20, 2000), stamp))
+            if status == 'success':
+                conn.execute(INSERT_CASE_DATA_SQL, case_data_row(query_id, make_case_key(case['case_type'], number, year), data))
+            if i % 5000 == 4999:
+                conn.commit()
+        conn.commit()
+    return [(c['case_type'], *c['case_number'].split('/')) for c in records]
+
+
+def file_stats(db):
+    with db.get_connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        responses = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+    return page_size * pages, page_size * (pages - free), responses
+
+
+def legacy_reads(db):
+    def latest(case_type, case_number, filing_year):
+        return db.get_connection().execute(LEGACY_LATEST_SQL, (case_type.rstrip('.'), case_number, filing_year)).fetchone()
+
+    def history(case_type, case_number, filing_year):
+        rows = db.get_connection().execute(LEGACY_HISTORY_SQL, (case_type.rstrip('.'), case_number, filing_year))
+        return [json.loads(row['parsed_data']) for row in rows.fetchall() if row['parsed_data']]
+    return latest, history
+
+
+def time_reads(reads, cases, samples, seed):
+    """(p50, p95) microseconds of each read"""
+    rng = random.Random(seed)
+    probe = [rng.choice(cases) for _ in range(samples)]
+    results = []
+    for read in reads:
+        for case in probe[:100]:  # warm the page cache
+            read(*case)
+        timings = []
+        for case in probe:
+            started = time.perf_counter()
+            read(*case)
+            timings.append((time.perf_counter() - started) * 1e6)
+        timings.sort()
+        results.append((statistics.median(timings), timings[int(len(timings) * 0.95)]))
+    return results
+
+
+def report(stage, db, cases, samples, seed, reads=None):
+    file_bytes, used_bytes, responses = file_stats(db)
+    reads = reads or (db.get_latest_response, db.get_case_responses)
+    (latest_p50, latest_p95), (history_p50, history_p95) = time_reads(reads, cases, samples, seed)
+    print(f"  {stage:<14} {file_bytes / 2**20:9.1f} {used_bytes / 2**20:9.1f} {responses:>10,}   "
+          f"{latest_p50:7.0f} /{latest_p95:6.0f}   {history_p50:7.0f} /{history_p95:6.0f}")
+    return file_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000, help="Logged responses")
+    parser.add_argument('--cases', type=int, default=5000, help="Distinct cases looked up")
+    parser.add_argument('--days', type=float, default=365, help="Days the log spans")
+    parser.add_argument('--changes-every', type=int, default=20, help="Lookups between changes to a case")
+    parser.add_argument('--archive-days', type=float, default=90, help="Archive responses older than this")
+    parser.add_argument('--compress-days', type=float, default=7)
+    parser.add_argument('--samples', type=int, default=2000, help="Timed reads per stage")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory()
+    db = DatabaseManager(os.path.join(workdir.name, 'court_data.db'))
+    # Create the schema as it was before payloads moved out of responses
+    apply_all = database.apply_migrations
+    database.apply_migrations = lambda conn: apply_migrations(conn, MIGRATIONS[:LEGACY_VERSION])
+    db.initialize_database()
+    database.apply_migrations = apply_all
+
+    print(f"Writing {args.rows:,} responses for {args.cases:,} cases over {args.days:g} days...")
+    started = time.perf_counter()
+    cases = build_legacy_log(db, args.rows, args.cases, args.days, args.changes_every, args.seed)
+    print(f"  written in {time.perf_counter() - started:.1f}s\n")
+
+    print(f"  {'stage':<14} {'file MiB':>9} {'used MiB':>9} {'responses':>10}   "
+          f"{'latest p50/p95 us':>17}   {'history p50/p95 us':>18}")
+    legacy_bytes = report('legacy', db, cases, args.samples, args.seed, reads=legacy_reads(db))
+
+    started = time.perf_counter()
+    with db.get_connection() as conn:
+        apply_migrations(conn)
+    migrate_seconds = time.perf_counter() - started
+    report('deduplicated', db, cases, args.samples, args.seed)
+
+    retention = RetentionManager(
+        db, compress_after_days=args.compress_days, archive_after_days=args.archive_days,
+        archive_dir=os.path.join(workdir.name, 'archive'), vacuum_pages=0, max_rows=args.rows
+    )
+    run = retention.run_once()
+    report('retained', db, cases, args.samples, args.seed)
+    started = time.perf_counter()
+    db.incremental_vacuum(0, full=True)
+    full_vacuum_seconds = time.perf_counter() - started
+    final_bytes = report('repacked', db, cases, args.samples, args.seed)
+
+    print(f"\nmigration 7 took {migrate_seconds:.1f}s; retention run took {run['seconds']:.1f}s "
+          f"(compress {run['compress_seconds']:.1f}s, archive {run['archive_seconds']:.1f}s, "
+          f"vacuum {run['vacuum_seconds']:.1f}s); full VACUUM took {full_vacuum_seconds:.1f}s")
+    print(f"payloads: {run['storage_before']['payloads']:,} distinct for {run['storage_before']['responses']:,} responses, "
+          f"{run['blobs_compressed']:,} compressed (saved {run['compression_bytes_saved'] / 2**20:.1f} MiB)")
+    print(f"archived: {run['rows_archived']:,} responses into {len(run['archive_files'])} file(s), "
+          f"{run['archive_bytes'] / 2**20:.1f} MiB; deleted {run['deleted']}")
+    print(f"database: {legacy_bytes / 2**20:.1f} MiB -> {final_bytes / 2**20:.1f} MiB "
+          f"({(1 - final_bytes / legacy_bytes) * 100:.0f}% smaller)")
+
+
+if __name__ == '__main__':
+    main()
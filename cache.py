@@ -0,0 +1,238 @@
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from scraper import make_case_key
+from metrics import CACHE_LOOKUPS
+from case_store import intern_case
+
+logger = logging.getLogger(__name__)
+
+# Freshness per case status, in seconds. Disposed matters rarely change, while
+# pending ones can get a new hearing date any day.
+STATUS_TTLS = {
+    'pending': 15 * 60,
+    'admitted': 30 * 60,
+    'stay granted': 30 * 60,
+    'settlement pending': 30 * 60,
+    'disposed': 7 * 24 * 3600,
+    'dismissed': 7 * 24 * 3600,
+    'withdrawn': 7 * 24 * 3600,
+}
+DEFAULT_TTL = 60 * 60
+NEGATIVE_TTL = 10 * 60
+# How long past expiry an entry may still be served while it is refreshed in the background
+STALE_TTL = 5 * 60
+
+
+def is_not_found(error_message):
+    """Scrapers report a missing case through the error message of a failed lookup."""
+    return bool(error_message) and 'not found' in error_message.lower()
+
+
+class CacheEntry:
+    __slots__ = ('success', 'data', 'error', 'stored_at', 'ttl')
+
+    def __init__(self, success, data, error, stored_at, ttl):
+        self.success = success
+        self.data = data
+        self.error = error
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+    def age(self, now):
+        return now - self.stored_at
+
+
+class CaseCache:
+    """
+    Two-tier cache for case lookups.
+
+    The first tier is a bounded in-process LRU. The second tier is the SQLite
+    audit log: the latest successful (or not-found) response for a case is
+    promoted into memory on a miss. Entries are fresh for a TTL chosen by case
+    status, then served stale for `stale_ttl` more seconds while a background
+    refresh runs; after that a lookup goes to the scraper again.
+    """
+    def __init__(self, db_manager, max_entries=1024, status_ttls=None, default_ttl=DEFAULT_TTL,
+                 negative_ttl=NEGATIVE_TTL, stale_ttl=STALE_TTL, clock=time.time):
+        self.db_manager = db_manager
+        self.max_entries = max_entries
+        self.status_ttls = status_ttls if status_ttls is not None else STATUS_TTLS
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._stats = {'memory_hits': 0, 'db_hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0, 'refreshes': 0,
+                       'fallbacks': 0}
+
+    def ttl_for(self, success, data, error):
+        """TTL in seconds for a result, or None if it must not be cached."""
+        if success and data:
+            status = (data.get('case_status') or '').strip().lower()
+            return self.status_ttls.get(status, self.default_ttl)
+        if not success and is_not_found(error):
+            return self.negative_ttl
+        return None
+
+    def put(self, case_key, success, data, error, stored_at=None):
+        """Store a lookup result; transient failures are not cached."""
+        ttl = self.ttl_for(success, data, error)
+        if ttl is None:
+            return
+        # Interned so the many cached records share their repeated status, judge and date strings
+        entry = CacheEntry(success, intern_case(data), error, self.clock() if stored_at is None else stored_at, ttl)
+        with self._lock:
+            self._entries[case_key] = entry
+            self._entries.move_to_end(case_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, case_key):
+        with self._lock:
+            self._entries.pop(case_key, None)
+
+    def _state(self, entry):
+        age = entry.age(self.clock())
+        if age <= entry.ttl:
+            return 'fresh'
+        if age <= entry.ttl + self.stale_ttl:
+            return 'stale'
+        return None
+
+    def _load_from_db(self, case_type, case_number, filing_year):
+        row = self.db_manager.get_latest_response(case_type, case_number, filing_year)
+        if row is None:
+            return None
+        success = row['status'] == 'success'
+        data = json.loads(row['parsed_data']) if success and row['parsed_data'] else {}
+        # SQLite CURRENT_TIMESTAMP is UTC
+        stored_at = datetime.strptime(row['timestamp'], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc).timestamp()
+        ttl = self.ttl_for(success, data, row['error_message'])
+        if ttl is None:
+            return None
+        return CacheEntry(success, intern_case(data), row['error_message'] or '', stored_at, ttl)
+
+    def lookup(self, case_type, case_number, filing_year):
+        """
+        Return (entry, state, tier) for a case, where state is 'fresh' or
+        'stale' and tier is 'memory' or 'db', or (None, None, None) when
+        neither tier has a usable copy.
+        """
+        case_key = make_case_key(case_type, case_number, filing_year)
+        with self._lock:
+            entry = self._entries.get(case_key)
+            if entry is not None:
+                self._entries.move_to_end(case_key)
+
+        if entry is not None:
+            state = self._state(entry)
+            if state is not None:
+                return entry, state, 'memory'
+
+        entry = self._load_from_db(case_type, case_number, filing_year)
+        if entry is not None:
+            state = self._state(entry)
+            if state is not None:
+                with self._lock:
+                    self._stats['db_hits'] += 1
+                    self._entries[case_key] = entry
+                    self._entries.move_to_end(case_key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self._stats['evictions'] += 1
+                return entry, state, 'db'
+        return None, None, None
+
+    def last_known(self, case_type, case_number, filing_year):
+        """
+        The most recent successful result for a case regardless of age, or None.
+        Used to answer while the court site is unavailable.
+        """
+        case_key = make_case_key(case_type, case_number, filing_year)
+        with self._lock:
+            entry = self._entries.get(case_key)
+        if entry is None or not entry.success:
+            entry = self._load_from_db(case_type, case_number, filing_year)
+        if entry is None or not entry.success:
+            return None
+        CACHE_LOOKUPS.inc(result='fallback')
+        with self._lock:
+            self._stats['fallbacks'] += 1
+        return entry
+
+    def _revalidate(self, case_key, case_type, case_number, filing_year, fetch):
+        try:
+            success, data, error = fetch()
+            self.put(case_key, success, data, error)
+            query_id = self.db_manager.log_query(case_type, case_number, filing_year, user_agent='cache-revalidate')
+            self.db_manager.log_response(
+                query_id=query_id,
+                response_data=data,
+                status='success' if success else 'failed',
+                error_message=error if not success else None,
+                raw_response=json.dumps(data) if data else None,
+                case_key=case_key
+            )
+        except Exception as e:
+            logger.error(f"Background revalidation failed for {case_key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(case_key)
+
+    def get_or_fetch(self, case_type, case_number, filing_year, fetch):
+        """
+        Serve a case from cache or call `fetch()` (returning the scraper's
+        (success, data, error) tuple) on a miss.
+
+        Returns (success, data, error, source) where source is 'memory', 'db',
+        'stale' or 'live'. Stale hits schedule one background refresh per key.
+        """
+        case_key = make_case_key(case_type, case_number, filing_year)
+        entry, state, tier = self.lookup(case_type, case_number, filing_year)
+
+        if state == 'fresh':
+            CACHE_LOOKUPS.inc(result=tier)
+            if tier == 'memory':
+                with self._lock:
+                    self._stats['memory_hits'] += 1
+            return entry.success, entry.data, entry.error, tier
+
+        if state == 'stale':
+            CACHE_LOOKUPS.inc(result='stale')
+            with self._lock:
+                self._stats['stale_hits'] += 1
+                start_refresh = case_key not in self._refreshing
+                if start_refresh:
+                    self._refreshing.add(case_key)
+                    self._stats['refreshes'] += 1
+            if start_refresh:
+                threading.Thread(
+                    target=self._revalidate,
+                    args=(case_key, case_type, case_number, filing_year, fetch),
+                    daemon=True
+                ).start()
+            return entry.success, entry.data, entry.error, 'stale'
+
+        CACHE_LOOKUPS.inc(result='miss')
+        with self._lock:
+            self._stats['misses'] += 1
+        success, data, error = fetch()
+        self.put(case_key, success, data, error)
+        return success, data, error, 'live'
+
+    def stats(self):
+        """Get hit/miss counters and current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+            return stats
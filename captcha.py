@@ -0,0 +1,153 @@
+import logging
+from collections import defaultdict
+
+try:
+    import cv2
+    import numpy as np
+    CAPTCHA_DEPS_AVAILABLE = True
+except ImportError:
+    CAPTCHA_DEPS_AVAILABLE = False
+
+from ocr_backends import create_ocr_backend
+from metrics import span
+
+logger = logging.getLogger(__name__)
+
+MIN_CAPTCHA_LENGTH = 4
+
+# Preprocessing variants in the order they are produced. 'fixed' is the
+# original single-threshold pipeline.
+ALL_VARIANTS = ('fixed', 'otsu', 'adaptive', 'denoised', 'lines_removed', 'deskewed')
+LEGACY_VARIANTS = ('fixed',)
+
+
+def decode_grayscale(image_bytes):
+    """Decode PNG/JPEG bytes straight to a single-channel image."""
+    image_array = np.frombuffer(image_bytes, np.uint8)
+    return cv2.imdecode(image_array, cv2.IMREAD_GRAYSCALE)
+
+
+def _deskew(binary):
+    """Rotate a white-on-black binary image so its text baseline is horizontal."""
+    coords = np.column_stack(np.where(binary > 0))
+    if len(coords) < 10:
+        return binary
+    angle = cv2.minAreaRect(coords.astype(np.float32))[-1]
+    # minAreaRect angle convention differs across OpenCV versions; normalise to [-45, 45]
+    if angle > 45:
+        angle -= 90
+    elif angle < -45:
+        angle += 90
+    if abs(angle) < 0.5:
+        return binary
+    h, w = binary.shape
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(binary, matrix, (w, h), flags=cv2.INTER_NEAREST, borderValue=0)
+
+
+def preprocess_variants(gray, variants=ALL_VARIANTS):
+    """
+    Produce the requested binarised variants of a grayscale CAPTCHA in one pass,
+    sharing intermediates (blur, Otsu mask) between them. All variants are
+    white text on black, as in the original THRESH_BINARY_INV pipeline.
+    """
+    wanted = set(variants)
+    out = {}
+    if 'fixed' in wanted:
+        out['fixed'] = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV)[1]
+
+    if wanted & {'otsu', 'denoised', 'lines_removed', 'deskewed', 'adaptive'}:
+        blurred = cv2.GaussianBlur(gray, (3, 3), 0)
+        otsu = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+        if 'otsu' in wanted:
+            out['otsu'] = otsu
+        if 'adaptive' in wanted:
+            out['adaptive'] = cv2.adaptiveThreshold(
+                blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 15, 8
+            )
+        if wanted & {'denoised', 'lines_removed', 'deskewed'}:
+            denoised = cv2.medianBlur(otsu, 3)
+            if 'denoised' in wanted:
+                out['denoised'] = denoised
+            if wanted & {'lines_removed', 'deskewed'}:
+                # Strike-through lines are long and thin: find them with a wide
+                # horizontal opening and subtract them from the text mask.
+                width = max(gray.shape[1] // 4, 10)
+                kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (width, 1))
+                lines = cv2.morphologyEx(denoised, cv2.MORPH_OPEN, kernel)
+                lines_removed = cv2.subtract(denoised, lines)
+                lines_removed = cv2.morphologyEx(
+                    lines_removed, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
+                )
+                if 'lines_removed' in wanted:
+                    out['lines_removed'] = lines_removed
+                if 'deskewed' in wanted:
+                    out['deskewed'] = _deskew(lines_removed)
+    return {name: out[name] for name in variants if name in out}
+
+
+def vote(candidates, min_length=MIN_CAPTCHA_LENGTH):
+    """
+    Pick the answer from (variant, text, confidence) candidates: the text read
+    by the most variants wins, ties broken by total confidence.
+    Returns (text, votes, confidence) or (None, 0, 0.0).
+    """
+    tallies = defaultdict(lambda: [0, 0.0])
+    for _, text, confidence in candidates:
+        if text and len(text) >= min_length:
+            tallies[text][0] += 1
+            tallies[text][1] += confidence
+    if not tallies:
+        return None, 0, 0.0
+    text, (votes, total_confidence) = max(tallies.items(), key=lambda item: (item[1][0], item[1][1]))
+    return text, votes, total_confidence / votes
+
+
+class CaptchaSolver:
+    """
+    Multi-candidate CAPTCHA solver.
+
+    Builds several preprocessing variants of the image in one pass, OCRs them
+    in parallel through a pluggable OCR backend (see ocr_backends) and chooses
+    the answer by voting and confidence, so fewer CAPTCHAs need a
+    reload-and-retry round trip.
+    """
+    def __init__(self, variants=ALL_VARIANTS, backend=None, min_length=MIN_CAPTCHA_LENGTH):
+        self.variants = tuple(variants)
+        self.backend = backend
+        self.min_length = min_length
+        self.last_candidates = []
+
+    def _get_backend(self):
+        if self.backend is None:
+            self.backend = create_ocr_backend()
+        return self.backend
+
+    def candidates(self, image_bytes):
+        """OCR every preprocessing variant; returns a list of (variant, text, confidence)."""
+        with span('captcha.preprocess'):
+            gray = decode_grayscale(image_bytes)
+            if gray is None:
+                raise ValueError("Could not decode CAPTCHA image")
+            variants = preprocess_variants(gray, self.variants)
+        with span('captcha.ocr'):
+            readings = self._get_backend().ocr_many(list(variants.values()))
+        return [(name, text, confidence) for name, (text, confidence) in zip(variants, readings)]
+
+    def solve(self, image_bytes):
+        """Return the best CAPTCHA reading, or None if no variant produced a plausible answer."""
+        if not CAPTCHA_DEPS_AVAILABLE:
+            logger.error("OpenCV/NumPy are not installed; cannot solve CAPTCHA.")
+            return None
+        try:
+            self.last_candidates = self.candidates(image_bytes)
+        except Exception as e:
+            logger.error(f"An error occurred during CAPTCHA solving: {e}")
+            return None
+        text, votes, confidence = vote(self.last_candidates, self.min_length)
+        logger.info(f"CAPTCHA candidates {self.last_candidates} -> '{text}' ({votes} votes, {confidence:.0f} conf)")
+        return text
+
+    def close(self):
+        if self.backend is not None:
+            self.backend.close()
@@ -0,0 +1,241 @@
+"""
+Parser for case-status result pages.
+
+Extraction is driven by FIELD_LABELS, a table mapping the labels printed on
+the results page to case_data columns. Only the results tables are parsed:
+with lxml installed they are selected by XPath from lxml's C parser,
+otherwise BeautifulSoup builds a tree of just the <table> elements. Both are
+imported on the first parse, so importing this module for CASE_FIELDS is cheap.
+
+Two layouts are understood:
+- label/value tables (one "Label | Value" pair per row), giving one record;
+- listing tables (a header row followed by one row per case), giving one
+  record per data row.
+"""
+import re
+import logging
+import importlib.util
+from datetime import datetime, timezone
+from urllib.parse import urljoin
+
+LXML_AVAILABLE = importlib.util.find_spec('lxml') is not None
+
+logger = logging.getLogger(__name__)
+
+RESULT_TABLE_CLASS = 'table-bordered'
+
+# (label fragments, case_data column), checked in order against the lower-cased
+# label; more specific labels come before the ones they contain.
+FIELD_LABELS = (
+    (('case title', 'parties', 'party name', 'cause title'), 'case_title'),
+    (('petitioner', 'appellant', 'plaintiff'), 'petitioner_name'),
+    (('respondent', 'defendant'), 'respondent_name'),
+    (('filing date', 'date of filing', 'filed on'), 'filing_date'),
+    (('next date', 'next hearing', 'listing date', 'next listing'), 'next_hearing_date'),
+    (('last order date', 'date of last order', 'order date', 'date of order'), 'last_order_date'),
+    (('latest order', 'last order', 'order details', 'order summary'), 'latest_order'),
+    (('status', 'stage'), 'case_status'),
+    (('judgment', 'judgement', 'orders', 'order'), 'pdf_links'),
+    (('judge', 'coram', 'bench'), 'judge_name'),
+    (('court no', 'court hall', 'court room', 'court'), 'court_hall'),
+    (('case no', 'case number', 'diary no'), 'case_number'),
+)
+
+# Every column parse_case_details fills, in case_data order
+CASE_FIELDS = (
+    'case_number', 'case_type', 'filing_year', 'petitioner_name', 'respondent_name',
+    'filing_date', 'next_hearing_date', 'case_status', 'judge_name', 'court_hall',
+    'pdf_links', 'last_order_date', 'case_title', 'latest_order',
+)
+
+DATE_FIELDS = ('filing_date', 'next_hearing_date', 'last_order_date')
+DATE_PATTERN = re.compile(r'\d{1,2}[/.-]\d{1,2}[/.-]\d{4}')
+
+# Formats the court site prints dates in, tried in order by parse_court_date
+DATE_FORMATS = ('%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%Y-%m-%d')
+
+PARTY_SEPARATOR = re.compile(r'\s+(?:vs?|versus)\.?\s+', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+_label_cache = {}
+
+
+def field_for_label(label):
+    """Map a results-page label to its case_data column, or None."""
+    key = _WHITESPACE.sub(' ', label).strip().rstrip(':').strip().lower()
+    if key not in _label_cache:
+        _label_cache[key] = next(
+            (field for fragments, field in FIELD_LABELS if any(f in key for f in fragments)), None
+        )
+    return _label_cache[key]
+
+
+def parse_court_date(text):
+    """Parse a date as printed by the court site (dd/mm/yyyy and variants); None if unparseable."""
+    text = (text or '').strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+def iso_court_date(text):
+    """A court-printed date as 'YYYY-MM-DD' (how case_data stores it for range queries), or None."""
+    parsed = parse_court_date(text)
+    return parsed.date().isoformat() if parsed else None
+
+
+def split_parties(title):
+    """Split 'A vs. B' / 'A v. B' / 'A versus B' into (petitioner, respondent)."""
+    parts = PARTY_SEPARATOR.split(title, maxsplit=1)
+    if len(parts) != 2:
+        return None
+    return parts[0].strip(), parts[1].strip()
+
+
+def _is_document_link(href):
+    return bool(href) and not href.startswith(('#', 'javascript:'))
+
+
+# --- backends: each returns the result tables as lists of rows; a row is a
+# list of (text, hrefs, is_header) cells ---------------------------------------
+
+def _tables_lxml(html_content):
+    import lxml.html
+    root = lxml.html.fromstring(html_content)
+    tables = []
+    xpath = f"//table[contains(concat(' ', normalize-space(@class), ' '), ' {RESULT_TABLE_CLASS} ')]"
+    for table in root.xpath(xpath):
+        rows = []
+        for tr in table.iter('tr'):
+            rows.append([
+                (_WHITESPACE.sub(' ', cell.text_content()).strip(),
+                 [a.get('href') for a in cell.iter('a') if _is_document_link(a.get('href'))],
+                 cell.tag == 'th')
+                for cell in tr if cell.tag in ('td', 'th')
+            ])
+        tables.append(rows)
+    return tables
+
+
+def _tables_soup(html_content):
+    from bs4 import BeautifulSoup, SoupStrainer
+    soup = BeautifulSoup(html_content, 'html.parser', parse_only=SoupStrainer('table'))
+    tables = []
+    for table in soup.find_all('table', class_=RESULT_TABLE_CLASS):
+        rows = []
+        for tr in table.find_all('tr'):
+            rows.append([
+                (_WHITESPACE.sub(' ', cell.get_text(' ')).strip(),
+                 [a.get('href') for a in cell.find_all('a') if _is_document_link(a.get('href'))],
+                 cell.name == 'th')
+                for cell in tr.find_all(['td', 'th'], recursive=False)
+            ])
+        tables.append(rows)
+    return tables
+
+
+PARSER_BACKENDS = {'lxml': _tables_lxml, 'html.parser': _tables_soup}
+DEFAULT_PARSER_BACKEND = 'lxml' if LXML_AVAILABLE else 'html.parser'
+
+
+def _set_field(record, field, text, hrefs):
+    if field == 'pdf_links':
+        record.setdefault('pdf_links', []).extend(hrefs)
+    elif field and text and not record.get(field):
+        if field in DATE_FIELDS:
+            # Listing cells carry prefixes like "NEXT DATE: 19/10/2024"
+            date = DATE_PATTERN.search(text)
+            text = date.group(0) if date else text
+        record[field] = text
+        if hrefs and field == 'latest_order':
+            record.setdefault('pdf_links', []).extend(hrefs)
+
+
+def _records_from_table(rows):
+    rows = [row for row in rows if row]
+    if not rows:
+        return []
+    header = rows[0]
+    is_listing = len(header) > 2 or all(is_header for _, _, is_header in header)
+    if not is_listing:
+        # Label/value layout: one record for the whole table
+        record = {}
+        for row in rows:
+            if len(row) < 2:
+                continue
+            (label, _, _), (text, hrefs, _) = row[0], row[1]
+            _set_field(record, field_for_label(label), text, hrefs)
+        return [record] if record else []
+
+    fields = [field_for_label(label) for label, _, _ in header]
+    records = []
+    for row in rows[1:]:
+        record = {}
+        for field, (text, hrefs, _) in zip(fields, row):
+            _set_field(record, field, text, hrefs)
+        if record:
+            records.append(record)
+    return records
+
+
+def parse_results(html_content, backend=None):
+    """
+    Extract every case record from a results page.
+    Returns a list of dicts keyed by case_data column (raw page values).
+    """
+    tables = PARSER_BACKENDS[backend or DEFAULT_PARSER_BACKEND](html_content)
+    records = []
+    for rows in tables:
+        records.extend(_records_from_table(rows))
+    return records
+
+
+def _matches(record, case_number, filing_year):
+    number = record.get('case_number', '')
+    digits = re.findall(r'\d+', number)
+    return not digits or (case_number.strip() in digits and (not filing_year or filing_year.strip() in digits))
+
+
+def parse_case_details(html_content, case_type, case_number, filing_year, base_url=None, backend=None):
+    """
+    Parses a case-status results page into a case_data record.
+    When the page lists several cases, the row for the requested case number
+    and year is used. Returns None if the page holds no results table or no
+    row for the requested case.
+    """
+    try:
+        records = parse_results(html_content, backend)
+    except Exception as e:
+        logger.error(f"Error parsing live response: {e}")
+        return None
+    if not records:
+        return None
+
+    record = next((r for r in records if _matches(r, case_number, filing_year)), None)
+    if record is None:
+        return None
+    parsed_data = {field: '' for field in CASE_FIELDS}
+    parsed_data.update(record)
+    parsed_data.update({
+        'case_number': f"{case_number}/{filing_year}",
+        'case_type': case_type,
+        'filing_year': filing_year,
+    })
+
+    title = parsed_data['case_title']
+    parties = split_parties(title) if title else None
+    if parties:
+        parsed_data['petitioner_name'] = parsed_data['petitioner_name'] or parties[0]
+        parsed_data['respondent_name'] = parsed_data['respondent_name'] or parties[1]
+    elif not title and parsed_data['petitioner_name'] and parsed_data['respondent_name']:
+        parsed_data['case_title'] = f"{parsed_data['petitioner_name']} vs. {parsed_data['respondent_name']}"
+
+    links = list(dict.fromkeys(parsed_data.get('pdf_links') or []))
+    if base_url:
+        links = [urljoin(base_url, link) for link in links]
+    parsed_data['pdf_links'] = links
+    parsed_data['pdf_link'] = links[0] if links else ''
+    return parsed_data
@@ -0,0 +1,314 @@
+"""
+Compact, indexed in-memory store of case records.
+
+CaseStore keeps records column by column instead of as one dict per case:
+
+- low-cardinality fields (case type, status, judge, court hall) are stored as
+  2-byte codes into a per-store table of distinct values;
+- the filing year and next hearing date are stored in typed arrays;
+- other text fields are lists whose repeated values share one interned string;
+- the case key is packed into an int for the primary index when its number
+  and year are numeric, and is not stored at all.
+
+Secondary indexes (row-id arrays per case type, filing year, judge, court
+hall and status, plus a lazily sorted next-hearing-date index) let find()
+filter without scanning every record. Records are materialized as plain dicts
+on access, so a CaseStore can stand in for a {case_key: case_data} dict.
+"""
+import re
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from datetime import date
+
+from case_parser import CASE_FIELDS, parse_court_date
+
+# Stored as codes into a table of distinct values, with a row-id index per value
+CATEGORICAL_FIELDS = ('case_type', 'case_status', 'judge_name', 'court_hall')
+# Record fields in output order
+STORED_FIELDS = CASE_FIELDS + ('pdf_link',)
+# Stored in lists; repeated values share one string object
+TEXT_FIELDS = tuple(f for f in STORED_FIELDS if f not in CATEGORICAL_FIELDS)
+# Text fields that are (nearly) unique per case, so not worth interning
+UNIQUE_FIELDS = ('case_number', 'pdf_link', 'pdf_links')
+# Values that repeat across cases and are worth interning in cached records too
+SHARED_FIELDS = CATEGORICAL_FIELDS + ('filing_date', 'next_hearing_date', 'last_order_date', 'filing_year')
+
+NO_DATE = 0  # hearing ordinal for a missing or unparseable date
+_FROM_KEY = object()  # case_number placeholder: "<number>/<year>" rebuilt from the key
+_DMY_DATE = re.compile(r'(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})$')
+_TYPE_BITS = 16
+
+
+def date_ordinal(text):
+    """Proleptic ordinal of a court-printed date, or NO_DATE."""
+    match = _DMY_DATE.match((text or '').strip())
+    try:
+        if match:
+            day, month, year = match.groups()
+            return date(int(year), int(month), int(day)).toordinal()
+    except ValueError:
+        return NO_DATE
+    parsed = parse_court_date(text)
+    return parsed.date().toordinal() if parsed else NO_DATE
+
+
+def intern_case(case_data):
+    """
+    A copy of a case record whose keys and repeated values (type, status,
+    judge, court hall, dates) are interned, so many cached records share them.
+    """
+    record = {}
+    for field, value in case_data.items():
+        if field in SHARED_FIELDS and isinstance(value, str):
+            value = sys.intern(value)
+        record[sys.intern(field)] = value
+    return record
+
+
+class _Codes:
+    """Distinct values of a categorical column and their 2-byte codes."""
+    __slots__ = ('values', 'codes')
+
+    def __init__(self):
+        self.values = [None]  # code 0 is "missing"
+        self.codes = {None: 0}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            if code > 0xFFFF:
+                raise OverflowError("more than 65535 distinct values in a categorical column")
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+
+class CaseStore(Mapping):
+    """
+    Read-mostly mapping of case key -> case record with filtered lookups.
+
+    Keys look like make_case_key() output ('W.P.(C).1234.2024'). Records are
+    dicts with any of CASE_FIELDS plus 'pdf_link'; other fields are dropped.
+    """
+    def __init__(self, cases=None):
+        self._categorical = {field: (_Codes(), array('H')) for field in CATEGORICAL_FIELDS}
+        self._text = {field: [] for field in TEXT_FIELDS}
+        # (field, column, distinct values or None for text columns), in record order
+        self._layout = [
+            (field, self._categorical[field][1], self._categorical[field][0].values) if field in self._categorical
+            else (field, self._text[field], None)
+            for field in STORED_FIELDS
+        ]
+        self._strings = {}
+        self._years = array('H')
+        self._hearings = array('i')
+        self._key_types = _Codes()
+        self._packed_keys = {}  # packed int key -> row
+        self._other_keys = {}  # non-numeric keys -> row
+        self._row_keys = []  # packed int or the key string, per row
+        self._postings = {field: {} for field in CATEGORICAL_FIELDS}
+        self._year_postings = {}
+        self._hearing_order = None  # row ids sorted by hearing date, rebuilt on demand
+        self._hearing_sorted = None
+        if cases:
+            for case_key, case_data in cases.items():
+                self.put(case_key, case_data)
+
+    # --- keys ------------------------------------------------------------
+
+    def _pack(self, case_key, create=False):
+        """(packed int key or None, key type, number, year) for a key."""
+        head, _, year = case_key.rpartition('.')
+        key_type, _, number = head.rpartition('.')
+        key_type = key_type.rstrip('.')
+        # Only canonical numbers pack, so '0123' and '123' stay different keys
+        if not (number.isdigit() and number[0] != '0' and year.isdigit() and len(year) == 4 and key_type):
+            return None, key_type, number, year
+        code = self._key_types.encode(key_type) if create else self._key_types.codes.get(key_type)
+        if code is None:
+            return None, key_type, number, year
+        return ((int(number) * 10000 + int(year)) << _TYPE_BITS) | code, key_type, number, year
+
+    def _key_of(self, row):
+        packed = self._row_keys[row]
+        if isinstance(packed, str):
+            return packed
+        number_year, code = divmod(packed, 1 << _TYPE_BITS)
+        number, year = divmod(number_year, 10000)
+        return f"{self._key_types.values[code]}.{number}.{year:04d}"
+
+    def _case_number(self, row):
+        number, year = divmod(self._row_keys[row] >> _TYPE_BITS, 10000)
+        return f"{number}/{year:04d}"
+
+    def _row(self, case_key):
+        packed, _, _, _ = self._pack(case_key)
+        if packed is not None:
+            return self._packed_keys.get(packed)
+        return self._other_keys.get(case_key)
+
+    # --- writes ----------------------------------------------------------
+
+    def _shared(self, value):
+        if value is None:
+            return None
+        return self._strings.setdefault(value, value)
+
+    def put(self, case_key, case_data):
+        """Add or replace the record for a case."""
+        packed, _, number, year = self._pack(case_key, create=True)
+        row = self._packed_keys.get(packed) if packed is not None else self._other_keys.get(case_key)
+        if row is not None:
+            self._unindex(row)
+        else:
+            row = len(self._row_keys)
+            self._row_keys.append(packed if packed is not None else case_key)
+            if packed is not None:
+                self._packed_keys[packed] = row
+            else:
+                self._other_keys[case_key] = row
+            for codes, column in self._categorical.values():
+                column.append(0)
+            for column in self._text.values():
+                column.append(None)
+            self._years.append(0)
+            self._hearings.append(NO_DATE)
+
+        for field, (codes, column) in self._categorical.items():
+            column[row] = codes.encode(case_data.get(field))
+        for field, column in self._text.items():
+            value = case_data.get(field)
+            if field == 'case_number' and packed is not None and value == f"{number}/{year}":
+                value = _FROM_KEY
+            elif isinstance(value, list):
+                value = tuple(value)
+            elif field not in UNIQUE_FIELDS:
+                value = self._shared(value)
+            column[row] = value
+        self._years[row] = int(year) if year and year.isdigit() else 0
+        self._hearings[row] = date_ordinal(case_data.get('next_hearing_date'))
+        self._index(row)
+
+    def _index(self, row):
+        for field, (codes, column) in self._categorical.items():
+            self._postings[field].setdefault(column[row], array('I')).append(row)
+        self._year_postings.setdefault(self._years[row], array('I')).append(row)
+        self._hearing_order = self._hearing_sorted = None
+
+    def _unindex(self, row):
+        for field, (codes, column) in self._categorical.items():
+            self._postings[field][column[row]].remove(row)
+        self._year_postings[self._years[row]].remove(row)
+
+    # --- reads -----------------------------------------------------------
+
+    def _record(self, row):
+        record = {}
+        for field, column, values in self._layout:
+            value = column[row]
+            if values is not None:
+                value = values[value]
+            if value is None:
+                continue
+            if value is _FROM_KEY:
+                value = self._case_number(row)
+            elif value.__class__ is tuple:
+                value = list(value)
+            record[field] = value
+        return record
+
+    def __getitem__(self, case_key):
+        row = self._row(case_key)
+        if row is None:
+            raise KeyError(case_key)
+        return self._record(row)
+
+    def __contains__(self, case_key):
+        return self._row(case_key) is not None
+
+    def __iter__(self):
+        return (self._key_of(row) for row in range(len(self._row_keys)))
+
+    def __len__(self):
+        return len(self._row_keys)
+
+    def values_of(self, field):
+        """Distinct values of a categorical field, e.g. for filter drop-downs."""
+        return sorted(v for v in self._categorical[field][0].values if v is not None)
+
+    def _hearing_index(self):
+        if self._hearing_order is None:
+            hearings = self._hearings
+            order = sorted((row for row in range(len(hearings)) if hearings[row] != NO_DATE), key=hearings.__getitem__)
+            self._hearing_order = array('I', order)
+            self._hearing_sorted = array('i', (hearings[row] for row in order))
+        return self._hearing_order, self._hearing_sorted
+
+    def _matching_rows(self, case_type=None, filing_year=None, judge_name=None, court_hall=None,
+                       case_status=None, hearing_from=None, hearing_to=None):
+        checks = []  # (column, code) every row must match
+        candidates = []
+        for field, value in (('case_type', case_type), ('judge_name', judge_name),
+                             ('court_hall', court_hall), ('case_status', case_status)):
+            if value is None:
+                continue
+            codes, column = self._categorical[field]
+            code = codes.codes.get(value)
+            if code is None:
+                return
+            checks.append((column, code))
+            candidates.append(self._postings[field].get(code, ()))
+        if filing_year is not None:
+            year = int(filing_year)
+            checks.append((self._years, year))
+            candidates.append(self._year_postings.get(year, ()))
+
+        hearing_range = None
+        if hearing_from is not None or hearing_to is not None:
+            hearing_range = (hearing_from.toordinal() if hearing_from else NO_DATE + 1,
+                             hearing_to.toordinal() if hearing_to else sys.maxsize)
+            order, sorted_hearings = self._hearing_index()
+            hearing_rows = order[bisect_left(sorted_hearings, hearing_range[0]):
+                                 bisect_right(sorted_hearings, hearing_range[1])]
+
+        if hearing_range and (not candidates or len(hearing_rows) <= min(len(c) for c in candidates)):
+            rows, hearing_range = hearing_rows, None  # already in range and in date order
+        elif candidates:
+            rows = min(candidates, key=len)
+            if hearing_range:
+                rows = sorted(rows, key=self._hearings.__getitem__)
+        else:
+            rows = range(len(self._row_keys))
+
+        hearings = self._hearings
+        for row in rows:
+            if hearing_range and not hearing_range[0] <= hearings[row] <= hearing_range[1]:
+                continue
+            for column, code in checks:
+                if column[row] != code:
+                    break
+            else:
+                yield row
+
+    def find(self, limit=None, **filters):
+        """
+        (case_key, record) pairs matching every filter given: case_type,
+        filing_year, judge_name, court_hall, case_status, and hearing_from /
+        hearing_to (inclusive datetime.date bounds on the next hearing date).
+        With a hearing bound, results come in hearing date order, otherwise in
+        insertion order. Candidates come from the smallest matching index, so
+        the cost follows the size of the result rather than of the store.
+        """
+        results = []
+        for row in self._matching_rows(**filters):
+            results.append((self._key_of(row), self._record(row)))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def count(self, **filters):
+        """Number of cases matching the find() filters, without building records."""
+        return sum(1 for _ in self._matching_rows(**filters))
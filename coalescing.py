@@ -0,0 +1,78 @@
+import threading
+import logging
+
+from metrics import SINGLEFLIGHT_CALLS, SINGLEFLIGHT_COALESCED
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """A single in-flight execution that any number of callers can wait on."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight block and receive the same return value, or the same exception
+    re-raised. Once the call completes the key is released, so later callers
+    trigger a fresh execution.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {'calls': 0, 'executions': 0, 'coalesced': 0, 'errors': 0}
+
+    def do(self, key, fn):
+        """Run `fn()` for `key`, or wait for and share the result of the call already in flight."""
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._stats['executions'] += 1
+                leader = True
+        SINGLEFLIGHT_CALLS.inc()
+
+        if not leader:
+            SINGLEFLIGHT_COALESCED.inc()
+            logger.info(f"Coalesced lookup for '{key}' onto the in-flight request")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """Get call, execution and coalescing counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+            return stats
@@ -0,0 +1,303 @@
+"""
+Local stand-in for the Delhi High Court case-status site.
+
+Serves the search form, CAPTCHA images and result tables for the cases in
+sample_data.MOCK_CASES (plus any number of synthetic cases derived from
+them), with the same element ids the live scrapers rely on. Page latency,
+the rate of injected server errors and CAPTCHA difficulty are configurable,
+and with a seed every run serves the same CAPTCHAs and faults, so the live
+path can be exercised and load-tested without touching the real site.
+
+Usage:
+    python court_simulator.py [--port 8001] [--expose-answers] [--cases 1000]
+                              [--latency 0.2] [--jitter 0.1] [--error-rate 0.02]
+                              [--captcha-difficulty 2] [--seed 1]
+"""
+import argparse
+import html
+import io
+import random
+import secrets
+import string
+import struct
+import threading
+import time
+
+from flask import Flask, request, make_response
+
+from sample_data import CASE_TYPES, MOCK_CASES
+
+CAPTCHA_ALPHABET = string.ascii_lowercase + string.digits
+SESSION_COOKIE = 'sim_session'
+# PNG text chunk carrying the answer when answers are exposed
+ANSWER_KEYWORD = 'captcha-answer'
+
+# difficulty -> (answer length, noise lines, max vertical jitter px, speckle dots)
+CAPTCHA_DIFFICULTY = {
+    0: (4, 0, 0, 0),
+    1: (5, 2, 3, 0),
+    2: (6, 4, 5, 60),
+    3: (6, 7, 7, 160),
+}
+
+
+def _case_key(case_type, case_number, filing_year):
+    return f"{case_type.strip().rstrip('.')}.{case_number.strip()}.{filing_year.strip()}"
+
+
+def synthetic_cases(count, seed=0, templates=None):
+    """
+    `count` cases derived from MOCK_CASES (or `templates`): the same parties,
+    orders and statuses under new case numbers, with hearing dates spread
+    over a year and cases spread over 40 court halls. Keyed like MOCK_CASES; the same seed gives the same cases.
+    """
+    return dict(iter_synthetic_cases(count, seed, templates))
+
+
+def iter_synthetic_cases(count, seed=0, templates=None):
+    """synthetic_cases() as a stream of (case_key, case_data) pairs."""
+    templates = list((MOCK_CASES if templates is None else templates).items())
+    rng = random.Random(seed)
+    for i in range(count):
+        key, template = templates[i % len(templates)]
+        case_type, year = template['case_type'], key.rsplit('.', 1)[1]
+        number = str(10000 + i)
+        case = dict(template)
+        case['case_number'] = f"{number}/{year}"
+        case['next_hearing_date'] = f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{int(year) + 1}"
+        case['court_hall'] = f"Court No. {rng.randint(1, 40)}"
+        if template.get('pdf_link'):
+            case['pdf_link'] = template['pdf_link'].replace('.pdf', f'_{number}.pdf')
+        yield _case_key(case_type, number, year), case
+
+
+def render_captcha(text, rng, difficulty=1, expose_answer=False):
+    """Render CAPTCHA text to PNG bytes, with more noise at higher difficulty."""
+    from PIL import Image, ImageDraw
+    from PIL.PngImagePlugin import PngInfo
+
+    _, lines, jitter, speckles = CAPTCHA_DIFFICULTY[difficulty]
+    width = 20 + len(text) * 20
+    image = Image.new('L', (width, 40), color=255)
+    draw = ImageDraw.Draw(image)
+    for i, char in enumerate(text):
+        draw.text((10 + i * 20, 12 + rng.randint(-jitter, jitter)), char, fill=0)
+    for _ in range(lines):
+        draw.line([(0, rng.randint(5, 35)), (width, rng.randint(5, 35))], fill=90, width=1)
+    for _ in range(speckles):
+        draw.point((rng.randrange(width), rng.randrange(40)), fill=rng.choice((0, 128)))
+    info = None
+    if expose_answer:
+        info = PngInfo()
+        info.add_text(ANSWER_KEYWORD, text)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', pnginfo=info)
+    return buffer.getvalue()
+
+
+def read_captcha_answer(png_bytes):
+    """The answer embedded by a simulator run with expose_answers, or None."""
+    offset = 8  # PNG signature
+    while offset + 8 <= len(png_bytes):
+        length, chunk_type = struct.unpack('>I4s', png_bytes[offset:offset + 8])
+        if chunk_type == b'tEXt':
+            keyword, _, text = png_bytes[offset + 8:offset + 8 + length].partition(b'\0')
+            if keyword.decode('latin-1') == ANSWER_KEYWORD:
+                return text.decode('latin-1')
+        elif chunk_type == b'IDAT':
+            return None  # text chunks written by PIL precede the image data
+        offset += 12 + length
+    return None
+
+
+class AnswerKeySolver:
+    """
+    CAPTCHA solver for simulator runs with expose_answers: reads the answer
+    embedded in the image, so load tests measure everything but OCR.
+    """
+    def solve(self, image_bytes):
+        return read_captcha_answer(image_bytes)
+
+
+def render_form(token, message=''):
+    options = ''.join(
+        f'<option value="{html.escape(t.rstrip("."))}">{html.escape(t.rstrip("."))}</option>' for t in CASE_TYPES
+    )
+    alert = f'<div class="alert alert-danger">{html.escape(message)}</div>' if message else ''
+    return f'''<!DOCTYPE html>
+<html><head><title>Case Status</title></head>
+<body>
+{alert}
+<form id="case-status-form" method="POST" action="/case-status">
+  <input type="hidden" name="_token" value="{token}">
+  <select id="c_type" name="c_type"><option value="">Select</option>{options}</select>
+  <input id="c_no" name="c_no" type="text">
+  <input id="c_year" name="c_year" type="text">
+  <img id="captcha-image" src="/captcha?v={secrets.token_hex(4)}" alt="captcha">
+  <a id="reload-captcha" href="#">Reload</a>
+  <input id="captcha" name="captcha" type="text">
+  <button id="search" type="submit">Search</button>
+</form>
+<script>
+document.getElementById('reload-captcha').addEventListener('click', function (event) {{
+  event.preventDefault();
+  document.getElementById('captcha-image').src = '/captcha?v=' + Math.random().toString(16).slice(2);
+}});
+</script>
+</body></html>'''
+
+
+def render_result(case):
+    rows = [
+        ('Case Title', case.get('case_title', '')),
+        ('Filing Date', case.get('filing_date', '')),
+        ('Next Date of Hearing', case.get('next_hearing_date', '')),
+        ('Status', case.get('case_status', '')),
+        ('Judge', case.get('judge_name', '')),
+        ('Court Hall', case.get('court_hall', '')),
+        ('Latest Order', case.get('latest_order', '')),
+    ]
+    body = ''.join(f'<tr><td>{html.escape(label)}</td><td>{html.escape(value)}</td></tr>' for label, value in rows)
+    link = case.get('pdf_link')
+    if link:
+        body += f'<tr><td>Orders</td><td><a href="{html.escape(link)}">Order</a></td></tr>'
+    return f'''<!DOCTYPE html>
+<html><head><title>Case Status</title></head>
+<body><table class="table table-bordered">{body}</table></body></html>'''
+
+
+def create_simulator_app(cases=None, expose_answers=False, seed=None, latency=0.0, jitter=0.0,
+                         error_rate=0.0, captcha_difficulty=1):
+    """
+    Build the simulator Flask app.
+
+    - `expose_answers`: CAPTCHA responses carry the answer in an
+      X-Captcha-Answer header and in the PNG itself (see AnswerKeySolver).
+    - `latency` / `jitter`: every request is delayed by latency seconds plus
+      up to `jitter` more, uniformly.
+    - `error_rate`: fraction of requests answered with a 503.
+    - `captcha_difficulty`: 0 (clean) to 3 (long, noisy), see CAPTCHA_DIFFICULTY.
+
+    Counters are served as JSON at /sim/stats.
+    """
+    cases = MOCK_CASES if cases is None else cases
+    rng = random.Random(seed)
+    # Faults and delays draw from their own stream so they do not shift the CAPTCHAs
+    fault_rng = random.Random(None if seed is None else seed + 1)
+    answer_length = CAPTCHA_DIFFICULTY[captcha_difficulty][0]
+    lock = threading.Lock()
+    sessions = {}  # session id -> {'token': ..., 'captcha': ...}
+    stats = {'requests': 0, 'injected_errors': 0, 'captchas': 0, 'captcha_failures': 0,
+             'found': 0, 'not_found': 0}
+
+    app = Flask(__name__)
+
+    @app.before_request
+    def simulate_conditions():
+        if request.path == '/sim/stats':
+            return None
+        with lock:
+            stats['requests'] += 1
+            delay = latency + (fault_rng.uniform(0, jitter) if jitter else 0.0)
+            fail = error_rate and fault_rng.random() < error_rate
+            if fail:
+                stats['injected_errors'] += 1
+        if delay:
+            time.sleep(delay)
+        if fail:
+            return make_response('Service Temporarily Unavailable', 503)
+        return None
+
+    @app.route('/sim/stats')
+    def simulator_stats():
+        with lock:
+            return dict(stats, sessions=len(sessions), cases=len(cases))
+
+    def current_session():
+        session_id = request.cookies.get(SESSION_COOKIE)
+        with lock:
+            if session_id not in sessions:
+                session_id = secrets.token_hex(8)
+                sessions[session_id] = {'token': secrets.token_hex(8), 'captcha': None}
+            return session_id, sessions[session_id]
+
+    def respond(body, session_id, mimetype='text/html'):
+        response = make_response(body)
+        response.mimetype = mimetype
+        response.set_cookie(SESSION_COOKIE, session_id)
+        return response
+
+    @app.route('/case-status', methods=['GET'])
+    def case_status_form():
+        session_id, state = current_session()
+        return respond(render_form(state['token']), session_id)
+
+    @app.route('/captcha')
+    def captcha():
+        session_id, state = current_session()
+        with lock:
+            answer = ''.join(rng.choice(CAPTCHA_ALPHABET) for _ in range(answer_length))
+            state['captcha'] = answer
+            stats['captchas'] += 1
+            image = render_captcha(answer, rng, captcha_difficulty, expose_answers)
+        response = respond(image, session_id, mimetype='image/png')
+        if expose_answers:
+            response.headers['X-Captcha-Answer'] = answer
+        return response
+
+    @app.route('/case-status', methods=['POST'])
+    def case_status_search():
+        session_id, state = current_session()
+        with lock:
+            expected, state['captcha'] = state['captcha'], None  # CAPTCHAs are single use
+        if request.form.get('_token') != state['token']:
+            return respond(render_form(state['token'], 'Session expired.'), session_id)
+        if not expected or request.form.get('captcha', '').strip().lower() != expected:
+            with lock:
+                stats['captcha_failures'] += 1
+            return respond(render_form(state['token'], 'Invalid captcha.'), session_id)
+
+        key = _case_key(request.form.get('c_type', ''), request.form.get('c_no', ''), request.form.get('c_year', ''))
+        case = cases.get(key)
+        with lock:
+            stats['found' if case is not None else 'not_found'] += 1
+        if case is None:
+            return respond('<html><body><p>No record found.</p></body></html>', session_id)
+        return respond(render_result(case), session_id)
+
+    return app
+
+
+def start_simulator(host='127.0.0.1', port=0, **kwargs):
+    """
+    Start the simulator on a background thread.
+    Returns (server, base_url); call server.shutdown() to stop it.
+    """
+    from werkzeug.serving import make_server
+
+    server = make_server(host, port, create_simulator_app(**kwargs), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local court-site simulator")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--expose-answers', action='store_true', help="Send CAPTCHA answers in a response header")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--cases', type=int, default=0, help="Synthetic cases to serve besides MOCK_CASES")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Up to this many more seconds, uniformly")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with a 503")
+    parser.add_argument('--captcha-difficulty', type=int, default=1, choices=sorted(CAPTCHA_DIFFICULTY))
+    args = parser.parse_args()
+    cases = dict(MOCK_CASES, **synthetic_cases(args.cases, seed=args.seed or 0))
+    create_simulator_app(
+        cases=cases, expose_answers=args.expose_answers, seed=args.seed, latency=args.latency,
+        jitter=args.jitter, error_rate=args.error_rate, captcha_difficulty=args.captcha_difficulty
+    ).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,211 @@
 import sqlite3
 import json
-from datetime import datetime
+import time
+import threading
 import os
 
+from case_parser import iso_court_date
+from retention import INSERT_BLOB_SQL, payload_hash, inflate_payload
+from migrations import apply_migrations, rebuild_stats_rollups, LATENCY_BUCKETS_MS
+from metrics import instrument, DB_LOCK_WAIT_SECONDS, DB_LOCKED_ERRORS
+
+# Connection tuning applied to every connection
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KIB = 16 * 1024
+MMAP_SIZE = 256 * 1024 * 1024
+STATEMENT_CACHE_SIZE = 256
+
+INSERT_QUERY_SQL = '''
+    INSERT INTO queries (id, case_type, case_number, filing_year, ip_address, user_agent)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_RESPONSE_SQL = '''
+    INSERT INTO responses (query_id, raw_response, payload_hash, status, error_message, latency_ms)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# The payload of a responses row aliased r, read back from response_blobs
+PARSED_DATA_SQL = '''(
+    SELECT inflate_payload(b.encoding, b.data) FROM response_blobs b WHERE b.hash = r.payload_hash
+) AS parsed_data'''
+
+# case_data keeps the latest record per normalized case key (scraper.make_case_key), bound
+# by the caller rather than looked up from queries, which may not hold the query row yet
+INSERT_CASE_DATA_SQL = '''
+    INSERT INTO case_data (
+        case_number, case_type, filing_year,
+        petitioner_name, respondent_name, filing_date,
+        next_hearing_date, case_status, judge_name,
+        court_hall, pdf_links, last_order_date,
+        case_title, latest_order,
+        next_hearing_on, filed_on,
+        query_id, case_key
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (case_key) DO UPDATE SET
+        query_id = excluded.query_id,
+        case_number = excluded.case_number,
+        case_type = excluded.case_type,
+        filing_year = excluded.filing_year,
+        petitioner_name = excluded.petitioner_name,
+        respondent_name = excluded.respondent_name,
+        filing_date = excluded.filing_date,
+        next_hearing_date = excluded.next_hearing_date,
+        case_status = excluded.case_status,
+        judge_name = excluded.judge_name,
+        court_hall = excluded.court_hall,
+        pdf_links = excluded.pdf_links,
+        last_order_date = excluded.last_order_date,
+        case_title = excluded.case_title,
+        latest_order = excluded.latest_order,
+        next_hearing_on = excluded.next_hearing_on,
+        filed_on = excluded.filed_on,
+        timestamp = CURRENT_TIMESTAMP
+'''
+
+
+def response_rows(query_id, response_data, status, error_message=None, raw_response=None, latency_ms=None):
+    """
+    Parameters for INSERT_BLOB_SQL and INSERT_RESPONSE_SQL. The payload is
+    stored once per distinct content; raw_response only if it differs from it.
+    """
+    payload = json.dumps(response_data)
+    digest = payload_hash(payload)
+    if raw_response == payload:
+        raw_response = None
+    return (digest, payload, len(payload.encode('utf-8'))), (query_id, raw_response, digest, status, error_message, latency_ms)
+
+
+def stores_case_data(status, response_data, case_key):
+    """Whether a logged response goes into case_data; raises if it should but has no case key"""
+    if status != 'success' or not response_data:
+        return False
+    if not case_key:
+        raise ValueError("A case_key is required to log a successful response")
+    return True
+
+
+def case_data_row(query_id, case_key, response_data):
+    """Parameters for INSERT_CASE_DATA_SQL"""
+    return (
+        response_data.get('case_number', ''),
+        response_data.get('case_type', ''),
+        response_data.get('filing_year', ''),
+        response_data.get('petitioner_name', ''),
+        response_data.get('respondent_name', ''),
+        response_data.get('filing_date', ''),
+        response_data.get('next_hearing_date', ''),
+        response_data.get('case_status', ''),
+        response_data.get('judge_name', ''),
+        response_data.get('court_hall', ''),
+        json.dumps(response_data.get('pdf_links', [])),
+        response_data.get('last_order_date', ''),
+        response_data.get('case_title', ''),
+        response_data.get('latest_order', ''),
+        iso_court_date(response_data.get('next_hearing_date')),
+        iso_court_date(response_data.get('filing_date')),
+        query_id,
+        case_key,
+    )
+
+def build_fts_query(text, prefix=True):
+    """
+    Turn free text into a safe FTS5 MATCH expression: every word becomes a
+    quoted phrase, words ending in '*' are prefix queries, and with `prefix`
+    the last word is matched as a prefix too (search-as-you-type).
+    """
+    terms = []
+    words = text.split()
+    for i, word in enumerate(words):
+        is_prefix = word.endswith('*') or (prefix and i == len(words) - 1)
+        word = word.rstrip('*').replace('"', '')
+        if word:
+            terms.append(f'"{word}"*' if is_prefix else f'"{word}"')
+    return ' '.join(terms)
+
+
+def histogram_percentile(histogram, q):
+    """
+    Estimate a percentile from {bucket upper bound ms: count}, reporting the
+    upper bound of the bucket it falls in (None for the +Inf bucket or no data).
+    """
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bound in LATENCY_BUCKETS_MS:
+        seen += histogram.get(bound, 0)
+        if seen >= rank:
+            return bound
+    return None
+
+
+def _count_locked(error):
+    if isinstance(error, sqlite3.OperationalError) and 'locked' in str(error):
+        DB_LOCKED_ERRORS.inc()
+
+
+@instrument('db', exclude=('get_connection', 'close', 'begin_immediate'), on_error=_count_locked)
 class DatabaseManager:
-    def __init__(self, db_path='data/court_data.db'):
+    def __init__(self, db_path='data/court_data.db', journal_mode='WAL', synchronous='NORMAL',
+                 busy_timeout_ms=BUSY_TIMEOUT_MS, cache_size_kib=CACHE_SIZE_KIB, mmap_size=MMAP_SIZE):
         self.db_path = db_path
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self._local = threading.local()
         # Ensure the data directory exists
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
     
-    def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
+    def _connect(self):
+        """Open and tune a new connection"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
         conn.row_factory = sqlite3.Row  # Enable dictionary-like access
+        # Lets retention hand freed pages back with incremental VACUUM. Only takes effect
+        # before the file is initialized (existing databases convert on the first run)
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.create_function('inflate_payload', 2, inflate_payload, deterministic=True)
+        return conn
+    
+    def get_connection(self):
+        """
+        Get this thread's database connection.
+        Connections are reused for the life of the thread and reopened after a fork.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
         return conn
     
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+    
+    def begin_immediate(self, conn):
+        """Start a write transaction, recording how long the write lock took to get"""
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        DB_LOCK_WAIT_SECONDS.observe(time.perf_counter() - started)
+    
     def initialize_database(self):
         """Create database tables if they don't exist"""
         with self.get_connection() as conn:
@@ -69,57 +260,126 @@ class DatabaseManager:
                 )
             ''')
             
+            # Create jobs table for asynchronous scrapes
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    query_id INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',  -- queued, running, succeeded, failed
+                    error_message TEXT,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    started_at DATETIME,
+                    finished_at DATETIME,
+                    FOREIGN KEY (query_id) REFERENCES queries (id)
+                )
+            ''')
+            
             conn.commit()
+            
+            # Indexes and later schema changes
+            apply_migrations(conn)
     
     def log_query(self, case_type, case_number, filing_year, ip_address=None, user_agent=None):
         """Log a search query and return the query ID"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO queries (case_type, case_number, filing_year, ip_address, user_agent)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (case_type, case_number, filing_year, ip_address, user_agent))
+            self.begin_immediate(conn)
+            cursor.execute(INSERT_QUERY_SQL, (None, case_type, case_number, filing_year, ip_address, user_agent))
             conn.commit()
             return cursor.lastrowid
     
-    def log_response(self, query_id, response_data, status, error_message=None, raw_response=None):
-        """Log the response for a query"""
+    def log_response(self, query_id, response_data, status, error_message=None, raw_response=None, latency_ms=None,
+                     case_key=None):
+        """Log the response for a query; successful ones also update case_data under `case_key`"""
+        store_case = stores_case_data(status, response_data, case_key)
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            self.begin_immediate(conn)
             
-            # Store response in responses table
-            cursor.execute('''
-                INSERT INTO responses (query_id, raw_response, parsed_data, status, error_message)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (query_id, raw_response, json.dumps(response_data), status, error_message))
+            # Store response in responses table, its payload once per distinct content
+            blob, response = response_rows(query_id, response_data, status, error_message, raw_response, latency_ms)
+            cursor.execute(INSERT_BLOB_SQL, blob)
+            cursor.execute(INSERT_RESPONSE_SQL, response)
             
             # If successful and we have structured data, store in case_data table
-            if status == 'success' and response_data:
-                cursor.execute('''
-                    INSERT INTO case_data (
-                        query_id, case_number, case_type, filing_year,
-                        petitioner_name, respondent_name, filing_date,
-                        next_hearing_date, case_status, judge_name,
-                        court_hall, pdf_links, last_order_date
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    query_id,
-                    response_data.get('case_number', ''),
-                    response_data.get('case_type', ''),
-                    response_data.get('filing_year', ''),
-                    response_data.get('petitioner_name', ''),
-                    response_data.get('respondent_name', ''),
-                    response_data.get('filing_date', ''),
-                    response_data.get('next_hearing_date', ''),
-                    response_data.get('case_status', ''),
-                    response_data.get('judge_name', ''),
-                    response_data.get('court_hall', ''),
-                    json.dumps(response_data.get('pdf_links', [])),
-                    response_data.get('last_order_date', '')
-                ))
+            if store_case:
+                cursor.execute(INSERT_CASE_DATA_SQL, case_data_row(query_id, case_key, response_data))
             
             conn.commit()
     
+    def reserve_query_ids(self, count):
+        """
+        Reserve a block of `count` query IDs and return the first one.
+        Bumps the AUTOINCREMENT sequence so no other writer can be handed these IDs.
+        """
+        with self.get_connection() as conn:
+            self.begin_immediate(conn)
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'queries'").fetchone()
+            if row is None:
+                max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM queries").fetchone()[0]
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('queries', ?)", (max_id + count,))
+                first = max_id + 1
+            else:
+                conn.execute("UPDATE sqlite_sequence SET seq = seq + ? WHERE name = 'queries'", (count,))
+                first = row['seq'] + 1
+            conn.commit()
+            return first
+    
+    def create_job(self, query_id):
+        """Create a queued job for a logged query and return the job ID"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO jobs (query_id, status) VALUES (?, 'queued')
+            ''', (query_id,))
+            conn.commit()
+            return cursor.lastrowid
+    
+    def update_job_status(self, job_id, status, error_message=None):
+        """Move a job to a new state, stamping start/finish times"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if status == 'running':
+                cursor.execute('''
+                    UPDATE jobs SET status = ?, started_at = CURRENT_TIMESTAMP WHERE id = ?
+                ''', (status, job_id))
+            else:
+                cursor.execute('''
+                    UPDATE jobs SET status = ?, error_message = ?, finished_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', (status, error_message, job_id))
+            conn.commit()
+    
+    def get_job(self, job_id):
+        """Get a job with its query and the latest logged response"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT j.*, q.case_type, q.case_number, q.filing_year,
+                       {PARSED_DATA_SQL}, r.status AS response_status
+                FROM jobs j
+                JOIN queries q ON q.id = j.query_id
+                LEFT JOIN responses r ON r.id = (
+                    SELECT MAX(id) FROM responses WHERE query_id = j.query_id
+                )
+                WHERE j.id = ?
+            ''', (job_id,))
+            return cursor.fetchone()
+    
+    def get_batch_results(self, batch_tag):
+        """Get the logged responses of every query tagged with a batch run's user agent"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT q.case_type, q.case_number, q.filing_year,
+                       r.status, {PARSED_DATA_SQL}, r.error_message
+                FROM queries q
+                JOIN responses r ON q.id = r.query_id
+                WHERE q.user_agent = ?
+                ORDER BY r.id
+            ''', (batch_tag,))
+            return cursor.fetchall()
+    
     def get_query_history(self, limit=50):
         """Get recent query history"""
         with self.get_connection() as conn:
@@ -142,6 +402,171 @@ class DatabaseManager:
             ''', (query_id,))
             return cursor.fetchone()
     
+    def get_latest_response(self, case_type, case_number, filing_year):
+        """Get the most recent cacheable response (success or not-found) for a case"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # The payload is read for the one row picked, not for every candidate
+            cursor.execute(f'''
+                SELECT {PARSED_DATA_SQL}, r.status, r.error_message, r.timestamp
+                FROM (
+                    SELECT r.*
+                    FROM queries q
+                    JOIN responses r ON q.id = r.query_id
+                    WHERE rtrim(q.case_type, '.') = ? AND q.case_number = ? AND q.filing_year = ?
+                      AND (r.status = 'success'
+                           OR (r.status = 'failed' AND lower(r.error_message) LIKE '%not found%'))
+                    ORDER BY r.id DESC
+                    LIMIT 1
+                ) r
+            ''', (case_type.rstrip('.'), case_number, filing_year))
+            return cursor.fetchone()
+    
+    def get_case_responses(self, case_type, case_number, filing_year, limit=500):
+        """Get the parsed data of a case's successful responses, oldest first"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT parsed_data FROM (
+                    SELECT r.id, {PARSED_DATA_SQL}
+                    FROM queries q
+                    JOIN responses r ON q.id = r.query_id
+                    WHERE rtrim(q.case_type, '.') = ? AND q.case_number = ? AND q.filing_year = ?
+                      AND r.status = 'success'
+                    ORDER BY r.id DESC
+                    LIMIT ?
+                ) ORDER BY id
+            ''', (case_type.rstrip('.'), case_number, filing_year, limit))
+            return [json.loads(row['parsed_data']) for row in cursor.fetchall() if row['parsed_data']]
+    
+    def get_latest_case_data(self, case_key):
+        """Get the latest structured record for a normalized case key"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM case_data WHERE case_key = ?
+            ''', (case_key,))
+            return cursor.fetchone()
+    
+    def explain_query_plan(self, sql, params=()):
+        """Get the EXPLAIN QUERY PLAN detail lines for a statement"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row['detail'] for row in cursor.fetchall()]
+    
+    def add_watch(self, case_key, case_type, case_number, filing_year, next_check_at):
+        """Track a case; returns (watch_id, created)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO watchlist (case_key, case_type, case_number, filing_year, next_check_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (case_key) DO NOTHING
+            ''', (case_key, case_type, case_number, filing_year, next_check_at))
+            created = cursor.rowcount == 1
+            conn.commit()
+            cursor.execute("SELECT id FROM watchlist WHERE case_key = ?", (case_key,))
+            return cursor.fetchone()['id'], created
+    
+    def remove_watch(self, case_key):
+        """Stop tracking a case; returns True if it was tracked"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM watchlist WHERE case_key = ?", (case_key,))
+            conn.commit()
+            return cursor.rowcount > 0
+    
+    def get_watchlist(self):
+        """Get every tracked case, soonest check first"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, case_key, case_type, case_number, filing_year, added_at, next_check_at,
+                       next_hearing_at, last_checked_at, consecutive_failures, content_hash
+                FROM watchlist
+                ORDER BY next_check_at
+            ''')
+            return cursor.fetchall()
+    
+    def claim_due_watches(self, now, limit, lease_seconds):
+        """
+        Claim up to `limit` tracked cases whose check is due, hearings soonest
+        first. Claimed rows are pushed `lease_seconds` into the future so other
+        processes running the scheduler skip them.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self.begin_immediate(conn)
+            try:
+                cursor.execute('''
+                    SELECT * FROM watchlist
+                    WHERE next_check_at <= ?
+                    ORDER BY next_hearing_at IS NULL, next_hearing_at, next_check_at
+                    LIMIT ?
+                ''', (now, limit))
+                rows = cursor.fetchall()
+                cursor.executemany(
+                    "UPDATE watchlist SET next_check_at = ? WHERE id = ?",
+                    [(now + lease_seconds, row['id']) for row in rows]
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            return rows
+    
+    def reschedule_watch(self, watch_id, checked_at, next_check_at, next_hearing_at=None, failed=False):
+        """Record a check that found nothing new (or failed) and schedule the next one"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE watchlist
+                SET last_checked_at = ?, next_check_at = ?,
+                    next_hearing_at = COALESCE(?, next_hearing_at),
+                    consecutive_failures = CASE WHEN ? THEN consecutive_failures + 1 ELSE 0 END
+                WHERE id = ?
+            ''', (checked_at, next_check_at, next_hearing_at, failed, watch_id))
+            conn.commit()
+    
+    def record_watch_change(self, watch_id, case_key, snapshot, content_hash, checked_at, next_check_at,
+                            next_hearing_at=None, event_type=None, changes=None):
+        """
+        Store a tracked case's new snapshot and, when `event_type` is given,
+        append a change event, in one transaction. Returns the event ID or None.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE watchlist
+                SET snapshot = ?, content_hash = ?, last_checked_at = ?, next_check_at = ?,
+                    next_hearing_at = ?, consecutive_failures = 0
+                WHERE id = ?
+            ''', (json.dumps(snapshot), content_hash, checked_at, next_check_at, next_hearing_at, watch_id))
+            event_id = None
+            if event_type:
+                cursor.execute('''
+                    INSERT INTO case_events (watch_id, case_key, event_type, changes, content_hash)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (watch_id, case_key, event_type, json.dumps(changes or {}), content_hash))
+                event_id = cursor.lastrowid
+            conn.commit()
+            return event_id
+    
+    def get_case_events(self, after_id=0, limit=100, case_key=None):
+        """Get change events newer than `after_id`, oldest first, optionally for one case"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if case_key:
+                cursor.execute('''
+                    SELECT * FROM case_events WHERE case_key = ? AND id > ? ORDER BY id LIMIT ?
+                ''', (case_key, after_id, limit))
+            else:
+                cursor.execute('''
+                    SELECT * FROM case_events WHERE id > ? ORDER BY id LIMIT ?
+                ''', (after_id, limit))
+            return cursor.fetchall()
+    
     def search_cases(self, case_number=None, case_type=None, petitioner_name=None):
         """Search for cases in the database"""
         with self.get_connection() as conn:
@@ -167,33 +592,312 @@ class DatabaseManager:
             cursor.execute(query, params)
             return cursor.fetchall()
     
-    def get_stats(self):
-        """Get database statistics"""
+    def search_cases_fulltext(self, text, limit=20, after=None, prefix=True):
+        """
+        Full-text search over case numbers, titles, parties, judge, court hall and order text.
+        Results are ranked by bm25; pass the (score, id) of the last row as `after`
+        to fetch the next page.
+        """
+        match = build_fts_query(text, prefix=prefix)
+        if not match:
+            return []
+        after_score, after_id = after if after else (float('-inf'), 0)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                WITH hits AS (
+                    SELECT rowid AS id,
+                           bm25(case_data_fts) AS score,
+                           snippet(case_data_fts, -1, '<mark>', '</mark>', '...', 16) AS snippet
+                    FROM case_data_fts
+                    WHERE case_data_fts MATCH ?
+                )
+                SELECT c.*, hits.score, hits.snippet
+                FROM hits
+                JOIN case_data c ON c.id = hits.id
+                WHERE (hits.score, hits.id) > (?, ?)
+                ORDER BY hits.score, hits.id
+                LIMIT ?
+            ''', (match, after_score, after_id, limit))
+            return cursor.fetchall()
+    
+    def get_hearing_calendar(self, start, end, court_hall=None, limit=100, after=None):
+        """
+        Cases with a next hearing between ISO dates `start` and `end` (inclusive),
+        ordered by date, court hall and id, optionally for one court hall.
+        Pass the (next_hearing_on, court_hall, id) of the last row as `after`
+        to fetch the next page.
+        """
+        # Range scans of idx_case_data_hearing, or idx_case_data_hall_hearing for one hall
+        query = "SELECT * FROM case_data WHERE next_hearing_on BETWEEN ? AND ?"
+        params = [start, end]
+        if court_hall is not None:
+            query += " AND court_hall = ?"
+            params.append(court_hall)
+        if after:
+            query += " AND (next_hearing_on, court_hall, id) > (?, ?, ?)"
+            params.extend(after)
+        query += " ORDER BY next_hearing_on, court_hall, id LIMIT ?"
+        params.append(limit)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return cursor.fetchall()
+    
+    def count_hearings(self, start, end, court_hall=None):
+        """(next_hearing_on, court_hall, count) for every day and court hall with hearings in the range"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            query = '''
+                SELECT next_hearing_on, court_hall, COUNT(*) AS count
+                FROM case_data
+                WHERE next_hearing_on BETWEEN ? AND ?
+            '''
+            params = [start, end]
+            if court_hall is not None:
+                query += " AND court_hall = ?"
+                params.append(court_hall)
+            query += " GROUP BY next_hearing_on, court_hall ORDER BY next_hearing_on, court_hall"
+            cursor.execute(query, params)
+            return cursor.fetchall()
+    
+    def get_stats(self, hours=24):
+        """
+        Get database statistics from the incrementally maintained rollup tables.
+        `hourly` covers the last `hours` hours with latency percentiles in ms.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            stats = {}
-            
-            # Total queries
-            cursor.execute("SELECT COUNT(*) FROM queries")
-            stats['total_queries'] = cursor.fetchone()[0]
-            
-            # Successful queries
-            cursor.execute("SELECT COUNT(*) FROM responses WHERE status = 'success'")
-            stats['successful_queries'] = cursor.fetchone()[0]
+            cursor.execute("SELECT name, value FROM stats_counters")
+            counters = {row['name']: row['value'] for row in cursor.fetchall()}
             
-            # Failed queries
-            cursor.execute("SELECT COUNT(*) FROM responses WHERE status = 'failed'")
-            stats['failed_queries'] = cursor.fetchone()[0]
+            stats = {
+                'total_queries': counters.get('total_queries', 0),
+                'successful_queries': counters.get('responses_success', 0),
+                'failed_queries': counters.get('responses_failed', 0),
+                'cached_queries': counters.get('responses_cached', 0),
+            }
             
             # Most searched case types
             cursor.execute('''
-                SELECT case_type, COUNT(*) as count 
-                FROM queries 
-                GROUP BY case_type 
-                ORDER BY count DESC 
+                SELECT case_type, count
+                FROM stats_case_types
+                ORDER BY count DESC
                 LIMIT 5
             ''')
             stats['top_case_types'] = cursor.fetchall()
             
+            # Per-hour buckets
+            cursor.execute('''
+                SELECT * FROM stats_hourly
+                WHERE hour >= strftime('%Y-%m-%d %H:00', 'now', ?)
+                ORDER BY hour
+            ''', (f'-{int(hours)} hours',))
+            hourly = {row['hour']: dict(row) for row in cursor.fetchall()}
+            
+            cursor.execute('''
+                SELECT hour, bucket_ms, count FROM stats_latency_hourly
+                WHERE hour >= strftime('%Y-%m-%d %H:00', 'now', ?)
+            ''', (f'-{int(hours)} hours',))
+            histograms = {}
+            for row in cursor.fetchall():
+                histograms.setdefault(row['hour'], {})[row['bucket_ms']] = row['count']
+            
+            for hour, bucket in hourly.items():
+                histogram = histograms.get(hour, {})
+                for name, q in (('p50_ms', 0.5), ('p95_ms', 0.95), ('p99_ms', 0.99)):
+                    bucket[name] = histogram_percentile(histogram, q)
+            stats['hourly'] = list(hourly.values())
+            
             return stats
+    
+    def rebuild_stats(self):
+        """
+        Reconcile the stats rollup tables against the raw queries and responses.
+        Rows already archived by retention are no longer counted.
+        """
+        with self.get_connection() as conn:
+            self.begin_immediate(conn)
+            rebuild_stats_rollups(conn.cursor())
+            conn.commit()
+    
+    def sample_case_queries(self, limit):
+        """(case_type, case_number, filing_year) of up to `limit` random stored cases, as they were queried"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT q.case_type, q.case_number, q.filing_year
+                FROM case_data c
+                JOIN queries q ON q.id = c.query_id
+                ORDER BY random()
+                LIMIT ?
+            ''', (limit,))
+            return cursor.fetchall()
+    
+    def get_cold_blobs(self, cutoff, min_size, after='', limit=1000):
+        """
+        Uncompressed payloads of at least `min_size` bytes that no response has
+        used since `cutoff`, by hash; pass the last hash as `after` for the next batch.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT hash, data FROM response_blobs b
+                WHERE hash > ? AND encoding = 'plain' AND size >= ?
+                  AND NOT EXISTS (
+                      SELECT 1 FROM responses r WHERE r.payload_hash = b.hash AND r.timestamp >= ?
+                  )
+                ORDER BY hash
+                LIMIT ?
+            ''', (after, min_size, cutoff, limit))
+            return cursor.fetchall()
+    
+    def update_blobs(self, updates):
+        """Store (encoding, data, hash) re-encoded payloads"""
+        with self.get_connection() as conn:
+            self.begin_immediate(conn)
+            conn.executemany("UPDATE response_blobs SET encoding = ?, data = ? WHERE hash = ?", updates)
+            conn.commit()
+    
+    def get_archivable_responses(self, cutoff, after=None, limit=1000):
+        """
+        Responses logged before `cutoff`, oldest first, with their query and
+        payload, except those behind a current case_data row. Pass the
+        (timestamp, id) of the last row as `after` to fetch the next batch.
+        """
+        after_timestamp, after_id = after if after else ('', 0)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT r.id, r.query_id, r.status, r.error_message, r.timestamp, r.latency_ms,
+                       r.raw_response, r.payload_hash, {PARSED_DATA_SQL},
+                       q.case_type, q.case_number, q.filing_year, q.timestamp AS queried_at,
+                       q.ip_address, q.user_agent
+                FROM responses r
+                LEFT JOIN queries q ON q.id = r.query_id
+                WHERE r.timestamp < ? AND (r.timestamp, r.id) > (?, ?)
+                  AND NOT EXISTS (SELECT 1 FROM case_data c WHERE c.query_id = r.query_id)
+                ORDER BY r.timestamp, r.id
+                LIMIT ?
+            ''', (cutoff, after_timestamp, after_id, limit))
+            return cursor.fetchall()
+    
+    def delete_responses(self, response_ids):
+        """Delete responses by ID; returns {'responses': deleted}"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self.begin_immediate(conn)
+            cursor.executemany("DELETE FROM responses WHERE id = ?", [(i,) for i in response_ids])
+            deleted = cursor.rowcount
+            conn.commit()
+            return {'responses': deleted}
+    
+    def delete_orphans(self, query_ids, payload_hashes):
+        """
+        After responses are deleted: delete those of `query_ids` with no
+        responses or case_data left (and their finished jobs), and the
+        payloads of `payload_hashes` no response uses any more.
+        """
+        deleted = {'jobs': 0, 'queries': 0, 'blobs': 0}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            for i in range(0, max(len(query_ids), len(payload_hashes)), 1000):
+                self.begin_immediate(conn)
+                ids = [(query_id,) for query_id in query_ids[i:i + 1000]]
+                cursor.executemany('''
+                    DELETE FROM jobs
+                    WHERE query_id = ? AND status IN ('succeeded', 'failed')
+                      AND NOT EXISTS (SELECT 1 FROM responses r WHERE r.query_id = jobs.query_id)
+                ''', ids)
+                deleted['jobs'] += cursor.rowcount
+                cursor.executemany('''
+                    DELETE FROM queries
+                    WHERE id = ?
+                      AND NOT EXISTS (SELECT 1 FROM responses r WHERE r.query_id = queries.id)
+                      AND NOT EXISTS (SELECT 1 FROM case_data c WHERE c.query_id = queries.id)
+                      AND NOT EXISTS (SELECT 1 FROM jobs j WHERE j.query_id = queries.id)
+                ''', ids)
+                deleted['queries'] += cursor.rowcount
+                cursor.executemany('''
+                    DELETE FROM response_blobs
+                    WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM responses r WHERE r.payload_hash = response_blobs.hash)
+                ''', [(h,) for h in payload_hashes[i:i + 1000]])
+                deleted['blobs'] += cursor.rowcount
+                conn.commit()
+        return deleted
+    
+    def get_storage_stats(self):
+        """Database file size, free pages and payload totals, in bytes"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+            page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+            blobs = cursor.execute('''
+                SELECT COUNT(*) AS count, COALESCE(SUM(size), 0) AS payload_bytes,
+                       COALESCE(SUM(length(CAST(data AS BLOB))), 0) AS stored_bytes
+                FROM response_blobs
+            ''').fetchone()
+            responses = cursor.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                'file_bytes': page_size * page_count,
+                'free_bytes': page_size * free_pages,
+                'responses': responses,
+                'payloads': blobs['count'],
+                'payload_bytes': blobs['payload_bytes'],
+                'payload_stored_bytes': blobs['stored_bytes'],
+            }
+    
+    def incremental_vacuum(self, pages, full=False):
+        """
+        Return up to `pages` free pages (0 for all) to the filesystem. With
+        `full`, run a full VACUUM first, which also repacks partly empty pages
+        and converts a database created before auto_vacuum was enabled. Without
+        it such a database is left alone, since only a full VACUUM (which locks
+        and rewrites the whole file) can convert it. Returns what was done.
+        """
+        with self.get_connection() as conn:
+            conn.commit()
+            if full:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            elif conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:  # 2 = incremental
+                return {'full': False, 'pages_freed': 0, 'skipped': 'auto_vacuum is not incremental'}
+            free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # execute() would step the pragma once, freeing a single page; executescript() runs it to completion
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+            free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # In WAL mode the file only shrinks once the WAL is checkpointed
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            return {'full': full, 'pages_freed': free_before - free_after}
+    
+    def claim_retention_run(self, now, lease_seconds):
+        """Record a retention run starting now, unless one started within the lease is unfinished; returns its ID or None"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self.begin_immediate(conn)
+            cursor.execute(
+                "SELECT 1 FROM retention_runs WHERE finished_at IS NULL AND started_at > ?", (now - lease_seconds,)
+            )
+            if cursor.fetchone():
+                conn.rollback()
+                return None
+            cursor.execute("INSERT INTO retention_runs (started_at) VALUES (?)", (now,))
+            conn.commit()
+            return cursor.lastrowid
+    
+    def finish_retention_run(self, run_id, finished_at, report):
+        with self.get_connection() as conn:
+            conn.execute(
+                "UPDATE retention_runs SET finished_at = ?, report = ? WHERE id = ?",
+                (finished_at, json.dumps(report), run_id)
+            )
+            conn.commit()
+    
+    def get_retention_runs(self, limit=10):
+        """Most recent retention runs first"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM retention_runs ORDER BY id DESC LIMIT ?", (limit,))
+            return cursor.fetchall()
@@ -0,0 +1,198 @@
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class DriverPoolTimeout(Exception):
+    """Raised when no WebDriver session becomes available in time."""
+
+
+class _PooledDriver:
+    """Book-keeping wrapper around a single WebDriver session."""
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+
+class DriverPool:
+    """
+    Bounded pool of long-lived WebDriver sessions.
+
+    Sessions are created lazily by `driver_factory` up to `size`, handed out with
+    checkout()/checkin(), health-checked before reuse and recycled after
+    `max_uses` lookups or whenever the caller reports a crash. When `warm_url`
+    is set, new and returned sessions are parked on that page so the next
+    lookup starts on an already loaded form.
+    """
+    def __init__(self, driver_factory, size=2, max_uses=50, warm_url=None, checkout_timeout=60):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.driver_factory = driver_factory
+        self.size = size
+        self.max_uses = max_uses
+        self.warm_url = warm_url
+        self.checkout_timeout = checkout_timeout
+
+        self._cond = threading.Condition()
+        self._idle = []
+        self._in_use = {}
+        self._created = 0
+        self._closed = False
+
+        # Metrics
+        self._checkouts = 0
+        self._recycled = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._timeouts = 0
+
+    def _create(self):
+        """Launch a new session and park it on the warm page."""
+        driver = self.driver_factory()
+        if self.warm_url:
+            try:
+                driver.get(self.warm_url)
+            except Exception as e:
+                logger.warning(f"Failed to warm new driver session: {e}")
+        return _PooledDriver(driver)
+
+    def _is_healthy(self, pooled):
+        """A session is healthy if the browser still answers a trivial command."""
+        try:
+            pooled.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _destroy(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error while quitting driver: {e}")
+
+    def checkout(self, timeout=None):
+        """Borrow a healthy session, waiting up to `timeout` seconds for one to free up."""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    # Reserve the slot, then launch outside the lock.
+                    self._created += 1
+                    pooled = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise DriverPoolTimeout(f"No driver available after {timeout}s")
+                self._cond.wait(remaining)
+
+        if pooled is None:
+            try:
+                pooled = self._create()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+        elif not self._is_healthy(pooled):
+            logger.warning("Pooled driver failed health check, replacing it.")
+            self._destroy(pooled)
+            with self._cond:
+                self._recycled += 1
+            try:
+                pooled = self._create()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+
+        waited = time.monotonic() - started
+        with self._cond:
+            pooled.uses += 1
+            self._in_use[id(pooled.driver)] = pooled
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return pooled.driver
+
+    def checkin(self, driver, broken=False):
+        """Return a session to the pool; broken or worn-out sessions are recycled."""
+        with self._cond:
+            pooled = self._in_use.pop(id(driver), None)
+        if pooled is None:
+            logger.warning("Checkin of a driver that does not belong to this pool.")
+            return
+
+        recycle = broken or self._closed or pooled.uses >= self.max_uses
+        if not recycle and self.warm_url:
+            try:
+                pooled.driver.get(self.warm_url)
+            except Exception as e:
+                logger.warning(f"Failed to reset driver to warm page: {e}")
+                recycle = True
+
+        if recycle:
+            self._destroy(pooled)
+            with self._cond:
+                self._created -= 1
+                self._recycled += 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def session(self, timeout=None):
+        """Context manager that checks a session out and returns it, flagging it broken on error."""
+        driver = self.checkout(timeout)
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.checkin(driver, broken=broken)
+
+    def stats(self):
+        """Get pool size, utilization and checkout wait-time metrics"""
+        with self._cond:
+            in_use = len(self._in_use)
+            return {
+                'size': self.size,
+                'created': self._created,
+                'in_use': in_use,
+                'idle': len(self._idle),
+                'utilization': in_use / self.size,
+                'checkouts': self._checkouts,
+                'recycled': self._recycled,
+                'timeouts': self._timeouts,
+                'total_wait_seconds': self._total_wait,
+                'avg_wait_seconds': self._total_wait / self._checkouts if self._checkouts else 0.0,
+                'max_wait_seconds': self._max_wait,
+            }
+
+    def close(self):
+        """Quit all idle sessions; sessions still checked out are quit on checkin."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._destroy(pooled)
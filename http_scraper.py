@@ -0,0 +1,152 @@
+import os
+import threading
+import logging
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+
+from case_parser import parse_case_details, parse_results
+from metrics import span, CAPTCHA_ATTEMPTS, CAPTCHA_SOLVED
+
+logger = logging.getLogger(__name__)
+
+# Point at court_simulator.py to exercise the scraper offline
+DEFAULT_BASE_URL = os.environ.get("COURT_BASE_URL", "https://delhihighcourt.nic.in")
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+REQUEST_TIMEOUT = (5, 20)  # (connect, read) seconds
+MAX_CAPTCHA_ATTEMPTS = 3
+
+# One connection pool per process, shared by every lookup session
+_adapter = None
+_adapter_lock = threading.Lock()
+
+
+def get_http_adapter(pool_maxsize=16):
+    """Return the process-wide keep-alive connection pool."""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            _adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+        return _adapter
+
+
+class HttpCourtScraper:
+    """
+    Browserless scraper for the case-status form.
+
+    Fetches the form, downloads the CAPTCHA image bytes directly, solves them
+    and POSTs the form with plain HTTP. Each lookup gets its own cookie jar
+    (the CAPTCHA is bound to the server session) while TCP/TLS connections
+    are reused through a shared keep-alive pool.
+    """
+    def __init__(self, base_url=DEFAULT_BASE_URL, captcha_solver=None, adapter=None, timeout=REQUEST_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.case_status_url = f"{self.base_url}/case-status"
+        self.captcha_solver = captcha_solver
+        self.adapter = adapter or get_http_adapter()
+        self.timeout = timeout
+
+    def _get_solver(self):
+        if self.captcha_solver is None:
+            from scraper import get_captcha_solver
+            self.captcha_solver = get_captcha_solver()
+        return self.captcha_solver
+
+    def _new_session(self):
+        session = requests.Session()
+        session.mount('http://', self.adapter)
+        session.mount('https://', self.adapter)
+        session.headers['User-Agent'] = USER_AGENT
+        return session
+
+    def _load_form(self, session):
+        """Fetch the search form; returns (action_url, form_fields, case_type_values, captcha_url)."""
+        response = session.get(self.case_status_url, timeout=self.timeout)
+        response.raise_for_status()
+        soup = BeautifulSoup(response.text, 'html.parser', parse_only=SoupStrainer(['form', 'img', 'select']))
+
+        captcha = soup.find('img', id='captcha-image')
+        if captcha is None or not captcha.get('src'):
+            raise ValueError("CAPTCHA image not found on the case-status page")
+        form = captcha.find_parent('form') or soup.find('form')
+        if form is None:
+            raise ValueError("Search form not found on the case-status page")
+
+        fields = {
+            field['name']: field.get('value', '')
+            for field in form.find_all('input', attrs={'type': 'hidden'})
+            if field.get('name')
+        }
+        case_types = {}
+        select = form.find('select', id='c_type')
+        if select is not None:
+            for option in select.find_all('option'):
+                case_types[option.text.strip()] = option.get('value', option.text.strip())
+
+        action = urljoin(response.url, form.get('action') or response.url)
+        return action, fields, case_types, urljoin(response.url, captcha['src'])
+
+    def search_case(self, case_type, case_number, filing_year, **kwargs):
+        """
+        Fetches case details with plain HTTP requests.
+        Returns (success, case_data, error_message) like the other scrapers.
+        """
+        session = self._new_session()
+        try:
+            logger.info(f"Attempting HTTP scrape for: {case_type}/{case_number}/{filing_year}")
+            for attempt in range(MAX_CAPTCHA_ATTEMPTS):
+                with span('http.load_form'):
+                    action, fields, case_types, captcha_url = self._load_form(session)
+
+                cleaned_case_type = case_type.rstrip('.')
+                if case_types and cleaned_case_type not in case_types:
+                    return False, {}, f"Case type '{case_type}' not found on the court website."
+
+                with span('http.captcha_fetch'):
+                    captcha_response = session.get(captcha_url, timeout=self.timeout)
+                    captcha_response.raise_for_status()
+                with span('scrape.captcha_solve'):
+                    captcha_solution = self._get_solver().solve(captcha_response.content)
+                if not captcha_solution:
+                    logger.warning(f"Attempt {attempt + 1}: OCR failed to produce a result, retrying...")
+                    continue
+
+                fields.update({
+                    'c_type': case_types.get(cleaned_case_type, cleaned_case_type),
+                    'c_no': case_number,
+                    'c_year': filing_year,
+                    'captcha': captcha_solution,
+                })
+                CAPTCHA_ATTEMPTS.inc(scraper='http')
+                with span('http.submit'):
+                    response = session.post(action, data=fields, timeout=self.timeout)
+                    response.raise_for_status()
+
+                with span('scrape.parse'):
+                    case_data = parse_case_details(response.text, case_type, case_number, filing_year, base_url=response.url)
+                if case_data:
+                    logger.info("CAPTCHA solved successfully!")
+                    CAPTCHA_SOLVED.inc(scraper='http')
+                    return True, case_data, ""
+                # A no-record page, or a results listing without the requested case
+                if 'no record found' in response.text.lower() or parse_results(response.text):
+                    CAPTCHA_SOLVED.inc(scraper='http')
+                    return False, {}, "Case not found on the court website."
+                logger.warning(f"Attempt {attempt + 1}: CAPTCHA likely failed, retrying...")
+
+            return False, {}, "Failed to solve CAPTCHA after multiple attempts."
+        except requests.RequestException as e:
+            logger.error(f"HTTP error during scrape: {e}")
+            return False, {}, "Could not reach the court website. Please try again later."
+        except Exception as e:
+            logger.error(f"An error occurred during the HTTP scrape: {e}")
+            return False, {}, "An unexpected error occurred during the live scrape."
+        finally:
+            # Not closed: Session.close() would close the shared adapter's pool.
+            # Only this lookup's cookie jar is dropped; connections stay pooled.
+            session.cookies.clear()
@@ -0,0 +1,74 @@
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at capacity and cannot accept more work."""
+
+
+class JobManager:
+    """
+    Runs case lookups in the background on a bounded worker pool.
+
+    Submitting logs the query and creates a 'queued' job row linked to it;
+    a worker moves the job to 'running', performs the lookup (which logs the
+    response) and finishes it as 'succeeded' or 'failed'. Jobs live in SQLite,
+    so status can be polled from any worker process sharing the database.
+    """
+    def __init__(self, db_manager, lookup, max_workers=4, max_pending=100):
+        self.db_manager = db_manager
+        self.lookup = lookup
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scrape-job')
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def submit(self, case_type, case_number, filing_year, ip_address=None, user_agent=None):
+        """Queue a lookup and return the new job ID."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"{self._pending} jobs already pending")
+            self._pending += 1
+
+        try:
+            query_id = self.db_manager.log_query(
+                case_type=case_type,
+                case_number=case_number,
+                filing_year=filing_year,
+                ip_address=ip_address,
+                user_agent=user_agent
+            )
+            job_id = self.db_manager.create_job(query_id)
+            self._executor.submit(self._run, job_id, query_id, case_type, case_number, filing_year)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        logger.info(f"Queued job {job_id} for {case_type}/{case_number}/{filing_year}")
+        return job_id
+
+    def _run(self, job_id, query_id, case_type, case_number, filing_year):
+        try:
+            self.db_manager.update_job_status(job_id, 'running')
+            success, _, error_message = self.lookup(query_id, case_type, case_number, filing_year)
+            if success:
+                self.db_manager.update_job_status(job_id, 'succeeded')
+            else:
+                self.db_manager.update_job_status(job_id, 'failed', error_message)
+        except Exception as e:
+            logger.error(f"Job {job_id} crashed: {e}", exc_info=True)
+            self.db_manager.update_job_status(job_id, 'failed', 'An unexpected error occurred during the lookup.')
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,221 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters and histograms are declared once at import time and updated from the
+hot paths; `span(name)` times a block into the court_span_seconds histogram.
+render() produces the Prometheus text format served at /metrics.
+
+Set METRICS_ENABLED=False to turn collection off: span() then returns a shared
+no-op context manager, updates return immediately, and instrument() leaves
+methods unwrapped.
+"""
+import os
+import time
+import bisect
+import functools
+import threading
+
+ENABLED = os.environ.get("METRICS_ENABLED", "True").lower() == 'true'
+
+# Seconds; covers sub-millisecond SQLite calls up to multi-second scrapes
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{_escape(value)}"' for name, value in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        if not ENABLED:
+            return
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(f"{self.name}{_format_labels(self.labelnames, key)}", value) for key, value in items]
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        if not ENABLED:
+            return
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+                lines.append((f"{self.name}_bucket{labels}", cumulative))
+            labels = _format_labels(self.labelnames, key)
+            lines.append((f"{self.name}_sum{labels}", series[-1]))
+            lines.append((f"{self.name}_count{labels}", cumulative))
+        return lines
+
+
+def _register(metric):
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name, documentation, labelnames=()):
+    return _register(Counter(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+
+def render():
+    """All registered metrics in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda m: m.name)
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for sample, value in metric.samples():
+            lines.append(f"{sample} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+# --- metrics shared across modules ------------------------------------------
+
+SPAN_SECONDS = histogram('court_span_seconds', "Duration of instrumented phases.", ('span', 'outcome'))
+CAPTCHA_ATTEMPTS = counter('court_captcha_attempts_total', "CAPTCHA submissions, by scraper.", ('scraper',))
+CAPTCHA_SOLVED = counter('court_captcha_solved_total', "Lookups that got past the CAPTCHA, by scraper.", ('scraper',))
+CACHE_LOOKUPS = counter('court_cache_lookups_total', "Case lookups by cache result.", ('result',))
+SCRAPE_RESULTS = counter('court_scrape_results_total', "Live scrape results by outcome.", ('outcome',))
+DB_LOCK_WAIT_SECONDS = histogram('court_db_lock_wait_seconds', "Time spent waiting for the SQLite write lock.")
+RETENTION_ROWS_ARCHIVED = counter('court_retention_rows_archived_total', "Responses archived to NDJSON and deleted.")
+RETENTION_BYTES_RECLAIMED = counter('court_retention_bytes_reclaimed_total', "Bytes the database file shrank by in retention runs.")
+DB_LOCKED_ERRORS = counter('court_db_locked_errors_total', "SQLite calls that failed with 'database is locked'.")
+SINGLEFLIGHT_CALLS = counter('court_singleflight_calls_total', "Lookups entering request coalescing.")
+SINGLEFLIGHT_COALESCED = counter('court_singleflight_coalesced_total', "Lookups that waited on an identical in-flight lookup.")
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        SPAN_SECONDS.observe(time.perf_counter() - self.started, span=self.name,
+                             outcome='ok' if exc_type is None else 'error')
+        return False
+
+
+def span(name):
+    """Time a block into court_span_seconds{span=name}; a no-op when metrics are disabled."""
+    return _Span(name) if ENABLED else _NOOP_SPAN
+
+
+def timed(name, on_error=None):
+    """Decorator form of span(); `on_error(exc)` is called for exceptions before they propagate."""
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Span(name):
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as e:
+                    if on_error is not None:
+                        on_error(e)
+                    raise
+        return wrapper
+    return decorator
+
+
+def instrument(prefix, exclude=(), on_error=None):
+    """Class decorator timing every public method as span '<prefix>.<method>'."""
+    def decorator(cls):
+        if not ENABLED:
+            return cls
+        for attr, value in list(vars(cls).items()):
+            if callable(value) and not attr.startswith('_') and attr not in exclude:
+                setattr(cls, attr, timed(f"{prefix}.{attr}", on_error)(value))
+        return cls
+    return decorator
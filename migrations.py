@@ -0,0 +1,332 @@
+"""
+Versioned schema migrations.
+
+Each migration is a (version, description, function) entry in MIGRATIONS;
+the function receives a cursor inside an IMMEDIATE transaction. Applied
+versions are recorded in the schema_version table, so every migration runs
+exactly once per database, in order, even with several processes starting at
+the same time.
+"""
+import logging
+
+from case_parser import iso_court_date
+from retention import move_payloads_to_blobs
+
+logger = logging.getLogger(__name__)
+
+# SQL expression for the normalized case key of a queries row, matching scraper.make_case_key()
+QUERY_CASE_KEY_SQL = "rtrim(trim({alias}case_type), '.') || '.' || trim({alias}case_number) || '.' || trim({alias}filing_year)"
+
+
+def query_case_key_sql(alias=''):
+    return QUERY_CASE_KEY_SQL.format(alias=f"{alias}." if alias else '')
+
+
+def _add_lookup_indexes(cursor):
+    # Responses are looked up and joined by query; status makes the cache lookup covering
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_responses_query_id ON responses (query_id, status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_case_data_query_id ON case_data (query_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_case_data_timestamp ON case_data (timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_queries_timestamp ON queries (timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_queries_case_type ON queries (case_type)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_queries_user_agent ON queries (user_agent)")
+    # Expression index for lookups by case (see DatabaseManager.get_latest_response)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_queries_case ON queries (rtrim(case_type, '.'), case_number, filing_year)"
+    )
+
+
+def _add_case_data_case_key(cursor):
+    cursor.execute("ALTER TABLE case_data ADD COLUMN case_key TEXT")
+    cursor.execute(f'''
+        UPDATE case_data SET case_key = (
+            SELECT {query_case_key_sql('q')} FROM queries q WHERE q.id = case_data.query_id
+        )
+    ''')
+    # Keep only the latest record per case so the key can be unique
+    cursor.execute('''
+        DELETE FROM case_data
+        WHERE case_key IS NOT NULL
+          AND id NOT IN (SELECT MAX(id) FROM case_data WHERE case_key IS NOT NULL GROUP BY case_key)
+    ''')
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_case_data_case_key ON case_data (case_key)")
+
+
+FTS_COLUMNS = ('case_number', 'case_title', 'petitioner_name', 'respondent_name', 'judge_name', 'court_hall', 'latest_order')
+
+
+def _add_case_data_fts(cursor):
+    # Title and order text were only kept in responses.parsed_data so far
+    cursor.execute("ALTER TABLE case_data ADD COLUMN case_title TEXT")
+    cursor.execute("ALTER TABLE case_data ADD COLUMN latest_order TEXT")
+    cursor.execute('''
+        UPDATE case_data SET
+            case_title = (
+                SELECT json_extract(r.parsed_data, '$.case_title') FROM responses r
+                WHERE r.query_id = case_data.query_id AND r.status = 'success'
+                ORDER BY r.id DESC LIMIT 1
+            ),
+            latest_order = (
+                SELECT json_extract(r.parsed_data, '$.latest_order') FROM responses r
+                WHERE r.query_id = case_data.query_id AND r.status = 'success'
+                ORDER BY r.id DESC LIMIT 1
+            )
+    ''')
+
+    columns = ', '.join(FTS_COLUMNS)
+    new_values = ', '.join(f"new.{c}" for c in FTS_COLUMNS)
+    old_values = ', '.join(f"old.{c}" for c in FTS_COLUMNS)
+    # External-content index over case_data, kept in sync by triggers
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS case_data_fts USING fts5(
+            {columns},
+            content='case_data', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS case_data_fts_insert AFTER INSERT ON case_data BEGIN
+            INSERT INTO case_data_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS case_data_fts_delete AFTER DELETE ON case_data BEGIN
+            INSERT INTO case_data_fts (case_data_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS case_data_fts_update AFTER UPDATE ON case_data BEGIN
+            INSERT INTO case_data_fts (case_data_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO case_data_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+    cursor.execute("INSERT INTO case_data_fts (case_data_fts) VALUES ('rebuild')")
+
+
+# Upper bounds (ms) of the response latency histogram buckets; -1 is the +Inf bucket
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+def latency_bucket_sql(column):
+    """SQL CASE expression mapping a latency in ms to its histogram bucket bound"""
+    cases = ' '.join(f"WHEN {column} <= {bound} THEN {bound}" for bound in LATENCY_BUCKETS_MS)
+    return f"CASE {cases} ELSE -1 END"
+
+
+def _add_stats_rollups(cursor):
+    cursor.execute("ALTER TABLE responses ADD COLUMN latency_ms INTEGER")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_case_types (
+            case_type TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_hourly (
+            hour TEXT PRIMARY KEY,  -- 'YYYY-MM-DD HH:00' UTC
+            responses INTEGER NOT NULL DEFAULT 0,
+            successes INTEGER NOT NULL DEFAULT 0,
+            failures INTEGER NOT NULL DEFAULT 0,
+            cached INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_latency_hourly (
+            hour TEXT NOT NULL,
+            bucket_ms INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (hour, bucket_ms)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS stats_queries_insert AFTER INSERT ON queries BEGIN
+            INSERT INTO stats_counters (name, value) VALUES ('total_queries', 1)
+                ON CONFLICT (name) DO UPDATE SET value = value + 1;
+            INSERT INTO stats_case_types (case_type, count) VALUES (new.case_type, 1)
+                ON CONFLICT (case_type) DO UPDATE SET count = count + 1;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS stats_responses_insert AFTER INSERT ON responses BEGIN
+            INSERT INTO stats_counters (name, value) VALUES ('responses_' || new.status, 1)
+                ON CONFLICT (name) DO UPDATE SET value = value + 1;
+            INSERT INTO stats_hourly (hour, responses, successes, failures, cached)
+                VALUES (strftime('%Y-%m-%d %H:00', new.timestamp), 1,
+                        new.status = 'success', new.status = 'failed', new.status = 'cached')
+                ON CONFLICT (hour) DO UPDATE SET
+                    responses = responses + 1,
+                    successes = successes + excluded.successes,
+                    failures = failures + excluded.failures,
+                    cached = cached + excluded.cached;
+            INSERT INTO stats_latency_hourly (hour, bucket_ms, count)
+                SELECT strftime('%Y-%m-%d %H:00', new.timestamp), {latency_bucket_sql('new.latency_ms')}, 1
+                WHERE new.latency_ms IS NOT NULL
+                ON CONFLICT (hour, bucket_ms) DO UPDATE SET count = count + 1;
+        END
+    ''')
+    rebuild_stats_rollups(cursor)
+
+
+def rebuild_stats_rollups(cursor):
+    """Recompute every stats rollup table from the raw queries and responses"""
+    cursor.execute("DELETE FROM stats_counters")
+    cursor.execute("DELETE FROM stats_case_types")
+    cursor.execute("DELETE FROM stats_hourly")
+    cursor.execute("DELETE FROM stats_latency_hourly")
+    cursor.execute("INSERT INTO stats_counters (name, value) SELECT 'total_queries', COUNT(*) FROM queries")
+    cursor.execute('''
+        INSERT INTO stats_counters (name, value)
+        SELECT 'responses_' || status, COUNT(*) FROM responses WHERE status IS NOT NULL GROUP BY status
+    ''')
+    cursor.execute('''
+        INSERT INTO stats_case_types (case_type, count)
+        SELECT case_type, COUNT(*) FROM queries GROUP BY case_type
+    ''')
+    cursor.execute('''
+        INSERT INTO stats_hourly (hour, responses, successes, failures, cached)
+        SELECT strftime('%Y-%m-%d %H:00', timestamp), COUNT(*),
+               SUM(status = 'success'), SUM(status = 'failed'), SUM(status = 'cached')
+        FROM responses GROUP BY 1
+    ''')
+    cursor.execute(f'''
+        INSERT INTO stats_latency_hourly (hour, bucket_ms, count)
+        SELECT strftime('%Y-%m-%d %H:00', timestamp), {latency_bucket_sql('latency_ms')}, COUNT(*)
+        FROM responses WHERE latency_ms IS NOT NULL GROUP BY 1, 2
+    ''')
+
+
+def _add_watchlist(cursor):
+    # Tracked cases. The last seen record is kept as a snapshot plus its hash,
+    # so an unchanged refresh only touches the scheduling columns.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS watchlist (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_key TEXT NOT NULL UNIQUE,
+            case_type TEXT NOT NULL,
+            case_number TEXT NOT NULL,
+            filing_year TEXT NOT NULL,
+            added_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            next_check_at REAL NOT NULL,  -- unix time
+            next_hearing_at REAL,         -- unix time of next_hearing_date, for prioritising
+            last_checked_at REAL,
+            consecutive_failures INTEGER NOT NULL DEFAULT 0,
+            content_hash TEXT,
+            snapshot TEXT
+        )
+    ''')
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_watchlist_due ON watchlist (next_check_at, next_hearing_at)"
+    )
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS case_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            watch_id INTEGER NOT NULL,
+            case_key TEXT NOT NULL,
+            event_type TEXT NOT NULL,  -- changed, not_found
+            changes TEXT,              -- JSON {field: [old, new]}
+            content_hash TEXT,
+            detected_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_case_events_case_key ON case_events (case_key, id)")
+
+
+def _add_case_data_iso_dates(cursor):
+    # Dates are stored as printed (dd/mm/yyyy); ISO copies sort and compare as text,
+    # so hearing calendars are index range scans instead of parsing every row
+    cursor.execute("ALTER TABLE case_data ADD COLUMN next_hearing_on TEXT")  # YYYY-MM-DD
+    cursor.execute("ALTER TABLE case_data ADD COLUMN filed_on TEXT")
+    rows = cursor.execute("SELECT id, next_hearing_date, filing_date FROM case_data").fetchall()
+    cursor.executemany(
+        "UPDATE case_data SET next_hearing_on = ?, filed_on = ? WHERE id = ?",
+        [(iso_court_date(hearing), iso_court_date(filed), row_id) for row_id, hearing, filed in rows]
+    )
+    # Day-by-day cause lists, and one court hall's list over a range
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_case_data_hearing ON case_data (next_hearing_on, court_hall)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_case_data_hall_hearing ON case_data (court_hall, next_hearing_on)"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_case_data_filed ON case_data (filed_on)")
+
+
+def _add_response_blobs(cursor):
+    # Payloads are stored once per distinct content (see retention.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS response_blobs (
+            hash TEXT PRIMARY KEY,                   -- SHA-256 of the payload
+            encoding TEXT NOT NULL DEFAULT 'plain',  -- plain, zlib or zstd
+            data BLOB NOT NULL,
+            size INTEGER NOT NULL,                   -- uncompressed bytes
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute("ALTER TABLE responses ADD COLUMN payload_hash TEXT")
+    # Whether a payload was used recently (compression), and responses by age (archival)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_responses_payload_hash ON responses (payload_hash, timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_responses_timestamp ON responses (timestamp)")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS retention_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at REAL NOT NULL,  -- unix time
+            finished_at REAL,
+            report TEXT                -- JSON
+        )
+    ''')
+    move_payloads_to_blobs(cursor)
+
+
+MIGRATIONS = [
+    (1, "Add indexes for query, response and case_data lookups", _add_lookup_indexes),
+    (2, "Add unique normalized case_key to case_data", _add_case_data_case_key),
+    (3, "Add case title, order text and FTS5 index to case_data", _add_case_data_fts),
+    (4, "Add response latency and incrementally maintained stats rollups", _add_stats_rollups),
+    (5, "Add case watchlist and change events", _add_watchlist),
+    (6, "Add indexed ISO hearing and filing dates to case_data", _add_case_data_iso_dates),
+    (7, "Deduplicate response payloads into response_blobs and add retention runs", _add_response_blobs),
+]
+
+
+def current_version(conn):
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(conn, migrations=None):
+    """Apply all pending migrations in order; returns the resulting schema version."""
+    migrations = MIGRATIONS if migrations is None else migrations
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+    for version, description, migrate in sorted(migrations, key=lambda m: m[0]):
+        if version <= current_version(conn):
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it while we waited for the lock
+            if version <= current_version(conn):
+                conn.rollback()
+                continue
+            migrate(conn.cursor())
+            conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+            conn.commit()
+            logger.info(f"Applied schema migration {version}: {description}")
+        except Exception:
+            conn.rollback()
+            raise
+    return current_version(conn)
@@ -0,0 +1,254 @@
+"""
+OCR backends for the CAPTCHA solver.
+
+Every backend takes preprocessed single-channel images (NumPy uint8 arrays)
+and returns (text, confidence) pairs, with confidence on a 0-100 scale.
+
+- 'tesseract': pytesseract, which forks the tesseract binary and writes temp
+  files for every image; parallelised over a process pool.
+- 'tesserocr-worker': long-lived worker processes that keep the Tesseract
+  API (via tesserocr) and its models loaded and receive raw image buffers
+  over a pipe, with no process start-up or temp files per solve.
+
+The backend is chosen with the CAPTCHA_OCR_BACKEND environment variable.
+"""
+import os
+import re
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+TESSERACT_WHITELIST = '0123456789abcdefghijklmnopqrstuvwxyz'
+TESSERACT_CONFIG = rf'--oem 3 --psm 6 -c tessedit_char_whitelist={TESSERACT_WHITELIST}'
+
+DEFAULT_OCR_BACKEND = os.environ.get("CAPTCHA_OCR_BACKEND", "tesseract")
+
+
+class OcrWorkerError(RuntimeError):
+    """An OCR worker replied with an error; its pipe is still in sync."""
+
+
+def clean_text(text):
+    return re.sub(r'[^a-zA-Z0-9]', '', text or '')
+
+
+def tesseract_ocr(image):
+    """
+    OCR one image through pytesseract.
+    Returns (text, confidence) where confidence is the mean word confidence.
+    Top-level so it can run in a worker process.
+    """
+    import pytesseract
+    data = pytesseract.image_to_data(image, config=TESSERACT_CONFIG, output_type=pytesseract.Output.DICT)
+    words, confidences = [], []
+    for word, conf in zip(data['text'], data['conf']):
+        word = clean_text(word)
+        if word:
+            words.append(word)
+            confidences.append(max(float(conf), 0.0))
+    text = ''.join(words)
+    confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return text, confidence
+
+
+class OcrBackend:
+    """Interface for CAPTCHA OCR backends."""
+    name = None
+
+    def ocr(self, image):
+        """OCR a single image; returns (text, confidence)."""
+        raise NotImplementedError
+
+    def ocr_many(self, images):
+        """OCR several images, in parallel where the backend supports it."""
+        return [self.ocr(image) for image in images]
+
+    def close(self):
+        pass
+
+
+class TesseractBackend(OcrBackend):
+    """pytesseract backend; spawns one tesseract process per image."""
+    name = 'tesseract'
+
+    def __init__(self, max_workers=None, parallel=True):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parallel = parallel
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawn, not fork: the solver runs inside the threaded web process
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def ocr(self, image):
+        return tesseract_ocr(image)
+
+    def ocr_many(self, images):
+        if not self.parallel or len(images) < 2:
+            return [tesseract_ocr(image) for image in images]
+        return list(self._get_executor().map(tesseract_ocr, images))
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+def _tesserocr_worker(conn):
+    """Worker loop: keep one Tesseract API instance loaded and OCR raw buffers from the pipe."""
+    import tesserocr
+
+    with tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_BLOCK, oem=tesserocr.OEM.DEFAULT) as api:
+        api.SetVariable('tessedit_char_whitelist', TESSERACT_WHITELIST)
+        conn.send(('ready', None))
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            height, width, buffer = message
+            try:
+                api.SetImageBytes(buffer, width, height, 1, width)
+                text = clean_text(api.GetUTF8Text())
+                conn.send(('ok', (text, float(max(api.MeanTextConf(), 0)))))
+            except Exception as e:
+                conn.send(('error', str(e)))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_tesserocr_worker, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        status, error = self.conn.recv()
+        if status != 'ready':
+            raise RuntimeError(f"OCR worker failed to start: {error}")
+        self.lock = threading.Lock()
+
+    def send(self, image):
+        height, width = image.shape[:2]
+        self.conn.send((height, width, image.tobytes()))
+
+    def receive(self):
+        status, payload = self.conn.recv()
+        if status != 'ok':
+            raise OcrWorkerError(f"OCR worker error: {payload}")
+        return payload
+
+    def kill(self):
+        """Terminate the worker, discarding any replies still queued on its pipe."""
+        self.process.terminate()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+class PersistentTesseractBackend(OcrBackend):
+    """
+    tesserocr backend on long-lived worker processes.
+
+    Each worker loads the Tesseract models once at start-up and then serves
+    raw grayscale buffers sent over its pipe. Images of one solve are spread
+    across the workers so the variants are recognised in parallel.
+    """
+    name = 'tesserocr-worker'
+
+    def __init__(self, workers=None):
+        import tesserocr  # noqa: F401  (fail fast if the binding is missing)
+        self.workers_count = workers or min(os.cpu_count() or 1, 4)
+        self._context = multiprocessing.get_context('spawn')
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def _get_workers(self):
+        with self._lock:
+            alive = [w for w in self._workers if w.process.is_alive()]
+            while len(alive) < self.workers_count:
+                alive.append(_Worker(self._context))
+            self._workers = alive
+            return list(alive)
+
+    def ocr(self, image):
+        return self.ocr_many([image])[0]
+
+    def ocr_many(self, images):
+        workers = self._get_workers()
+        results = [None] * len(images)
+        # Lock workers in a fixed order to avoid deadlocks between concurrent solves
+        used = workers[:min(len(workers), len(images))]
+        for worker in used:
+            worker.lock.acquire()
+        in_sync = False
+        try:
+            for start in range(0, len(images), len(used)):
+                chunk = list(enumerate(images[start:start + len(used)], start))
+                for worker, (_, image) in zip(used, chunk):
+                    worker.send(image)
+                errors = []
+                # Always collect every reply so the pipes stay in sync
+                for worker, (index, _) in zip(used, chunk):
+                    try:
+                        results[index] = worker.receive()
+                    except OcrWorkerError as e:
+                        errors.append(e)
+                if errors:
+                    in_sync = True
+                    raise errors[0]
+            in_sync = True
+        finally:
+            for worker in used:
+                worker.lock.release()
+            if not in_sync:
+                # A send or receive failed part-way, so some pipes may hold replies
+                # meant for this solve; replace those workers rather than reuse them
+                self._discard(used)
+        return results
+
+    def _discard(self, workers):
+        with self._lock:
+            self._workers = [w for w in self._workers if w not in workers]
+        for worker in workers:
+            worker.kill()
+
+    def close(self):
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
+            self._workers = []
+
+
+OCR_BACKENDS = {
+    TesseractBackend.name: TesseractBackend,
+    PersistentTesseractBackend.name: PersistentTesseractBackend,
+}
+
+
+def create_ocr_backend(name=None, **kwargs):
+    """Instantiate an OCR backend by name (defaults to CAPTCHA_OCR_BACKEND)."""
+    name = name or DEFAULT_OCR_BACKEND
+    try:
+        backend_class = OCR_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown OCR backend '{name}'. Choose one of: {', '.join(OCR_BACKENDS)}")
+    return backend_class(**kwargs)
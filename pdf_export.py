@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import uuid
+import zipfile
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from pdf_renderer import render_case_file
+
+logger = logging.getLogger(__name__)
+
+PDF_EXPORT_WORKERS = int(os.environ.get("PDF_EXPORT_WORKERS", str(min(os.cpu_count() or 1, 4))))
+PDF_EXPORT_MAX_CASES = int(os.environ.get("PDF_EXPORT_MAX_CASES", "500"))
+PDF_EXPORT_MAX_CONCURRENT = int(os.environ.get("PDF_EXPORT_MAX_CONCURRENT", "2"))
+CHUNK_SIZE = 64 * 1024
+
+
+class ExportBusy(Exception):
+    """Raised when the maximum number of exports is already running."""
+
+
+class ExportProgress:
+    """Live counters for one export, polled through /export/<id>."""
+    def __init__(self, total):
+        self.id = uuid.uuid4().hex
+        self.total = total
+        self.rendered = 0
+        self.cached = 0
+        self.failed = 0
+        self.bytes_sent = 0
+        self.status = 'running'
+        self.started_at = time.time()
+        self.finished_at = None
+        self.slot_released = False
+
+    def to_dict(self):
+        done = self.rendered + self.cached + self.failed
+        return {
+            'export_id': self.id,
+            'status': self.status,
+            'total': self.total,
+            'done': done,
+            'rendered': self.rendered,
+            'cached': self.cached,
+            'failed': self.failed,
+            'bytes_sent': self.bytes_sent,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class _ChunkSink:
+    """Write-only file object that collects ZIP output until it is drained."""
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class PdfExporter:
+    """
+    Streams the PDFs of many cases as one ZIP archive.
+
+    Missing documents are rendered on a process pool (ReportLab is CPU-bound)
+    into the shared PdfCache; each finished document is copied into the
+    archive in CHUNK_SIZE pieces and sent on as it is produced, so at most
+    `max_in_flight` renders are queued and about one chunk is buffered per
+    export. The archive ends with a manifest.json listing every case's outcome.
+    """
+    def __init__(self, pdf_cache, load_case, workers=PDF_EXPORT_WORKERS, max_in_flight=None,
+                 max_concurrent=PDF_EXPORT_MAX_CONCURRENT, keep_finished=100):
+        self.pdf_cache = pdf_cache
+        self.load_case = load_case  # case_key -> (case_key, case_data, history) or None
+        self.workers = workers
+        self.max_in_flight = max_in_flight or workers * 2
+        self.keep_finished = keep_finished
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._exports = OrderedDict()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawn, not fork: forking this threaded process could copy held locks and open SQLite handles
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def start(self, case_keys):
+        """Reserve an export slot; raises ExportBusy when all slots are taken."""
+        if not self._slots.acquire(blocking=False):
+            raise ExportBusy()
+        progress = ExportProgress(len(case_keys))
+        with self._lock:
+            self._exports[progress.id] = progress
+            while len(self._exports) > self.keep_finished:
+                self._exports.popitem(last=False)
+        return progress
+
+    def finish(self, progress):
+        """Give back the slot taken by start(); safe to call more than once."""
+        with self._lock:
+            if progress.slot_released:
+                return
+            progress.slot_released = True
+            if progress.status == 'running':
+                progress.status = 'aborted'
+            progress.finished_at = progress.finished_at or time.time()
+        self._slots.release()
+
+    def progress(self, export_id):
+        with self._lock:
+            return self._exports.get(export_id)
+
+    def stream(self, progress, case_keys):
+        """Yield the ZIP archive for `case_keys`; releases the slot taken by start() when done."""
+        sink = _ChunkSink()
+        manifest = []
+        pending = {}
+        keys = iter(case_keys)
+
+        def submit_more():
+            while len(pending) < self.max_in_flight:
+                case_key = next(keys, None)
+                if case_key is None:
+                    return
+                document = self.load_case(case_key)
+                if document is None:
+                    progress.failed += 1
+                    manifest.append({'case_key': case_key, 'status': 'not_found'})
+                    continue
+                case_key, case_data, history = document
+                path, _, cached = self.pdf_cache.locate(case_key, case_data, history)
+                if cached:
+                    future = Future()
+                    future.set_result(path)
+                else:
+                    future = self._get_executor().submit(render_case_file, case_data, history, path)
+                pending[future] = (case_key, path, cached)
+
+        try:
+            with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+                submit_more()
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        case_key, path, cached = pending.pop(future)
+                        name = f'case_{case_key.replace(".", "_")}.pdf'
+                        try:
+                            future.result()
+                            if not cached:
+                                self.pdf_cache.rendered(case_key, path)
+                            with open(path, 'rb') as source, archive.open(name, 'w') as entry:
+                                for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                                    entry.write(chunk)
+                                    data = sink.drain()
+                                    if data:
+                                        progress.bytes_sent += len(data)
+                                        yield data
+                        except Exception as e:
+                            logger.error(f"PDF export failed for {case_key}: {e}")
+                            progress.failed += 1
+                            manifest.append({'case_key': case_key, 'status': 'failed', 'error': str(e)})
+                            continue
+                        if cached:
+                            progress.cached += 1
+                        else:
+                            progress.rendered += 1
+                        manifest.append({'case_key': case_key, 'status': 'ok', 'file': name})
+                    submit_more()
+                archive.writestr('manifest.json', json.dumps({'export': progress.to_dict(), 'cases': manifest}, indent=2))
+            data = sink.drain()
+            progress.bytes_sent += len(data)
+            progress.status = 'finished'
+            yield data
+        except GeneratorExit:
+            # Client went away: stop queued renders and give the slot back
+            progress.status = 'aborted'
+            for future in pending:
+                future.cancel()
+            raise
+        except Exception:
+            progress.status = 'failed'
+            raise
+        finally:
+            progress.finished_at = time.time()
+            self.finish(progress)
+            logger.info(f"PDF export {progress.id} {progress.status}: {progress.to_dict()}")
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
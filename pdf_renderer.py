@@ -0,0 +1,205 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+
+from xml.sax.saxutils import escape
+
+from coalescing import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_DIR = os.environ.get("PDF_CACHE_DIR", "data/pdf_cache")
+# Bump when the layout changes so cached documents are re-rendered
+RENDERER_VERSION = 1
+
+DETAIL_FIELDS = (
+    ("Case Title", 'case_title'),
+    ("Case Number", 'case_number'),
+    ("Case Type", 'case_type'),
+    ("Filing Date", 'filing_date'),
+    ("Petitioner", 'petitioner_name'),
+    ("Respondent", 'respondent_name'),
+    ("Next Hearing", 'next_hearing_date'),
+    ("Status", 'case_status'),
+    ("Judge", 'judge_name'),
+    ("Court Hall", 'court_hall'),
+    ("Last Order Date", 'last_order_date'),
+)
+
+
+def order_history(case_data, responses):
+    """
+    Build the order history from a case's stored responses (oldest first):
+    one entry per distinct (order date, order text, links), newest first.
+    """
+    history, seen = [], set()
+    for data in list(responses) + [case_data]:
+        links = data.get('pdf_links') or ([data['pdf_link']] if data.get('pdf_link') else [])
+        entry = {
+            'date': data.get('last_order_date') or '',
+            'order': data.get('latest_order') or '',
+            'links': list(links),
+            'next_hearing_date': data.get('next_hearing_date') or '',
+            'case_status': data.get('case_status') or '',
+        }
+        key = (entry['date'], entry['order'], tuple(entry['links']))
+        if any(key) and key not in seen:
+            seen.add(key)
+            history.append(entry)
+    history.reverse()
+    return history
+
+
+def content_hash(case_data, history):
+    """Hash of everything that ends up in the document; doubles as the ETag."""
+    payload = json.dumps(
+        {'version': RENDERER_VERSION, 'case': case_data, 'history': history},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_reportlab():
+    """Import ReportLab now instead of on the first render (it takes longer to import than the app)."""
+    import reportlab.platypus
+    import reportlab.lib.styles
+    return reportlab
+
+
+def render_case_pdf(case_data, history, out):
+    """Render the case details and full order history to `out` (a path or file object)."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib import colors
+
+    styles = getSampleStyleSheet()
+    doc = SimpleDocTemplate(
+        out, pagesize=letter, leftMargin=inch, rightMargin=inch, topMargin=inch, bottomMargin=inch,
+        title=f"Case {case_data.get('case_type', '')} {case_data.get('case_number', '')}"
+    )
+
+    def para(text, style='BodyText'):
+        return Paragraph(escape(str(text or 'N/A')), styles[style])
+
+    story = [para("DELHI HIGH COURT - CASE DETAILS", 'Title')]
+    details = Table(
+        [[para(f"{label}:"), para(case_data.get(field))] for label, field in DETAIL_FIELDS],
+        colWidths=[1.5 * inch, 5 * inch]
+    )
+    details.setStyle(TableStyle([('VALIGN', (0, 0), (-1, -1), 'TOP')]))
+    story += [details, Spacer(1, 0.3 * inch), para("Order History", 'Heading2')]
+
+    if not history:
+        story.append(para("No orders recorded for this case."))
+    for entry in history:
+        heading = entry['date'] or "Undated order"
+        if entry['case_status']:
+            heading += f" ({entry['case_status']})"
+        story.append(para(heading, 'Heading4'))
+        if entry['order']:
+            story.append(para(entry['order']))
+        if entry['next_hearing_date']:
+            story.append(para(f"Next hearing: {entry['next_hearing_date']}"))
+        for link in entry['links']:
+            story.append(Paragraph(f'<link href="{escape(link)}" color="blue">{escape(link)}</link>', styles['BodyText']))
+        story.append(Spacer(1, 0.15 * inch))
+
+    def footer(canvas, document):
+        canvas.saveState()
+        canvas.setFont('Helvetica', 8)
+        canvas.setFillColor(colors.grey)
+        canvas.drawRightString(letter[0] - inch, 0.6 * inch, f"Page {document.page}")
+        canvas.restoreState()
+
+    doc.build(story, onFirstPage=footer, onLaterPages=footer)
+
+
+def render_case_file(case_data, history, path):
+    """
+    Render a case PDF to `path` atomically (temp file + rename), so readers
+    never see a partial document. Top-level so it can run in a worker process.
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            render_case_pdf(case_data, history, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+def _safe_name(case_key):
+    return re.sub(r'[^A-Za-z0-9]+', '_', case_key).strip('_')
+
+
+def _key_stem(case_key):
+    """File name stem for a case key: readable, plus a hash so keys that sanitize alike stay apart."""
+    return f"{_safe_name(case_key)}-{hashlib.sha1(case_key.encode('utf-8')).hexdigest()[:8]}"
+
+
+class PdfCache:
+    """
+    On-disk cache of rendered case PDFs.
+
+    Files are named <case key>-<key hash>-<content hash>.pdf, so a changed
+    case or order history renders a new file and the old one is removed.
+    Concurrent requests for the same document share one render.
+    """
+    def __init__(self, cache_dir=PDF_CACHE_DIR):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'renders': 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path_for(self, case_key, digest):
+        return os.path.join(self.cache_dir, f"{_key_stem(case_key)}-{digest[:32]}.pdf")
+
+    def locate(self, case_key, case_data, history):
+        """Return (path, etag, cached) without rendering."""
+        digest = content_hash(case_data, history)
+        path = self.path_for(case_key, digest)
+        cached = os.path.exists(path)
+        if cached:
+            with self._lock:
+                self._stats['hits'] += 1
+        return path, digest, cached
+
+    def get(self, case_key, case_data, history):
+        """Return (path, etag) for the document, rendering it if it is not cached yet."""
+        path, digest, cached = self.locate(case_key, case_data, history)
+        if not cached:
+            self._flight.do(path, lambda: self._render(case_key, case_data, history, path))
+        return path, digest
+
+    def _render(self, case_key, case_data, history, path):
+        if not os.path.exists(path):
+            render_case_file(case_data, history, path)
+            self.rendered(case_key, path)
+
+    def rendered(self, case_key, path):
+        """Record a document rendered into the cache (possibly by another process) and drop older versions."""
+        with self._lock:
+            self._stats['renders'] += 1
+        logger.info(f"PDF rendered for case: {case_key}")
+        stem = _key_stem(case_key)
+        for name in os.listdir(self.cache_dir):
+            stale = os.path.join(self.cache_dir, name)
+            if name.endswith('.pdf') and name.rsplit('-', 1)[0] == stem and stale != path:
+                try:
+                    os.unlink(stale)
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,149 @@
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Selenium locator strategies (same values as selenium.webdriver.common.by.By),
+# kept as plain strings so this module works with fake drivers in isolation.
+BY_ID = "id"
+BY_CLASS_NAME = "class name"
+BY_XPATH = "xpath"
+
+# Messages the site shows in place of the results table (matched case-insensitively)
+CAPTCHA_REJECTED_TEXT = 'invalid captcha'
+NO_RECORD_TEXT = 'no record found'
+
+# Per-step timeouts in seconds
+DEFAULT_STEP_TIMEOUTS = {
+    'page_load': 30,
+    'form_ready': 30,
+    'captcha_ready': 10,
+    'captcha_reload': 10,
+    'results': 5,
+}
+
+
+def _text_xpath(text):
+    """XPath for elements whose text contains `text`, ignoring case."""
+    return (
+        "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), "
+        f"'{text}')]"
+    )
+
+
+class ReadinessTimeout(Exception):
+    """Raised when a page never reaches the expected state within the step timeout."""
+    def __init__(self, step, timeout):
+        super().__init__(f"Step '{step}' not ready after {timeout}s")
+        self.step = step
+        self.timeout = timeout
+
+
+class PageReadiness:
+    """
+    Event-driven replacement for fixed sleeps on the case-status page.
+
+    Each wait polls a concrete DOM condition and returns as soon as it holds.
+    Every step's wait time is recorded in `timings` as (step, seconds, ok) so
+    scrape latency can be attributed to the phase that caused it.
+    """
+    def __init__(self, driver, step_timeouts=None, poll_interval=0.05):
+        self.driver = driver
+        self.step_timeouts = dict(DEFAULT_STEP_TIMEOUTS)
+        if step_timeouts:
+            self.step_timeouts.update(step_timeouts)
+        self.poll_interval = poll_interval
+        self.timings = []
+
+    def _wait(self, step, condition):
+        """Poll `condition` until it returns a truthy value or the step times out."""
+        timeout = self.step_timeouts.get(step, 10)
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            try:
+                result = condition()
+            except Exception:
+                # Elements can be missing or stale while the page is re-rendering.
+                result = None
+            if result:
+                self.timings.append((step, time.monotonic() - started, True))
+                return result
+            if time.monotonic() >= deadline:
+                self.timings.append((step, time.monotonic() - started, False))
+                raise ReadinessTimeout(step, timeout)
+            time.sleep(self.poll_interval)
+
+    def _find(self, by, value):
+        elements = self.driver.find_elements(by, value)
+        return elements[0] if elements else None
+
+    def wait_for_page_load(self):
+        """Wait until the browser reports the document as fully loaded."""
+        return self._wait('page_load', lambda: self.driver.execute_script("return document.readyState") == "complete")
+
+    def wait_for_form(self):
+        """Wait until the case-type dropdown exists and its options are populated."""
+        def populated():
+            select = self._find(BY_ID, 'c_type')
+            if select is not None and len(select.find_elements("tag name", "option")) > 1:
+                return select
+            return None
+        return self._wait('form_ready', populated)
+
+    def captcha_src(self):
+        """Return the current captcha image src, or None if it is not on the page."""
+        image = self._find(BY_ID, 'captcha-image')
+        return image.get_attribute('src') if image is not None else None
+
+    def _captcha_loaded(self, previous_src=None):
+        image = self._find(BY_ID, 'captcha-image')
+        if image is None:
+            return None
+        src = image.get_attribute('src')
+        if not src or src == previous_src:
+            return None
+        loaded = self.driver.execute_script(
+            "return arguments[0].complete && arguments[0].naturalWidth > 0", image
+        )
+        return image if loaded else None
+
+    def wait_for_captcha(self):
+        """Wait until the captcha image has finished loading."""
+        return self._wait('captcha_ready', lambda: self._captcha_loaded())
+
+    def wait_for_captcha_reload(self, previous_src):
+        """Wait until the captcha image src changes from `previous_src` and the new image is loaded."""
+        return self._wait('captcha_reload', lambda: self._captcha_loaded(previous_src))
+
+    def captcha_errors(self):
+        """Invalid-captcha messages currently on the page (pass to wait_for_results before resubmitting)."""
+        return self.driver.find_elements(BY_XPATH, _text_xpath(CAPTCHA_REJECTED_TEXT))
+
+    def wait_for_results(self, stale_errors=()):
+        """
+        Wait until the submitted search is answered. Returns 'results' (the
+        results table is rendered), 'not_found' (a no-record message) or
+        'captcha_rejected' (an invalid-captcha message not in `stale_errors`),
+        whichever appears first.
+        """
+        def answered():
+            if self._find(BY_CLASS_NAME, 'table-bordered') is not None:
+                return 'results'
+            if self._find(BY_XPATH, _text_xpath(NO_RECORD_TEXT)) is not None:
+                return 'not_found'
+            if any(error not in stale_errors for error in self.captcha_errors()):
+                return 'captcha_rejected'
+            return None
+        return self._wait('results', answered)
+
+    def total_wait(self):
+        """Total seconds spent waiting across all recorded steps."""
+        return sum(seconds for _, seconds, _ in self.timings)
+
+    def report(self):
+        """Per-step wait timings as a list of dicts, suitable for logging or JSON."""
+        return [
+            {'step': step, 'seconds': round(seconds, 4), 'ok': ok}
+            for step, seconds, ok in self.timings
+        ]
@@ -0,0 +1,373 @@
+"""
+Retention for the query/response log.
+
+Response payloads are stored once per distinct content in response_blobs,
+keyed by their SHA-256, so looking up an unchanged case again adds a
+responses row but no new payload; raw_response is only kept when it is more
+than the same JSON again. RetentionManager keeps the log bounded:
+
+- compress: payloads no response has used for RETENTION_COMPRESS_AFTER_DAYS
+  are compressed with zstd (when the zstandard package is installed) or zlib;
+- archive: responses older than RETENTION_ARCHIVE_AFTER_DAYS are written with
+  their queries to rotated, compressed NDJSON files in RETENTION_ARCHIVE_DIR,
+  then deleted along with payloads nothing references any more. The
+  response behind each case's current case_data row is kept;
+- vacuum: freed pages are handed back to the filesystem with incremental
+  VACUUM, at most RETENTION_VACUUM_PAGES per run.
+
+Every run stores a report in retention_runs: rows and bytes per step, the
+database size before and after, and cached-lookup latency before and after.
+Archive files are complete before any row is deleted, so a crash can repeat
+rows in the archive but not lose them.
+"""
+import os
+import gzip
+import json
+import time
+import zlib
+import hashlib
+import logging
+import threading
+import statistics
+import importlib.util
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+RETENTION_COMPRESS_AFTER_DAYS = float(os.environ.get("RETENTION_COMPRESS_AFTER_DAYS", "7"))
+RETENTION_ARCHIVE_AFTER_DAYS = float(os.environ.get("RETENTION_ARCHIVE_AFTER_DAYS", "180"))
+RETENTION_ARCHIVE_DIR = os.environ.get("RETENTION_ARCHIVE_DIR", "data/archive")
+RETENTION_ARCHIVE_FILE_MB = float(os.environ.get("RETENTION_ARCHIVE_FILE_MB", "64"))
+RETENTION_ARCHIVE_KEEP_FILES = int(os.environ.get("RETENTION_ARCHIVE_KEEP_FILES", "0"))
+RETENTION_VACUUM_PAGES = int(os.environ.get("RETENTION_VACUUM_PAGES", "10000"))
+# Rows archived per run; the rest wait for the next run
+RETENTION_MAX_ROWS = int(os.environ.get("RETENTION_MAX_ROWS", "100000"))
+RETENTION_BATCH_SIZE = 1000
+# Payloads smaller than this are left uncompressed
+MIN_COMPRESS_BYTES = 64
+# How long a started run keeps other processes from starting one
+RUN_LEASE_SECONDS = 6 * 3600
+LATENCY_PROBE_CASES = 50
+
+ZSTD_AVAILABLE = importlib.util.find_spec('zstandard') is not None
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+
+DAY = 24 * 3600
+
+INSERT_BLOB_SQL = '''
+    INSERT INTO response_blobs (hash, data, size) VALUES (?, ?, ?)
+    ON CONFLICT (hash) DO NOTHING
+'''
+
+
+def payload_hash(payload):
+    """Content hash a payload is stored under in response_blobs"""
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def compress_payload(payload):
+    """(encoding, compressed bytes) of a payload, with zstd when available"""
+    data = payload.encode('utf-8')
+    if ZSTD_AVAILABLE:
+        import zstandard
+        return 'zstd', zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return 'zlib', zlib.compress(data, ZLIB_LEVEL)
+
+
+def inflate_payload(encoding, data):
+    """A stored payload as text; registered on every connection as the inflate_payload() SQL function."""
+    if data is None or encoding == 'plain':
+        return data
+    if encoding == 'zlib':
+        return zlib.decompress(data).decode('utf-8')
+    if encoding == 'zstd':
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+    raise ValueError(f"Unknown payload encoding: {encoding}")
+
+
+def move_payloads_to_blobs(cursor, batch_size=RETENTION_BATCH_SIZE):
+    """
+    Move inline responses.parsed_data into response_blobs, dropping
+    raw_response where it is the same JSON. Returns the number of rows moved.
+    """
+    moved, last_id = 0, 0
+    while True:
+        rows = cursor.execute('''
+            SELECT id, parsed_data, raw_response FROM responses
+            WHERE parsed_data IS NOT NULL AND id > ?
+            ORDER BY id LIMIT ?
+        ''', (last_id, batch_size)).fetchall()
+        if not rows:
+            return moved
+        blobs, updates = {}, []
+        for row_id, payload, raw_response in rows:
+            digest = payload_hash(payload)
+            blobs[digest] = (digest, payload, len(payload.encode('utf-8')))
+            updates.append((digest, None if raw_response == payload else raw_response, row_id))
+        cursor.executemany(INSERT_BLOB_SQL, blobs.values())
+        cursor.executemany(
+            "UPDATE responses SET payload_hash = ?, raw_response = ?, parsed_data = NULL WHERE id = ?", updates
+        )
+        moved += len(rows)
+        last_id = rows[-1][0]
+
+
+def sql_timestamp(ts):
+    """Unix time as SQLite CURRENT_TIMESTAMP text (UTC), for comparing with timestamp columns"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(ts))
+
+
+def archive_record(row):
+    """The NDJSON record of an archived response and its query"""
+    return {
+        'response_id': row['id'],
+        'query_id': row['query_id'],
+        'case_type': row['case_type'],
+        'case_number': row['case_number'],
+        'filing_year': row['filing_year'],
+        'queried_at': row['queried_at'],
+        'ip_address': row['ip_address'],
+        'user_agent': row['user_agent'],
+        'status': row['status'],
+        'error_message': row['error_message'],
+        'responded_at': row['timestamp'],
+        'latency_ms': row['latency_ms'],
+        'parsed_data': json.loads(row['parsed_data']) if row['parsed_data'] else None,
+        'raw_response': row['raw_response'],
+    }
+
+
+class ArchiveWriter:
+    """
+    Writes NDJSON records to compressed files in `directory`, starting a new
+    file after every `max_bytes` of uncompressed output. Files are written
+    as .part and renamed once complete and synced.
+    """
+    def __init__(self, directory, max_bytes, clock=time.time):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = '.ndjson.zst' if ZSTD_AVAILABLE else '.ndjson.gz'
+        self.stamp = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime(clock()))
+        self.files = []
+        self.bytes_written = 0  # compressed, across finished files
+        self._raw = self._stream = None
+        self._path = None
+        self._written = 0
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._path = os.path.join(self.directory, f"responses-{self.stamp}-{len(self.files) + 1:03d}{self.extension}")
+        self._raw = open(self._path + '.part', 'wb')
+        if ZSTD_AVAILABLE:
+            import zstandard
+            self._stream = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='wb')
+        self._written = 0
+
+    def _finish(self):
+        self._stream.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.replace(self._path + '.part', self._path)
+        self.bytes_written += os.path.getsize(self._path)
+        self.files.append(self._path)
+        self._raw = self._stream = None
+
+    def write(self, record):
+        if self._stream is None:
+            self._open()
+        line = (json.dumps(record) + '\n').encode('utf-8')
+        self._stream.write(line)
+        self._written += len(line)
+        if self._written >= self.max_bytes:
+            self._finish()
+
+    def close(self):
+        """Finish the open file; returns the paths of every file written."""
+        if self._stream is not None:
+            self._finish()
+        return self.files
+
+
+def prune_archives(directory, keep):
+    """Delete all but the newest `keep` archive files; returns the paths deleted."""
+    if keep <= 0 or not os.path.isdir(directory):
+        return []
+    names = sorted(n for n in os.listdir(directory) if n.startswith('responses-') and not n.endswith('.part'))
+    removed = [os.path.join(directory, n) for n in names[:-keep]]
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+class RetentionManager:
+    """
+    Compresses, archives and vacuums the response log; see the module
+    docstring. Runs from a daemon thread (start) or once (run_once, e.g.
+    `flask retention-run` from cron); a lease in retention_runs keeps two
+    processes from running it at once.
+    """
+    def __init__(self, db_manager, compress_after_days=RETENTION_COMPRESS_AFTER_DAYS,
+                 archive_after_days=RETENTION_ARCHIVE_AFTER_DAYS, archive_dir=RETENTION_ARCHIVE_DIR,
+                 archive_file_bytes=int(RETENTION_ARCHIVE_FILE_MB * 2**20), keep_files=RETENTION_ARCHIVE_KEEP_FILES,
+                 vacuum_pages=RETENTION_VACUUM_PAGES, max_rows=RETENTION_MAX_ROWS, clock=time.time):
+        self.db_manager = db_manager
+        self.compress_after_days = compress_after_days
+        self.archive_after_days = archive_after_days
+        self.archive_dir = archive_dir
+        self.archive_file_bytes = archive_file_bytes
+        self.keep_files = keep_files
+        self.vacuum_pages = vacuum_pages
+        self.max_rows = max_rows
+        self.clock = clock
+        self._stop = threading.Event()
+        self._thread = None
+
+    def probe_latency(self):
+        """Median ms of a cached-tier lookup (get_latest_response) over a sample of stored cases"""
+        cases = self.db_manager.sample_case_queries(LATENCY_PROBE_CASES)
+        if not cases:
+            return None
+        timings = []
+        for _ in range(2):  # the first pass warms the page cache
+            timings = []
+            for case in cases:
+                started = time.perf_counter()
+                self.db_manager.get_latest_response(case['case_type'], case['case_number'], case['filing_year'])
+                timings.append((time.perf_counter() - started) * 1000)
+        return round(statistics.median(timings), 3)
+
+    def compress(self, report):
+        """Compress payloads that no response has used since the cutoff."""
+        if self.compress_after_days is None or self.compress_after_days < 0:
+            return
+        cutoff = sql_timestamp(self.clock() - self.compress_after_days * DAY)
+        compressed = saved = 0
+        after = ''
+        while not self._stop.is_set():
+            blobs = self.db_manager.get_cold_blobs(cutoff, MIN_COMPRESS_BYTES, after, RETENTION_BATCH_SIZE)
+            if not blobs:
+                break
+            after = blobs[-1]['hash']
+            updates = []
+            for blob in blobs:
+                encoding, data = compress_payload(blob['data'])
+                updates.append((encoding, data, blob['hash']))
+                saved += len(blob['data'].encode('utf-8')) - len(data)
+            self.db_manager.update_blobs(updates)
+            compressed += len(updates)
+        report.update(blobs_compressed=compressed, compression_bytes_saved=saved)
+
+    def archive(self, report):
+        """Archive responses older than the cutoff to NDJSON files, then delete them."""
+        if not self.archive_after_days or self.archive_after_days <= 0:
+            return
+        cutoff = sql_timestamp(self.clock() - self.archive_after_days * DAY)
+        writer = ArchiveWriter(self.archive_dir, self.archive_file_bytes, self.clock)
+        response_ids, query_ids, hashes = [], set(), set()
+        after = None
+        while len(response_ids) < self.max_rows and not self._stop.is_set():
+            limit = min(RETENTION_BATCH_SIZE, self.max_rows - len(response_ids))
+            rows = self.db_manager.get_archivable_responses(cutoff, after, limit)
+            if not rows:
+                break
+            for row in rows:
+                writer.write(archive_record(row))
+                response_ids.append(row['id'])
+                query_ids.add(row['query_id'])
+                if row['payload_hash']:
+                    hashes.add(row['payload_hash'])
+            after = (rows[-1]['timestamp'], rows[-1]['id'])
+        files = writer.close()
+
+        deleted = {'responses': 0, 'queries': 0, 'jobs': 0, 'blobs': 0}
+        for i in range(0, len(response_ids), RETENTION_BATCH_SIZE):
+            counts = self.db_manager.delete_responses(response_ids[i:i + RETENTION_BATCH_SIZE])
+            for name, count in counts.items():
+                deleted[name] += count
+        for name, count in self.db_manager.delete_orphans(sorted(query_ids), sorted(hashes)).items():
+            deleted[name] += count
+        pruned = prune_archives(self.archive_dir, self.keep_files)
+
+        metrics.RETENTION_ROWS_ARCHIVED.inc(len(response_ids))
+        report.update(
+            rows_archived=len(response_ids), archive_files=files, archive_bytes=writer.bytes_written,
+            deleted=deleted, archive_files_pruned=len(pruned)
+        )
+
+    def vacuum(self, report, full=False):
+        """Return free pages to the filesystem; `full` also repacks partly empty pages."""
+        if self.vacuum_pages is None or self.vacuum_pages < 0:
+            return
+        report['vacuum'] = self.db_manager.incremental_vacuum(self.vacuum_pages, full=full)
+        if report['vacuum']['full']:
+            logger.warning("Retention: ran a full VACUUM")
+        elif report['vacuum'].get('skipped'):
+            logger.warning(f"Retention: skipped VACUUM ({report['vacuum']['skipped']}); "
+                           "run `flask retention-run --full-vacuum` once to convert the database")
+
+    def run_once(self, full_vacuum=False):
+        """
+        One compress/archive/vacuum pass; returns its report, or None if another
+        run holds the lease. A full VACUUM (`full_vacuum`) locks the database
+        while it rewrites it, but is the only way to get back the space left
+        inside pages by migration 7, which moved payloads out of responses.
+        """
+        started = self.clock()
+        run_id = self.db_manager.claim_retention_run(started, RUN_LEASE_SECONDS)
+        if run_id is None:
+            logger.info("Retention: another run is in progress, skipping")
+            return None
+        before = self.db_manager.get_storage_stats()
+        report = {'run_id': run_id, 'storage_before': before, 'lookup_ms_before': self.probe_latency()}
+        try:
+            steps = (
+                ('compress', self.compress),
+                ('archive', self.archive),
+                ('vacuum', lambda report: self.vacuum(report, full=full_vacuum)),
+            )
+            for name, step in steps:
+                step_started = time.perf_counter()
+                with metrics.span(f'retention.{name}'):
+                    step(report)
+                report[f'{name}_seconds'] = round(time.perf_counter() - step_started, 3)
+        finally:
+            after = self.db_manager.get_storage_stats()
+            reclaimed = before['file_bytes'] - after['file_bytes']
+            metrics.RETENTION_BYTES_RECLAIMED.inc(max(reclaimed, 0))
+            report.update(
+                storage_after=after, bytes_reclaimed=reclaimed, lookup_ms_after=self.probe_latency(),
+                seconds=round(self.clock() - started, 3)
+            )
+            self.db_manager.finish_retention_run(run_id, self.clock(), report)
+        logger.info(
+            f"Retention: archived {report.get('rows_archived', 0)} responses, compressed "
+            f"{report.get('blobs_compressed', 0)} payloads, reclaimed {reclaimed} bytes "
+            f"(lookup p50 {report['lookup_ms_before']} -> {report['lookup_ms_after']} ms)"
+        )
+        return report
+
+    def _loop(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Retention run failed: {e}")
+
+    def start(self, interval=DAY):
+        """Run every `interval` seconds on a daemon thread, starting one interval from now."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, args=(interval,), name='retention', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
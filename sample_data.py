@@ -1,4 +1,5 @@
 """Mock data for Delhi High Court cases"""
+from case_store import CaseStore
 
 CASE_TYPES = [
     "W.P.(C)", "CRL.A.", "FAO(OS)", "CRL.M.A.", "MAT.APP.", "CO.APP.",
@@ -121,3 +122,6 @@ MOCK_CASES = {
         "pdf_link": "https://delhihighcourt.nic.in/judgments/sample_ARBA_12_2024.pdf"
     }
 }
+
+# Interned, indexed copy of MOCK_CASES for lookups and the index page filters
+MOCK_CASE_STORE = CaseStore(MOCK_CASES)
@@ -1,169 +1,251 @@
-import requests
-from bs4 import BeautifulSoup
 import time
-import re
-from urllib.parse import urljoin
 import logging
-import json
-import io
-
-# --- New/Updated Imports for Selenium & OpenCV Approach ---
-try:
-    from PIL import Image
-    import pytesseract
-    import cv2 # OpenCV for advanced image processing
-    import numpy as np # Required by OpenCV
-    from selenium import webdriver
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.support.ui import Select
-    from webdriver_manager.chrome import ChromeDriverManager
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    SELENIUM_AVAILABLE = False
-
-# Import from your renamed sample_data.py file
-from sample_data import MOCK_CASES
+import os
+import threading
+
+# Selenium, OpenCV/Tesseract, requests and the HTML parsers are imported on
+# first use (see load_backends) so the mock scraper and app start-up stay light.
+from sample_data import MOCK_CASE_STORE
+from driver_pool import DriverPool, DriverPoolTimeout
+from readiness import PageReadiness, ReadinessTimeout
+from metrics import span, timed, CAPTCHA_ATTEMPTS, CAPTCHA_SOLVED
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Warm browser pool settings for the live scraper
+DRIVER_POOL_SIZE = int(os.environ.get("DRIVER_POOL_SIZE", "2"))
+DRIVER_POOL_MAX_USES = int(os.environ.get("DRIVER_POOL_MAX_USES", "50"))
+
+# Live scraping engine: "selenium" drives headless Chrome, "http" posts the form directly
+SCRAPER_BACKEND = os.environ.get("SCRAPER_BACKEND", "selenium")
+
+COURT_BASE_URL = os.environ.get("COURT_BASE_URL", "https://delhihighcourt.nic.in").rstrip('/')
+CASE_STATUS_URL = f"{COURT_BASE_URL}/case-status"
+
+_driver_pool = None
+_driver_pool_lock = threading.Lock()
+_captcha_solver = None
+_site_guard = None
+
+
+def selenium_available():
+    """Whether Selenium and webdriver-manager are installed; imports them on first call."""
+    from selenium_backend import SELENIUM_AVAILABLE
+    return SELENIUM_AVAILABLE
+
+
+def create_chrome_driver():
+    """Initializes and returns a headless Chrome WebDriver instance."""
+    from selenium_backend import create_chrome_driver
+    return create_chrome_driver()
+
+
+# name -> modules imported by load_backends(); 'selenium' also pulls in the
+# CAPTCHA solver since every browser scrape needs it
+BACKEND_MODULES = {
+    'selenium': ('selenium_backend', 'captcha'),
+    'http': ('http_scraper', 'captcha'),
+    'captcha': ('captcha',),
+    'parser': ('case_parser',),
+}
+
+
+def load_backends(names):
+    """
+    Import the named live-scraping backends now rather than on first use, e.g.
+    in a prefork server's master process so workers share the loaded modules.
+    Returns the module names imported.
+    """
+    import importlib
+    loaded = []
+    for name in names:
+        for module in BACKEND_MODULES.get(name, ()):
+            if module not in loaded:
+                importlib.import_module(module)
+                loaded.append(module)
+    return loaded
+
+
+def get_driver_pool():
+    """Return the process-wide pool of warm Chrome sessions, creating it on first use."""
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            _driver_pool = DriverPool(
+                create_chrome_driver,
+                size=DRIVER_POOL_SIZE,
+                max_uses=DRIVER_POOL_MAX_USES,
+                warm_url=CASE_STATUS_URL,
+            )
+        return _driver_pool
+
+
+def make_case_key(case_type, case_number, filing_year):
+    """Builds the normalized case key, e.g. 'CRL.A.567.2023', used across caches and mock data."""
+    return f"{case_type.strip().rstrip('.')}.{str(case_number).strip()}.{str(filing_year).strip()}"
+
+
+def split_case_key(case_key):
+    """Inverse of make_case_key: returns (case_type, case_number, filing_year), or None if malformed."""
+    parts = case_key.rsplit('.', 2)
+    if len(parts) != 3 or not all(parts):
+        return None
+    case_type, case_number, filing_year = parts
+    return case_type.rstrip('.'), case_number, filing_year
+
+
+def get_captcha_solver():
+    """Return the process-wide CAPTCHA solver, creating it on first use."""
+    global _captcha_solver
+    with _driver_pool_lock:
+        if _captcha_solver is None:
+            from captcha import CaptchaSolver
+            _captcha_solver = CaptchaSolver()
+        return _captcha_solver
+
+
+def set_captcha_solver(solver):
+    """Replace the process-wide CAPTCHA solver, e.g. with court_simulator.AnswerKeySolver for load tests."""
+    global _captcha_solver
+    with _driver_pool_lock:
+        _captcha_solver = solver
+
 
 class DelhiHighCourtScraper:
     """
     Scraper for fetching live case data using Selenium and OpenCV for CAPTCHA solving.
     """
-    def __init__(self):
-        self.base_url = "https://delhihighcourt.nic.in"
-        self.case_status_url = f"{self.base_url}/case-status"
+    def __init__(self, driver_pool=None, step_timeouts=None, captcha_solver=None):
+        self.base_url = COURT_BASE_URL
+        self.case_status_url = CASE_STATUS_URL
+        self.driver_pool = driver_pool
+        self.captcha_solver = captcha_solver or get_captcha_solver()
+        self.step_timeouts = step_timeouts
+        self.last_timings = []
         
-        if not SELENIUM_AVAILABLE:
+        if driver_pool is None and not selenium_available():
             logger.warning("Required libraries (Selenium, OpenCV, etc.) are not installed. The live scraper will not work.")
             logger.warning("Install them via requirements.txt")
 
-    def _get_driver(self):
-        """Initializes and returns a Selenium WebDriver instance."""
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--window-size=1920,1080')
-        service = Service(ChromeDriverManager().install())
-        return webdriver.Chrome(service=service, options=options)
+    def _get_pool(self):
+        """Returns the driver pool, falling back to the shared process-wide pool."""
+        if self.driver_pool is None:
+            self.driver_pool = get_driver_pool()
+        return self.driver_pool
 
+    @timed('scrape.captcha_solve')
     def _solve_captcha_with_opencv(self, image_bytes):
         """
-        Processes a CAPTCHA image using OpenCV and solves it with Tesseract.
+        Solves a CAPTCHA image with the multi-variant OpenCV + Tesseract solver.
         """
-        try:
-            # Step 1: Read the in-memory image bytes with OpenCV
-            image_array = np.frombuffer(image_bytes, np.uint8)
-            img = cv2.imdecode(image_array, cv2.IMREAD_COLOR)
-
-            # Step 2: Pre-process the image (Grayscale and Thresholding)
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV) # Inverting can sometimes help
-
-            # Step 3: Perform OCR with a specific configuration for digits
-            custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789abcdefghijklmnopqrstuvwxyz'
-            captcha_text = pytesseract.image_to_string(thresh, config=custom_config).strip()
-            
-            captcha_text = re.sub(r'[^a-zA-Z0-9]', '', captcha_text)
-            logger.info(f"OpenCV+Tesseract OCR Result: '{captcha_text}'")
-            
-            return captcha_text if len(captcha_text) > 3 else None
-        except Exception as e:
-            logger.error(f"An error occurred during OpenCV CAPTCHA solving: {e}")
-            return None
+        return self.captcha_solver.solve(image_bytes)
 
 
     def search_case(self, case_type, case_number, filing_year, **kwargs):
         """
         Attempts to fetch real case details from the court website using Selenium.
         """
-        if not SELENIUM_AVAILABLE:
+        if self.driver_pool is None and not selenium_available():
+            return False, {}, "Selenium libraries are not installed. Cannot perform live scrape."
+        try:
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support.ui import Select
+        except ImportError:
             return False, {}, "Selenium libraries are not installed. Cannot perform live scrape."
 
-        driver = self._get_driver()
+        pool = self._get_pool()
+        try:
+            with span('scrape.driver_checkout'):
+                driver = pool.checkout()
+        except DriverPoolTimeout as e:
+            logger.error(f"No browser session available: {e}")
+            return False, {}, "The live scraper is busy. Please try again shortly."
+        broken = False
+        readiness = PageReadiness(driver, step_timeouts=self.step_timeouts)
+        self.last_timings = readiness.timings
         try:
             logger.info(f"Attempting LIVE scrape for: {case_type}/{case_number}/{filing_year}")
-            driver.get(self.case_status_url)
-            time.sleep(2)
+            # Pooled sessions are parked on the case-status page; only navigate if not.
+            with span('scrape.page_load'):
+                if not driver.current_url.startswith(self.case_status_url):
+                    driver.get(self.case_status_url)
+                    readiness.wait_for_page_load()
 
-            logger.info("Filling out the search form...")
-            select_element = WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.ID, 'c_type'))
-            )
-            Select(select_element).select_by_visible_text(case_type.rstrip('.'))
-            
-            driver.find_element(By.ID, 'c_no').send_keys(case_number)
-            driver.find_element(By.ID, 'c_year').send_keys(filing_year)
+                logger.info("Filling out the search form...")
+                select_element = readiness.wait_for_form()
 
             for attempt in range(3):
                 logger.info(f"Attempt {attempt + 1} to solve CAPTCHA...")
-                captcha_element = driver.find_element(By.ID, "captcha-image")
-                
-                image_bytes = captcha_element.screenshot_as_png
+                # A rejected CAPTCHA can come back as a fresh, empty form
+                if attempt:
+                    select_element = readiness.wait_for_form()
+                Select(select_element).select_by_visible_text(case_type.rstrip('.'))
+                for field_id, value in (('c_no', case_number), ('c_year', filing_year)):
+                    field = driver.find_element(By.ID, field_id)
+                    field.clear()
+                    field.send_keys(value)
+
+                with span('scrape.captcha_load'):
+                    captcha_element = readiness.wait_for_captcha()
+                    image_bytes = captcha_element.screenshot_as_png
                 captcha_solution = self._solve_captcha_with_opencv(image_bytes)
 
                 if not captcha_solution:
                     logger.warning("OCR failed to produce a result, retrying...")
-                    driver.find_element(By.ID, 'reload-captcha').click()
-                    time.sleep(2)
+                    self._reload_captcha(driver, readiness)
                     continue
 
-                driver.find_element(By.ID, "captcha").send_keys(captcha_solution)
+                captcha_input = driver.find_element(By.ID, "captcha")
+                captcha_input.clear()
+                captcha_input.send_keys(captcha_solution)
+                stale_errors = readiness.captcha_errors()
                 driver.find_element(By.ID, 'search').click()
+                CAPTCHA_ATTEMPTS.inc(scraper='selenium')
 
                 try:
-                    WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "table-bordered"))
-                    )
-                    logger.info("CAPTCHA solved successfully!")
-                    case_data = self._parse_response(driver.page_source, case_type, case_number, filing_year)
-                    return True, case_data, ""
-                except:
-                    logger.warning("CAPTCHA likely failed, retrying...")
-                    driver.find_element(By.ID, 'reload-captcha').click()
-                    time.sleep(2)
+                    with span('scrape.results_wait'):
+                        outcome = readiness.wait_for_results(stale_errors)
+                except ReadinessTimeout:
+                    logger.warning("No answer to the search, retrying...")
+                    self._reload_captcha(driver, readiness)
+                    continue
+                if outcome == 'captcha_rejected':
+                    logger.warning("CAPTCHA rejected, retrying...")
+                    self._reload_captcha(driver, readiness)
+                    continue
+
+                logger.info("CAPTCHA solved successfully!")
+                CAPTCHA_SOLVED.inc(scraper='selenium')
+                if outcome == 'not_found':
+                    return False, {}, "Case not found on the court website."
+                case_data = self._parse_response(driver.page_source, case_type, case_number, filing_year)
+                if not case_data:
+                    return False, {}, "Case not found on the court website."
+                return True, case_data, ""
             
             return False, {}, "Failed to solve CAPTCHA after multiple attempts."
 
         except Exception as e:
             logger.error(f"An error occurred during the Selenium scrape: {e}")
+            broken = True
             return False, {}, "An unexpected error occurred during the live scrape."
         finally:
-            driver.quit()
+            logger.info(f"Live scrape wait timings: {readiness.report()} (total {readiness.total_wait():.2f}s)")
+            pool.checkin(driver, broken=broken)
 
+    @timed('scrape.captcha_reload')
+    def _reload_captcha(self, driver, readiness):
+        """Requests a new CAPTCHA and waits until the replacement image has loaded."""
+        from selenium.webdriver.common.by import By
+        previous_src = readiness.captcha_src()
+        driver.find_element(By.ID, 'reload-captcha').click()
+        readiness.wait_for_captcha_reload(previous_src)
+
+    @timed('scrape.parse')
     def _parse_response(self, html_content, case_type, case_number, filing_year):
-        # This function remains the same as it correctly parses the results table
-        soup = BeautifulSoup(html_content, 'html.parser')
-        parsed_data = { 'case_number': f"{case_number}/{filing_year}", 'case_type': case_type }
-        try:
-            details_table = soup.find('table', {'class': 'table-bordered'})
-            if not details_table: return None
-            rows = details_table.find_all('tr')
-            for row in rows:
-                cells = row.find_all('td')
-                if len(cells) < 2: continue
-                label = cells[0].text.strip().lower()
-                value = cells[1].text.strip()
-                if 'case title' in label:
-                    parsed_data['case_title'] = value
-                    if 'vs' in value.lower():
-                        parts = re.split(r'\s+vs\s+', value, flags=re.IGNORECASE)
-                        parsed_data['petitioner_name'] = parts[0].strip()
-                        parsed_data['respondent_name'] = parts[1].strip()
-                elif 'filing date' in label: parsed_data['filing_date'] = value
-                elif 'next date' in label: parsed_data['next_hearing_date'] = value
-                elif 'status' in label: parsed_data['case_status'] = value
-            return parsed_data
-        except Exception as e:
-            logger.error(f"Error parsing live response: {e}")
-            return None
+        from case_parser import parse_case_details
+        return parse_case_details(html_content, case_type, case_number, filing_year, base_url=CASE_STATUS_URL)
 
 
 class MockScraper:
@@ -171,20 +253,17 @@ class MockScraper:
     Mock scraper that uses a centralized, corrected data source for development.
     """
     def __init__(self):
-        self.mock_data = MOCK_CASES
+        self.mock_data = MOCK_CASE_STORE
         logger.info(f"MockScraper initialized with {len(self.mock_data)} cases.")
 
     def search_case(self, case_type, case_number, filing_year, **kwargs):
         """
-        Mock search that returns predefined data from the MOCK_CASES dictionary.
+        Mock search that returns predefined data from the MOCK_CASE_STORE column store.
         """
         time.sleep(0.5)
         
-        # --- THIS IS THE FIX ---
         # Remove any trailing dots from the case_type before creating the key.
-        cleaned_case_type = case_type.rstrip('.')
-        
-        case_key = f"{cleaned_case_type}.{case_number}.{filing_year}"
+        case_key = make_case_key(case_type, case_number, filing_year)
         
         if case_key in self.mock_data:
             logger.info(f"Mock scraper: Found case '{case_key}'")
@@ -194,13 +273,34 @@ class MockScraper:
             return False, {}, "Case not found in the mock records. Please try another sample case."
 
 
-def get_scraper(use_mock: bool = False):
+def get_site_guard():
+    """Return the process-wide rate limiter and circuit breaker for live scrapes."""
+    global _site_guard
+    from site_guard import SiteGuard
+    with _driver_pool_lock:
+        if _site_guard is None:
+            _site_guard = SiteGuard()
+        return _site_guard
+
+
+def get_scraper(use_mock: bool = False, driver_pool=None, backend=None):
     """
     Factory function to get the appropriate scraper instance.
+    The live scraper is chosen by `backend` (default SCRAPER_BACKEND); the Selenium
+    one shares the process-wide warm driver pool unless one is given. Live
+    scrapers are throttled and circuit-broken through the shared SiteGuard.
     """
     if use_mock:
         logger.info("Using MockScraper for development and testing.")
         return MockScraper()
+    from site_guard import GuardedScraper
+    backend = backend or SCRAPER_BACKEND
+    if backend == 'http':
+        from http_scraper import HttpCourtScraper
+        logger.info("Using LIVE HttpCourtScraper.")
+        scraper = HttpCourtScraper()
     else:
         logger.info("Using LIVE DelhiHighCourtScraper with Selenium.")
-        return DelhiHighCourtScraper()
+        scraper = DelhiHighCourtScraper(driver_pool=driver_pool)
+    # Every live scraper shares one throttle and circuit breaker for the court site
+    return GuardedScraper(scraper, get_site_guard())
@@ -0,0 +1,26 @@
+"""
+Selenium and webdriver-manager imports for the live browser scraper.
+
+Kept out of scraper.py so that importing the app (mock mode, HTTP backend,
+CLI commands) does not pay for Selenium; scraper.py loads this module the
+first time a DelhiHighCourtScraper is created or the driver pool is built.
+"""
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    from webdriver_manager.chrome import ChromeDriverManager
+    SELENIUM_AVAILABLE = True
+except ImportError:
+    SELENIUM_AVAILABLE = False
+
+
+def create_chrome_driver():
+    """Initializes and returns a headless Chrome WebDriver instance."""
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--window-size=1920,1080')
+    service = Service(ChromeDriverManager().install())
+    return webdriver.Chrome(service=service, options=options)
@@ -0,0 +1,298 @@
+"""
+Throttling and failure isolation for live scrapes of the court site.
+
+- TokenBucket: requests per second with a small burst allowance.
+- AdaptiveRateLimiter: a token bucket whose rate follows AIMD, growing
+  additively after successful scrapes and halving after errors or CAPTCHA
+  failures.
+- CircuitBreaker: after repeated site errors, fails calls immediately for a
+  cool-down period, then lets one probe through to test recovery.
+- SiteGuard: both of the above around a scraper's search_case, classifying
+  its (success, data, error) results.
+
+Every class takes `clock` and `sleep` callables so it can be driven by a fake
+clock.
+"""
+import os
+import time
+import logging
+import threading
+
+from cache import is_not_found
+from metrics import span, SCRAPE_RESULTS
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_RATE_PER_MINUTE = float(os.environ.get("SCRAPE_RATE_PER_MINUTE", "30"))
+SCRAPE_MIN_RATE_PER_MINUTE = float(os.environ.get("SCRAPE_MIN_RATE_PER_MINUTE", "2"))
+SCRAPE_BURST = int(os.environ.get("SCRAPE_BURST", "3"))
+SCRAPE_QUEUE_TIMEOUT = float(os.environ.get("SCRAPE_QUEUE_TIMEOUT", "30"))
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.environ.get("BREAKER_RESET_SECONDS", "60"))
+
+SITE_UNAVAILABLE_ERROR = "The court website is temporarily unavailable. Please try again later."
+RATE_LIMITED_ERROR = "The live scraper is busy. Please try again shortly."
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens per second up to `capacity`."""
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill(self.clock())
+            self.rate = float(rate)
+
+    def try_acquire(self):
+        """Take a token if one is available; returns (acquired, seconds_until_next_token)."""
+        with self._lock:
+            self._refill(self.clock())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True, 0.0
+            return False, (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout=None):
+        """Wait for a token; returns False if none is available within `timeout` seconds."""
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            acquired, wait = self.try_acquire()
+            if acquired:
+                return True
+            if deadline is not None:
+                remaining = deadline - self.clock()
+                if remaining <= 0 or wait > remaining:
+                    return False
+            self.sleep(wait)
+
+    def tokens(self):
+        with self._lock:
+            self._refill(self.clock())
+            return self._tokens
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket with AIMD rate control: +`increase` requests/sec after each
+    success up to `max_rate`, and x`decrease_factor` after each failure down
+    to `min_rate`.
+    """
+    def __init__(self, max_rate, min_rate, burst=1, increase=None, decrease_factor=0.5,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.increase = increase if increase is not None else max_rate / 10
+        self.decrease_factor = decrease_factor
+        self.bucket = TokenBucket(max_rate, burst, clock=clock, sleep=sleep)
+        self._lock = threading.Lock()
+        self._stats = {'acquired': 0, 'rejected': 0, 'increases': 0, 'decreases': 0}
+
+    @property
+    def rate(self):
+        return self.bucket.rate
+
+    def acquire(self, timeout=None):
+        acquired = self.bucket.acquire(timeout)
+        with self._lock:
+            self._stats['acquired' if acquired else 'rejected'] += 1
+        return acquired
+
+    def on_success(self):
+        with self._lock:
+            rate = min(self.max_rate, self.bucket.rate + self.increase)
+            if rate != self.bucket.rate:
+                self._stats['increases'] += 1
+                self.bucket.set_rate(rate)
+
+    def on_failure(self):
+        with self._lock:
+            rate = max(self.min_rate, self.bucket.rate * self.decrease_factor)
+            if rate != self.bucket.rate:
+                self._stats['decreases'] += 1
+                self.bucket.set_rate(rate)
+                logger.warning(f"Scrape rate reduced to {rate * 60:.1f}/min")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['rate_per_minute'] = self.bucket.rate * 60
+        stats['tokens'] = self.bucket.tokens()
+        return stats
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; open ->
+    half-open after `reset_timeout` seconds, when a single probe call is
+    allowed; the probe's outcome closes or re-opens the circuit.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=60, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {'rejected': 0, 'opened': 0}
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self):
+        """Whether a call may go ahead now."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._stats['rejected'] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Circuit closed: court website is responding again")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            state = self._current_state()
+            if state == self.HALF_OPEN or (state == self.CLOSED and self._failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+                self._probe_in_flight = False
+                self._stats['opened'] += 1
+                logger.warning(f"Circuit opened after {self._failures} consecutive failures; "
+                               f"failing fast for {self.reset_timeout:.0f}s")
+
+    def release_probe(self):
+        """Give back a half-open probe slot when the call had no verdict on site health."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['state'] = self._current_state()
+            stats['consecutive_failures'] = self._failures
+            return stats
+
+
+def classify_result(success, error):
+    """
+    Sort a scraper result into 'ok' (site healthy, including "not found"),
+    'captcha' (site up, CAPTCHA not solved), 'local' (a problem on our side)
+    or 'error' (the site failed or timed out).
+    """
+    if success or is_not_found(error):
+        return 'ok'
+    message = (error or '').lower()
+    if 'captcha' in message:
+        return 'captcha'
+    if 'busy' in message or 'not installed' in message:
+        return 'local'
+    return 'error'
+
+
+class SiteGuard:
+    """
+    Rate limiter and circuit breaker shared by every live scraper in the process.
+
+    `call(fetch)` runs a scrape returning (success, data, error) once the
+    breaker allows it and a token is available, and feeds the outcome back:
+    successes raise the rate and close the breaker, CAPTCHA failures lower
+    the rate, and site errors lower the rate and count towards opening the
+    breaker. While the breaker is open calls fail immediately with
+    SITE_UNAVAILABLE_ERROR.
+    """
+    def __init__(self, limiter=None, breaker=None, queue_timeout=SCRAPE_QUEUE_TIMEOUT,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.limiter = limiter or AdaptiveRateLimiter(
+            SCRAPE_RATE_PER_MINUTE / 60, SCRAPE_MIN_RATE_PER_MINUTE / 60, burst=SCRAPE_BURST,
+            clock=clock, sleep=sleep
+        )
+        self.breaker = breaker or CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS, clock=clock)
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._outcomes = {'ok': 0, 'captcha': 0, 'local': 0, 'error': 0, 'short_circuited': 0, 'rate_limited': 0}
+
+    def _count(self, outcome):
+        SCRAPE_RESULTS.inc(outcome=outcome)
+        with self._lock:
+            self._outcomes[outcome] += 1
+
+    def call(self, fetch):
+        if not self.breaker.allow():
+            self._count('short_circuited')
+            return False, {}, SITE_UNAVAILABLE_ERROR
+        with span('scrape.rate_limit_wait'):
+            acquired = self.limiter.acquire(self.queue_timeout)
+        if not acquired:
+            self.breaker.release_probe()
+            self._count('rate_limited')
+            return False, {}, RATE_LIMITED_ERROR
+
+        try:
+            with span('scrape.total'):
+                success, data, error = fetch()
+        except Exception as e:
+            logger.error(f"Scrape raised: {e}")
+            success, data, error = False, {}, "An unexpected error occurred during the live scrape."
+
+        outcome = classify_result(success, error)
+        self._count(outcome)
+        if outcome == 'ok':
+            self.limiter.on_success()
+            self.breaker.record_success()
+        elif outcome == 'captcha':
+            self.limiter.on_failure()
+            self.breaker.release_probe()
+        elif outcome == 'error':
+            self.limiter.on_failure()
+            self.breaker.record_failure()
+        else:
+            self.breaker.release_probe()
+        return success, data, error
+
+    def stats(self):
+        with self._lock:
+            outcomes = dict(self._outcomes)
+        return {'outcomes': outcomes, 'limiter': self.limiter.stats(), 'breaker': self.breaker.stats()}
+
+
+class GuardedScraper:
+    """Wraps a live scraper so every search goes through a SiteGuard."""
+    def __init__(self, scraper, guard):
+        self.scraper = scraper
+        self.guard = guard
+
+    def search_case(self, case_type, case_number, filing_year, **kwargs):
+        return self.guard.call(lambda: self.scraper.search_case(case_type, case_number, filing_year, **kwargs))
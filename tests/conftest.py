@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root rather than in a package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from database import DatabaseManager  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A freshly migrated database in the test's temporary directory."""
+    manager = DatabaseManager(str(tmp_path / 'court.db'))
+    manager.initialize_database()
+    return manager
@@ -0,0 +1,41 @@
+import importlib
+import os
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    pytest.importorskip('flask')
+    # The app keeps its database and caches under data/ in the working directory
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('app'))
+    try:
+        app_module = importlib.import_module('app')
+        app_module.app.config['TESTING'] = True
+        yield app_module.app.test_client()
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.mark.parametrize('limit', ['ten', None, [5]])
+def test_export_rejects_a_non_numeric_limit(client, limit):
+    response = client.post('/export/pdfs', json={'q': 'petitioner', 'limit': limit})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'The limit must be a whole number.'}
+
+
+@pytest.mark.parametrize('query', ['from=2025-03-10&to=2025-03-01', 'date=10/03/2025', 'from=2025-01-01&to=2025-12-31'])
+def test_calendar_rejects_bad_ranges(client, query):
+    response = client.get(f'/calendar?{query}')
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Invalid date range')
+
+
+def test_calendar_is_served_with_an_etag(client):
+    response = client.get('/calendar?date=2025-03-10')
+    assert response.status_code == 200
+    assert response.get_json()['from'] == response.get_json()['to'] == '2025-03-10'
+    assert 'max-age' in response.headers['Cache-Control']
+    again = client.get('/calendar?date=2025-03-10', headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
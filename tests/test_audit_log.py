@@ -0,0 +1,69 @@
+import sqlite3
+import time
+
+import pytest
+
+from audit_log import BufferedAuditLogger, AuditWriteError
+
+
+def count(db, table):
+    return db.get_connection().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_group_commit_is_durable_on_return(db):
+    audit = BufferedAuditLogger(db, crash_safety='group', flush_interval_ms=10)
+    try:
+        query_id = audit.log_query('W.P.(C)', '1', '2024')
+        assert count(db, 'queries') == 1
+        audit.log_response(query_id, {'case_title': 'A v. B'}, 'error', error_message='x')
+        assert count(db, 'responses') == 1
+    finally:
+        audit.close()
+
+
+def test_group_commit_raises_when_the_write_fails(db, monkeypatch):
+    audit = BufferedAuditLogger(db, crash_safety='group', flush_interval_ms=10, flush_retries=1, retry_backoff_ms=1)
+    try:
+        def fail(records):
+            raise sqlite3.OperationalError('disk I/O error')
+        monkeypatch.setattr(audit, '_write', fail)
+        with pytest.raises(sqlite3.OperationalError):
+            audit.log_query('W.P.(C)', '1', '2024')
+        assert audit.stats()['failed_flushes'] == 2
+    finally:
+        audit.close()
+
+
+def test_async_records_are_retried_after_a_failed_flush(db, monkeypatch):
+    audit = BufferedAuditLogger(db, crash_safety='async', flush_interval_ms=10, flush_retries=0)
+    write = audit._write
+    failures = []
+
+    def flaky(records):
+        if not failures:
+            failures.append(len(records))
+            raise sqlite3.OperationalError('database is locked')
+        write(records)
+    monkeypatch.setattr(audit, '_write', flaky)
+
+    audit.log_query('W.P.(C)', '1', '2024')
+    deadline = time.monotonic() + 5
+    while count(db, 'queries') == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    audit.close()
+    assert failures == [1]
+    assert count(db, 'queries') == 1
+
+
+def test_group_commit_fails_fast_when_the_writer_is_gone(db):
+    audit = BufferedAuditLogger(db, crash_safety='group')
+    audit.close()
+    with pytest.raises((AuditWriteError, RuntimeError)):
+        audit.log_query('W.P.(C)', '1', '2024')
+
+    audit = BufferedAuditLogger(db, crash_safety='group')
+    audit._stop.set()
+    audit._writer.join()
+    audit._stop.clear()
+    with pytest.raises(AuditWriteError):
+        audit.log_query('W.P.(C)', '1', '2024')
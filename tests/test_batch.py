@@ -0,0 +1,52 @@
+import pytest
+
+from batch import parse_case_list, run_batch
+from cache import CaseCache
+from scraper import make_case_key
+
+
+def test_parse_csv_with_and_without_header():
+    expected = [('W.P.(C)', '1234', '2024'), ('CRL.A.', '567', '2023')]
+    assert parse_case_list("case_type,case_number,filing_year\nW.P.(C),1234,2024\n\nCRL.A., 567 ,2023\n") == expected
+    assert parse_case_list("W.P.(C),1234,2024\nCRL.A.,567,2023") == expected
+
+
+def test_parse_jsonl_objects_and_arrays():
+    text = '{"case_type": "W.P.(C)", "case_number": "1234", "filing_year": 2024}\n["CRL.A.", 567, 2023]\n'
+    assert parse_case_list(text) == [('W.P.(C)', '1234', '2024'), ('CRL.A.', '567', '2023')]
+
+
+def test_parse_rejects_incomplete_rows():
+    with pytest.raises(ValueError):
+        parse_case_list("W.P.(C),1234")
+
+
+def make_lookup(db, outcomes):
+    calls = []
+
+    def lookup(query_id, case_type, case_number, filing_year):
+        calls.append(case_number)
+        success, error = outcomes[case_number]
+        data = {'case_title': f"Case {case_number}"} if success else {}
+        db.log_response(query_id, data, 'success' if success else 'failed', error_message=error or None,
+                        case_key=make_case_key(case_type, case_number, filing_year))
+        return success, data, error
+    return lookup, calls
+
+
+def test_rerun_resumes_finished_cases_and_retries_transient_failures(db):
+    cases = [('W.P.(C)', '1', '2024'), ('W.P.(C).', '1', '2024'), ('W.P.(C)', '2', '2024'), ('W.P.(C)', '3', '2024')]
+    outcomes = {'1': (True, ''), '2': (False, 'Case not found on the court website.'),
+                '3': (False, 'An unexpected error occurred during the live scrape.')}
+    lookup, calls = make_lookup(db, outcomes)
+
+    records = list(run_batch(cases, db, CaseCache(db), lookup, workers=2, batch_id='b1'))
+    assert records[0] == {'type': 'batch', 'batch_id': 'b1', 'total': 4, 'unique': 3, 'workers': 2}
+    assert records[-1]['succeeded'] == 1 and records[-1]['failed'] == 2
+    assert sorted(calls) == ['1', '2', '3']
+
+    calls.clear()
+    records = list(run_batch(cases, db, CaseCache(db), lookup, batch_id='b1'))
+    sources = {record['case_number']: record['source'] for record in records if record['type'] == 'result'}
+    assert sources == {'1': 'resumed', '2': 'resumed', '3': 'scraped'}
+    assert calls == ['3']
@@ -0,0 +1,90 @@
+import threading
+
+from cache import CaseCache
+
+CASE = ('W.P.(C)', '1234', '2024')
+PENDING = {'case_title': 'A vs. B', 'case_status': 'Pending'}
+
+
+class FakeDb:
+    def __init__(self):
+        self.responses = []
+        self.logged = threading.Event()
+
+    def get_latest_response(self, case_type, case_number, filing_year):
+        return None
+
+    def log_query(self, *args, **kwargs):
+        return 1
+
+    def log_response(self, **kwargs):
+        self.responses.append(kwargs)
+        self.logged.set()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(**kwargs):
+    clock = Clock()
+    return CaseCache(FakeDb(), clock=clock, **kwargs), clock
+
+
+def fetcher(*results):
+    calls = []
+    results = list(results)
+
+    def fetch():
+        calls.append(True)
+        return results.pop(0) if len(results) > 1 else results[0]
+    return fetch, calls
+
+
+def test_miss_then_memory_hit():
+    cache, _ = make_cache()
+    fetch, calls = fetcher((True, PENDING, ''))
+    assert cache.get_or_fetch(*CASE, fetch) == (True, PENDING, '', 'live')
+    assert cache.get_or_fetch(*CASE, fetch) == (True, PENDING, '', 'memory')
+    assert len(calls) == 1
+
+
+def test_stale_entry_is_served_while_it_is_refreshed():
+    cache, clock = make_cache(status_ttls={'pending': 60}, stale_ttl=60)
+    updated = dict(PENDING, case_status='Disposed')
+    fetch, calls = fetcher((True, PENDING, ''), (True, updated, ''))
+    cache.get_or_fetch(*CASE, fetch)
+
+    clock.now += 90
+    assert cache.get_or_fetch(*CASE, fetch)[3] == 'stale'
+    assert cache.db_manager.logged.wait(5)
+    assert cache.db_manager.responses[0]['case_key'] == 'W.P.(C).1234.2024'
+    assert cache.get_or_fetch(*CASE, fetch) == (True, updated, '', 'memory')
+
+    clock.now += 10 ** 7
+    cache.get_or_fetch(*CASE, fetch)
+    assert len(calls) == 3
+
+
+def test_not_found_is_cached_but_transient_failures_are_not():
+    cache, _ = make_cache()
+    fetch, calls = fetcher((False, {}, 'Case not found on the court website.'))
+    cache.get_or_fetch(*CASE, fetch)
+    assert cache.get_or_fetch(*CASE, fetch)[3] == 'memory'
+
+    fetch, calls = fetcher((False, {}, 'An unexpected error occurred during the live scrape.'))
+    cache.get_or_fetch('CRL.A', '1', '2024', fetch)
+    cache.get_or_fetch('CRL.A', '1', '2024', fetch)
+    assert len(calls) == 2
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache, _ = make_cache(max_entries=2)
+    for number in ('1', '2', '3'):
+        cache.put(f'W.P.(C).{number}.2024', True, PENDING, '')
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['evictions'] == 1
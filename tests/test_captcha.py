@@ -0,0 +1,45 @@
+import pytest
+
+from captcha import ALL_VARIANTS, preprocess_variants, vote
+
+
+def test_vote_majority_wins():
+    candidates = [('fixed', 'ab12', 0.9), ('otsu', 'ab1z', 0.99), ('adaptive', 'ab12', 0.5)]
+    assert vote(candidates) == ('ab12', 2, pytest.approx(0.7))
+
+
+def test_vote_tie_goes_to_total_confidence():
+    candidates = [('fixed', 'ab12', 0.4), ('otsu', 'xy34', 0.3), ('adaptive', 'ab12', 0.4), ('denoised', 'xy34', 0.3)]
+    assert vote(candidates) == ('ab12', 2, pytest.approx(0.4))
+
+
+def test_vote_ignores_short_readings():
+    candidates = [('fixed', 'ab', 0.9), ('otsu', 'ab', 0.9), ('adaptive', 'ab12', 0.1)]
+    assert vote(candidates)[0] == 'ab12'
+    assert vote(candidates, min_length=2)[0] == 'ab'
+
+
+@pytest.mark.parametrize('candidates', [[], [('fixed', '', 0.0), ('otsu', None, 0.0), ('adaptive', 'ab', 0.9)]])
+def test_vote_without_candidates(candidates):
+    assert vote(candidates) == (None, 0, 0.0)
+
+
+@pytest.fixture
+def gray():
+    np = pytest.importorskip('numpy')
+    cv2 = pytest.importorskip('cv2')
+    image = np.full((40, 120), 230, np.uint8)
+    cv2.putText(image, 'ab12', (8, 30), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 30, 2)
+    cv2.line(image, (0, 20), (119, 22), 60, 1)
+    return image
+
+
+@pytest.mark.parametrize('variants', [ALL_VARIANTS, ('deskewed', 'fixed'), ('adaptive',)])
+def test_preprocess_returns_the_requested_variants_in_order(gray, variants):
+    import numpy as np
+    out = preprocess_variants(gray, variants)
+    assert tuple(out) == tuple(variants)
+    for image in out.values():
+        assert image.dtype == np.uint8
+        assert image.shape == gray.shape
+        assert set(np.unique(image)) <= {0, 255}
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from case_parser import CASE_FIELDS, LXML_AVAILABLE, PARSER_BACKENDS, iso_court_date, parse_case_details
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+BACKENDS = [
+    pytest.param(backend, marks=pytest.mark.skipif(backend == 'lxml' and not LXML_AVAILABLE, reason="lxml not installed"))
+    for backend in PARSER_BACKENDS
+]
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_details_page_fills_every_field(backend):
+    result = parse_case_details(fixture('case_details.html'), 'W.P.(C)', '1234', '2024', backend=backend)
+    assert all(result[field] for field in CASE_FIELDS)
+    assert result['case_number'] == '1234/2024'
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_listing_page_picks_the_requested_row(backend):
+    result = parse_case_details(fixture('case_listing.html'), 'W.P.(C)', '1234', '2024', backend=backend)
+    assert result['case_title'] == 'PETITIONER 27 VS. UNION OF INDIA & ORS.'
+    assert result['petitioner_name'] == 'PETITIONER 27'
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_listing_page_without_the_requested_case_is_not_found(backend):
+    assert parse_case_details(fixture('case_listing.html'), 'W.P.(C)', '9999', '2024', backend=backend) is None
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_no_record_page(backend):
+    assert parse_case_details(fixture('no_record.html'), 'W.P.(C)', '1234', '2024', backend=backend) is None
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('10/03/2025', '2025-03-10'),
+    ('10-03-2025', '2025-03-10'),
+    ('10.03.2025', '2025-03-10'),
+    ('2025-03-10', '2025-03-10'),
+    (' 1/3/2025 ', '2025-03-01'),
+    ('31/02/2025', None),
+    ('NA', None),
+    ('', None),
+    (None, None),
+])
+def test_iso_court_date(text, expected):
+    assert iso_court_date(text) == expected
@@ -0,0 +1,65 @@
+from datetime import date
+
+import pytest
+
+from case_store import CaseStore
+from sample_data import MOCK_CASE_STORE
+from scraper import make_case_key
+
+
+def case(case_type, number, year, **fields):
+    record = {'case_type': case_type, 'case_number': f"{number}/{year}", 'filing_year': str(year)}
+    record.update(fields)
+    return make_case_key(case_type, number, year), record
+
+
+@pytest.fixture
+def store():
+    return CaseStore(dict([
+        case('W.P.(C)', 1, 2024, judge_name='Justice A', court_hall='Court 1', next_hearing_date='12/03/2025'),
+        case('W.P.(C)', 2, 2023, judge_name='Justice B', court_hall='Court 1', next_hearing_date='10/03/2025'),
+        case('CRL.A.', 3, 2024, judge_name='Justice A', court_hall='Court 2', next_hearing_date='NA',
+             pdf_links=['/orders/3.pdf']),
+        case('CS(OS)', '0123', 2024, judge_name='Justice A'),
+    ]))
+
+
+def test_records_round_trip(store):
+    assert len(store) == 4
+    assert store['CRL.A.3.2024'] == {
+        'case_number': '3/2024', 'case_type': 'CRL.A.', 'filing_year': '2024', 'judge_name': 'Justice A',
+        'court_hall': 'Court 2', 'next_hearing_date': 'NA', 'pdf_links': ['/orders/3.pdf'],
+    }
+    # Non-canonical numbers are kept apart from their canonical form
+    assert 'CS(OS).0123.2024' in store
+    assert 'CS(OS).123.2024' not in store
+    assert list(store)[0] == 'W.P.(C).1.2024'
+
+
+def test_find_filters_with_indexes(store):
+    assert [key for key, _ in store.find(judge_name='Justice A', filing_year=2024)] == [
+        'W.P.(C).1.2024', 'CRL.A.3.2024', 'CS(OS).0123.2024',
+    ]
+    assert store.count(court_hall='Court 1', case_type='W.P.(C)') == 2
+    assert store.find(judge_name='Nobody') == []
+
+
+def test_hearing_range_comes_in_date_order(store):
+    found = store.find(hearing_from=date(2025, 3, 1), hearing_to=date(2025, 3, 31))
+    assert [key for key, _ in found] == ['W.P.(C).2.2023', 'W.P.(C).1.2024']
+    assert store.count(hearing_from=date(2025, 3, 11), court_hall='Court 1') == 1
+
+
+def test_put_replaces_and_reindexes(store):
+    key, record = case('W.P.(C)', 1, 2024, judge_name='Justice B', court_hall='Court 1')
+    store.put(key, record)
+    assert len(store) == 4
+    assert store.count(judge_name='Justice A') == 2
+    assert store.count(judge_name='Justice B') == 2
+    assert store.count(hearing_from=date(2025, 3, 1)) == 1
+
+
+def test_mock_cases_load_into_the_store():
+    assert len(MOCK_CASE_STORE) > 0
+    for key in MOCK_CASE_STORE:
+        assert MOCK_CASE_STORE[key]['case_type']
@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+import metrics
+from coalescing import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    calls_before = metrics.SINGLEFLIGHT_CALLS.value()
+    coalesced_before = metrics.SINGLEFLIGHT_COALESCED.value()
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def scrape():
+        calls.append(True)
+        release.wait(5)
+        return 'result'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('key', scrape))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flight.stats()['coalesced'] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['result'] * 5
+    assert len(calls) == 1
+    assert flight.stats()['in_flight'] == 0
+    if metrics.ENABLED:
+        assert metrics.SINGLEFLIGHT_CALLS.value() - calls_before == 5
+        assert metrics.SINGLEFLIGHT_COALESCED.value() - coalesced_before == 4
+        assert 'court_singleflight_coalesced_total ' in metrics.render()
+    # The key is released once the call completes
+    assert flight.do('key', lambda: 'again') == 'again'
+
+
+def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError('site down')
+
+    with pytest.raises(ValueError):
+        flight.do('key', fail)
+    assert flight.do('key', lambda: 'ok') == 'ok'
+    assert flight.stats()['errors'] == 1
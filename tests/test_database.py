@@ -0,0 +1,83 @@
+import pytest
+
+from database import build_fts_query
+
+CASE = {'case_title': 'A vs. B', 'case_number': '1234/2024', 'case_type': 'W.P.(C)', 'filing_year': '2024'}
+
+
+def case_rows(db):
+    return db.get_connection().execute("SELECT case_key, query_id FROM case_data").fetchall()
+
+
+def test_case_data_keeps_one_row_per_case(db):
+    for _ in range(2):
+        query_id = db.log_query('W.P.(C).', '1234', '2024')
+        db.log_response(query_id, CASE, 'success', case_key='W.P.(C).1234.2024')
+    assert [tuple(row) for row in case_rows(db)] == [('W.P.(C).1234.2024', query_id)]
+
+
+def test_case_key_does_not_depend_on_the_query_row(db):
+    # e.g. a write-behind batch holding the queries rows was lost
+    db.log_response(9001, CASE, 'success', case_key='W.P.(C).1234.2024')
+    db.log_response(9002, CASE, 'success', case_key='W.P.(C).1234.2024')
+    assert [tuple(row) for row in case_rows(db)] == [('W.P.(C).1234.2024', 9002)]
+
+
+def test_successful_response_needs_a_case_key(db):
+    with pytest.raises(ValueError):
+        db.log_response(1, CASE, 'success')
+    db.log_response(1, {}, 'failed', error_message='Case not found')
+    assert case_rows(db) == []
+
+
+def store_hearing(db, number, hearing, court_hall):
+    case = dict(CASE, case_number=f"{number}/2024", next_hearing_date=hearing, court_hall=court_hall)
+    db.log_response(db.log_query('W.P.(C)', str(number), '2024'), case, 'success', case_key=f"W.P.(C).{number}.2024")
+
+
+def test_hearing_calendar_pages_by_date_and_court_hall(db):
+    store_hearing(db, 1, '11/03/2025', 'Court 2')
+    store_hearing(db, 2, '10/03/2025', 'Court 5')
+    store_hearing(db, 3, '10/03/2025', 'Court 1')
+    store_hearing(db, 4, '20/03/2025', 'Court 1')
+    store_hearing(db, 5, 'Not listed', 'Court 1')
+
+    first = db.get_hearing_calendar('2025-03-10', '2025-03-11', limit=2)
+    assert [row['case_key'] for row in first] == ['W.P.(C).3.2024', 'W.P.(C).2.2024']
+    last = first[-1]
+    rest = db.get_hearing_calendar(
+        '2025-03-10', '2025-03-11', limit=2, after=(last['next_hearing_on'], last['court_hall'], last['id'])
+    )
+    assert [row['case_key'] for row in rest] == ['W.P.(C).1.2024']
+
+    one_hall = db.get_hearing_calendar('2025-03-01', '2025-03-31', court_hall='Court 1')
+    assert [row['next_hearing_on'] for row in one_hall] == ['2025-03-10', '2025-03-20']
+    assert [tuple(row) for row in db.count_hearings('2025-03-10', '2025-03-10')] == [
+        ('2025-03-10', 'Court 1', 1), ('2025-03-10', 'Court 5', 1),
+    ]
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('smith', '"smith"*'),
+    ('union of', '"union" "of"*'),
+    ('W.P.(C) 1234', '"W.P.(C)" "1234"*'),
+    ('say "hi"', '"say" "hi"*'),
+    ('kumar* delhi', '"kumar"* "delhi"*'),
+    ('*', ''),
+])
+def test_build_fts_query(text, expected):
+    assert build_fts_query(text) == expected
+
+
+def test_fulltext_search_ranks_and_pages(db):
+    for number, title in enumerate(['Ravi Kumar vs. State', 'Kumar Traders vs. Union of India', 'Asha vs. Delhi'], 1):
+        case = dict(CASE, case_number=f"{number}/2024", case_title=title)
+        db.log_response(number, case, 'success', case_key=f"W.P.(C).{number}.2024")
+
+    hits = db.search_cases_fulltext('kum', limit=1)
+    assert len(hits) == 1 and 'Kumar' in hits[0]['case_title']
+    rest = db.search_cases_fulltext('kum', limit=5, after=(hits[0]['score'], hits[0]['id']))
+    assert [row['case_title'] for row in rest] == [
+        title for title in ('Ravi Kumar vs. State', 'Kumar Traders vs. Union of India') if title != hits[0]['case_title']
+    ]
+    assert db.search_cases_fulltext('"*') == []
@@ -0,0 +1,87 @@
+import pytest
+
+from driver_pool import DriverPool, DriverPoolTimeout
+
+WARM_URL = 'https://court.example/case-status'
+
+
+class FakeDriver:
+    created = 0
+
+    def __init__(self):
+        FakeDriver.created += 1
+        self.visits = []
+        self.quit_called = False
+        self.crashed = False
+
+    @property
+    def current_url(self):
+        if self.crashed:
+            raise ConnectionError("browser gone")
+        return self.visits[-1] if self.visits else 'about:blank'
+
+    def get(self, url):
+        self.visits.append(url)
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def pool():
+    FakeDriver.created = 0
+    pool = DriverPool(FakeDriver, size=2, max_uses=3, warm_url=WARM_URL, checkout_timeout=0.05)
+    yield pool
+    pool.close()
+
+
+def test_sessions_are_reused_and_parked_on_the_warm_page(pool):
+    driver = pool.checkout()
+    assert driver.current_url == WARM_URL
+    pool.checkin(driver)
+    assert pool.checkout() is driver
+    assert FakeDriver.created == 1
+
+
+def test_checkout_times_out_when_every_session_is_busy(pool):
+    first = pool.checkout()
+    pool.checkout()
+    with pytest.raises(DriverPoolTimeout):
+        pool.checkout()
+    assert pool.stats()['timeouts'] == 1
+    assert pool.stats()['utilization'] == 1.0
+    pool.checkin(first)
+    assert pool.checkout() is first
+
+
+def test_sessions_are_recycled_after_max_uses(pool):
+    driver = pool.checkout()
+    for _ in range(2):
+        pool.checkin(driver)
+        assert pool.checkout() is driver
+    pool.checkin(driver)
+    assert driver.quit_called
+    assert pool.checkout() is not driver
+    assert pool.stats()['recycled'] == 1
+
+
+def test_broken_and_crashed_sessions_are_replaced(pool):
+    driver = pool.checkout()
+    pool.checkin(driver, broken=True)
+    assert driver.quit_called
+
+    driver = pool.checkout()
+    pool.checkin(driver)
+    driver.crashed = True
+    replacement = pool.checkout()
+    assert replacement is not driver
+    assert driver.quit_called
+    assert pool.stats()['recycled'] == 2
+
+
+def test_session_context_flags_errors_as_broken(pool):
+    with pytest.raises(RuntimeError):
+        with pool.session() as driver:
+            raise RuntimeError("scrape failed")
+    assert driver.quit_called
+    assert pool.stats()['in_use'] == 0
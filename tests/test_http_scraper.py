@@ -0,0 +1,48 @@
+import pytest
+
+requests = pytest.importorskip('requests')
+pytest.importorskip('PIL')
+
+from court_simulator import AnswerKeySolver, start_simulator
+from http_scraper import HttpCourtScraper
+from sample_data import MOCK_CASES
+from scraper import split_case_key
+
+
+class WrongSolver:
+    def solve(self, image_bytes):
+        return 'wrong0'
+
+
+@pytest.fixture(scope='module')
+def simulator():
+    server, base_url = start_simulator(expose_answers=True, seed=1)
+    yield base_url
+    server.shutdown()
+
+
+def test_lookup_through_the_simulator(simulator):
+    case_key, case = next(iter(MOCK_CASES.items()))
+    scraper = HttpCourtScraper(simulator, captcha_solver=AnswerKeySolver())
+    success, data, error = scraper.search_case(*split_case_key(case_key))
+    assert (success, error) == (True, '')
+    assert data['case_title'] == case['case_title']
+
+
+def test_unknown_case_is_not_found(simulator):
+    scraper = HttpCourtScraper(simulator, captcha_solver=AnswerKeySolver())
+    assert scraper.search_case('W.P.(C)', '999999', '1990') == (False, {}, "Case not found on the court website.")
+
+
+def test_unsolved_captcha_gives_up_after_retries(simulator):
+    scraper = HttpCourtScraper(simulator, captcha_solver=WrongSolver())
+    success, _, error = scraper.search_case('W.P.(C)', '1', '2024')
+    assert not success
+    assert 'CAPTCHA' in error
+
+
+def test_reload_link_requests_a_fresh_captcha(simulator):
+    page = requests.get(f"{simulator}/case-status", timeout=5).text
+    script = page.split('<script>', 1)[1]
+    assert "getElementById('reload-captcha')" in script
+    assert "'/captcha?v=' + Math.random()" in script
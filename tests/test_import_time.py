@@ -0,0 +1,83 @@
+"""
+Guards the app's cold-start cost.
+
+Imports app.py in fresh interpreters under `python -X importtime` and fails if
+any heavy backend (Selenium, OpenCV, Tesseract, ReportLab, the HTML parsers)
+is imported at start-up, or if the cumulative import time of `app` (best of
+IMPORT_TIME_RUNS) exceeds IMPORT_TIME_BUDGET_MS. Each run uses an empty
+working directory, so no database is created next to the code.
+"""
+import os
+import re
+import sys
+import subprocess
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUDGET_MS = float(os.environ.get('IMPORT_TIME_BUDGET_MS', '300'))
+RUNS = int(os.environ.get('IMPORT_TIME_RUNS', '5'))
+
+# Top-level packages that must only be imported on first use
+HEAVY_MODULES = (
+    'selenium', 'webdriver_manager', 'cv2', 'numpy', 'PIL', 'pytesseract', 'tesserocr',
+    'reportlab', 'bs4', 'lxml', 'requests',
+)
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$')
+
+
+def import_app():
+    """
+    Import app in a fresh interpreter; returns (cumulative_us, modules) where
+    modules lists the (name, self_us, cumulative_us, depth) of everything
+    imported under app.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop('PRELOAD_BACKENDS', None)
+    env.pop('WATCHLIST_SCHEDULER', None)
+    with tempfile.TemporaryDirectory() as cwd:
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import app'],
+            cwd=cwd, env=env, capture_output=True, text=True
+        )
+    assert result.returncode == 0, f"importing app raised:\n{result.stderr[-2000:]}"
+    # Imports are reported children first, so app's are the lines since the previous top-level one
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        if depth == 0:
+            if name == 'app':
+                return int(cumulative_us), modules
+            modules = []
+        else:
+            modules.append((name, int(self_us), int(cumulative_us), depth))
+    pytest.fail("no import time reported for app")
+
+
+@pytest.fixture(scope='module')
+def app_import():
+    """Fastest of RUNS fresh imports of app."""
+    pytest.importorskip('flask')
+    return min((import_app() for _ in range(RUNS)), key=lambda run: run[0])
+
+
+def test_no_heavy_modules_at_startup(app_import):
+    _, modules = app_import
+    heavy = sorted({name.split('.')[0] for name, *_ in modules} & set(HEAVY_MODULES))
+    assert not heavy, f"heavy modules imported at start-up: {', '.join(heavy)}"
+
+
+def test_import_time_within_budget(app_import):
+    app_us, modules = app_import
+    direct = sorted((m for m in modules if m[3] == 1), key=lambda m: m[2], reverse=True)
+    slowest = ', '.join(f"{name} {cumulative / 1000:.1f} ms" for name, _, cumulative, _ in direct[:10])
+    assert app_us / 1000 <= BUDGET_MS, (
+        f"import app took {app_us / 1000:.1f} ms, over the {BUDGET_MS:.0f} ms budget (slowest: {slowest})"
+    )
@@ -0,0 +1,52 @@
+import threading
+import time
+
+import pytest
+
+from jobs import JobManager, JobQueueFull
+
+
+def wait_for(db, job_id, status):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        job = db.get_job(job_id)
+        if job['status'] == status:
+            return job
+        time.sleep(0.01)
+    pytest.fail(f"job {job_id} never reached {status}")
+
+
+def test_jobs_run_in_the_background(db):
+    def lookup(query_id, case_type, case_number, filing_year):
+        if case_number == '2':
+            return False, {}, 'Case not found on the court website.'
+        if case_number == '3':
+            raise RuntimeError('driver crashed')
+        return True, {'case_title': 'A vs. B'}, ''
+
+    jobs = JobManager(db, lookup, max_workers=2)
+    try:
+        ok, not_found, crashed = (jobs.submit('W.P.(C)', number, '2024') for number in ('1', '2', '3'))
+        assert wait_for(db, ok, 'succeeded')['case_number'] == '1'
+        assert wait_for(db, not_found, 'failed')['error_message'] == 'Case not found on the court website.'
+        assert wait_for(db, crashed, 'failed')['error_message'] == 'An unexpected error occurred during the lookup.'
+    finally:
+        jobs.shutdown()
+    assert jobs.pending() == 0
+
+
+def test_submit_is_refused_when_the_queue_is_full(db):
+    release = threading.Event()
+
+    def lookup(*args):
+        release.wait(5)
+        return True, {}, ''
+
+    jobs = JobManager(db, lookup, max_workers=1, max_pending=1)
+    try:
+        jobs.submit('W.P.(C)', '1', '2024')
+        with pytest.raises(JobQueueFull):
+            jobs.submit('W.P.(C)', '2', '2024')
+    finally:
+        release.set()
+        jobs.shutdown()
@@ -0,0 +1,39 @@
+import pytest
+
+import metrics
+
+pytestmark = pytest.mark.skipif(not metrics.ENABLED, reason="METRICS_ENABLED=False")
+
+
+def test_counter_renders_with_labels():
+    requests = metrics.counter('test_requests_total', "Test requests.", ('path',))
+    requests.inc(path='/search')
+    requests.inc(2, path='/search')
+    requests.inc(path='/a"b')
+    assert requests.value(path='/search') == 3
+    assert metrics.counter('test_requests_total', "Test requests.", ('path',)) is requests
+
+    text = metrics.render()
+    assert '# TYPE test_requests_total counter' in text
+    assert 'test_requests_total{path="/search"} 3' in text
+    assert 'test_requests_total{path="/a\\"b"} 1' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    latency = metrics.histogram('test_latency_seconds', "Test latency.", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        latency.observe(value)
+    samples = dict(latency.samples())
+    assert samples['test_latency_seconds_bucket{le="0.1"}'] == 1
+    assert samples['test_latency_seconds_bucket{le="1.0"}'] == 3
+    assert samples['test_latency_seconds_bucket{le="+Inf"}'] == 4
+    assert samples['test_latency_seconds_count'] == 4
+    assert samples['test_latency_seconds_sum'] == pytest.approx(6.05)
+
+
+def test_span_records_outcome():
+    before = metrics.SPAN_SECONDS.count(span='test.block', outcome='error')
+    with pytest.raises(ValueError):
+        with metrics.span('test.block'):
+            raise ValueError
+    assert metrics.SPAN_SECONDS.count(span='test.block', outcome='error') == before + 1
@@ -0,0 +1,80 @@
+import sys
+import types
+import threading
+
+import pytest
+
+import ocr_backends
+from ocr_backends import TesseractBackend, PersistentTesseractBackend, OcrWorkerError
+
+
+def test_tesseract_pool_spawns_its_workers():
+    backend = TesseractBackend(max_workers=1)
+    try:
+        assert backend._get_executor()._mp_context.get_start_method() == 'spawn'
+    finally:
+        backend.close()
+
+
+class FakeProcess:
+    def __init__(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+
+class FakeWorker:
+    fail_on_send = None
+
+    def __init__(self, context):
+        self.process = FakeProcess()
+        self.lock = threading.Lock()
+        self.replies = []
+
+    def send(self, image):
+        if image == FakeWorker.fail_on_send:
+            raise BrokenPipeError(image)
+        self.replies.append((image, 90.0))
+
+    def receive(self):
+        text, confidence = self.replies.pop(0)
+        if text == 'bad':
+            raise OcrWorkerError(text)
+        return text, confidence
+
+    def kill(self):
+        self.process.alive = False
+
+
+@pytest.fixture
+def persistent_backend(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'tesserocr', types.ModuleType('tesserocr'))
+    monkeypatch.setattr(ocr_backends, '_Worker', FakeWorker)
+    monkeypatch.setattr(FakeWorker, 'fail_on_send', None)
+    return PersistentTesseractBackend(workers=2)
+
+
+def test_persistent_backend_spreads_images_over_workers(persistent_backend):
+    assert persistent_backend.ocr_many(['a', 'b', 'c']) == [('a', 90.0), ('b', 90.0), ('c', 90.0)]
+
+
+def test_failed_send_replaces_every_worker_in_the_batch(persistent_backend):
+    first = persistent_backend._get_workers()
+    FakeWorker.fail_on_send = 'b'
+    with pytest.raises(BrokenPipeError):
+        persistent_backend.ocr_many(['a', 'b'])
+    # The first worker holds an unread reply for 'a'; it must not serve the next solve
+    assert not any(worker.process.is_alive() for worker in first)
+
+    FakeWorker.fail_on_send = None
+    assert persistent_backend.ocr_many(['c', 'd']) == [('c', 90.0), ('d', 90.0)]
+    assert not set(persistent_backend._get_workers()) & set(first)
+
+
+def test_worker_error_reply_keeps_the_workers(persistent_backend):
+    first = persistent_backend._get_workers()
+    with pytest.raises(OcrWorkerError):
+        persistent_backend.ocr_many(['bad', 'b'])
+    assert persistent_backend._get_workers() == first
+    assert persistent_backend.ocr_many(['c', 'd']) == [('c', 90.0), ('d', 90.0)]
@@ -0,0 +1,106 @@
+"""
+Result-page parser benchmark (pytest-benchmark).
+
+Times parse_case_details over the saved result pages in benchmarks/fixtures
+with each available backend, next to the original parser (a full
+html.parser tree and four fields). Run with
+
+    python -m pytest tests/test_parser_benchmark.py --benchmark-only
+
+and compare runs with --benchmark-autosave / --benchmark-compare-fail to
+catch regressions. Without pytest-benchmark installed the module is skipped.
+"""
+import os
+import re
+import time
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+from bs4 import BeautifulSoup
+
+from case_parser import CASE_FIELDS, LXML_AVAILABLE, PARSER_BACKENDS, parse_case_details
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+CASE = ('W.P.(C)', '1234', '2024')
+
+# case_data fields each backend must fill per fixture
+EXPECTED_FIELDS = {'case_details.html': len(CASE_FIELDS), 'case_listing.html': 9, 'no_record.html': 0}
+
+BACKENDS = [
+    pytest.param(backend, marks=pytest.mark.skipif(backend == 'lxml' and not LXML_AVAILABLE, reason="lxml not installed"))
+    for backend in PARSER_BACKENDS
+]
+
+
+def legacy_parse(html_content, case_type, case_number, filing_year):
+    """The original DelhiHighCourtScraper._parse_response."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    parsed_data = {'case_number': f"{case_number}/{filing_year}", 'case_type': case_type}
+    try:
+        details_table = soup.find('table', {'class': 'table-bordered'})
+        if not details_table:
+            return None
+        for row in details_table.find_all('tr'):
+            cells = row.find_all('td')
+            if len(cells) < 2:
+                continue
+            label = cells[0].text.strip().lower()
+            value = cells[1].text.strip()
+            if 'case title' in label:
+                parsed_data['case_title'] = value
+                if 'vs' in value.lower():
+                    parts = re.split(r'\s+vs\s+', value, flags=re.IGNORECASE)
+                    parsed_data['petitioner_name'] = parts[0].strip()
+                    parsed_data['respondent_name'] = parts[1].strip()
+            elif 'filing date' in label:
+                parsed_data['filing_date'] = value
+            elif 'next date' in label:
+                parsed_data['next_hearing_date'] = value
+            elif 'status' in label:
+                parsed_data['case_status'] = value
+        return parsed_data
+    except Exception:
+        return None
+
+
+def filled_fields(result):
+    if not result:
+        return 0
+    return sum(1 for field in CASE_FIELDS if result.get(field))
+
+
+def load(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def best_time(parse, html_content, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(html_content, *CASE)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+@pytest.mark.parametrize('fixture_name', sorted(EXPECTED_FIELDS))
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_parse_case_details(benchmark, backend, fixture_name):
+    html_content = load(fixture_name)
+    result = benchmark(parse_case_details, html_content, *CASE, backend=backend)
+    assert filled_fields(result) == EXPECTED_FIELDS[fixture_name]
+
+
+@pytest.mark.parametrize('fixture_name', sorted(EXPECTED_FIELDS))
+def test_legacy_parse(benchmark, fixture_name):
+    benchmark(legacy_parse, load(fixture_name), *CASE)
+
+
+@pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml not installed")
+def test_lxml_backend_outpaces_legacy_parser():
+    html_content = load('case_details.html')
+    legacy = best_time(legacy_parse, html_content)
+    current = best_time(lambda html, *case: parse_case_details(html, *case, backend='lxml'), html_content)
+    # Measured at roughly 20x; a 3x floor leaves room for noisy machines
+    assert current * 3 < legacy, f"lxml parse {current * 1000:.2f} ms vs legacy {legacy * 1000:.2f} ms"
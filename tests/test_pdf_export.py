@@ -0,0 +1,39 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+from pdf_export import PdfExporter
+from pdf_renderer import PdfCache
+from sample_data import MOCK_CASE_STORE
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    pytest.importorskip('reportlab')
+    cases = dict(list(MOCK_CASE_STORE.items())[:2])
+    exporter = PdfExporter(
+        PdfCache(str(tmp_path / 'pdfs')),
+        lambda case_key: (case_key, cases[case_key], []) if case_key in cases else None,
+        workers=1,
+    )
+    exporter.cases = list(cases)
+    yield exporter
+    exporter.close()
+
+
+def test_export_renders_on_spawned_workers(exporter):
+    case_keys = exporter.cases + ['CRL.A.0.1900']
+    progress = exporter.start(case_keys)
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(exporter.stream(progress, case_keys))))
+
+    assert exporter._get_executor()._mp_context.get_start_method() == 'spawn'
+    manifest = json.loads(archive.read('manifest.json'))
+    assert [case['status'] for case in manifest['cases']].count('ok') == 2
+    assert {'case_key': 'CRL.A.0.1900', 'status': 'not_found'} in manifest['cases']
+    for case in manifest['cases']:
+        if case['status'] == 'ok':
+            assert archive.read(case['file']).startswith(b'%PDF')
+    assert progress.status == 'finished'
+    assert progress.rendered == 2
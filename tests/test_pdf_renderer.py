@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from pdf_renderer import PdfCache, content_hash
+
+HISTORY = [{'date': '01/01/2024', 'case_status': 'Pending', 'order': 'Adjourned.', 'next_hearing_date': '', 'links': []}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    pytest.importorskip('reportlab')
+    return PdfCache(str(tmp_path))
+
+
+def render(cache, case_key, title):
+    case_data = {'case_title': title}
+    path, etag = cache.get(case_key, case_data, [])
+    # The ETag is the content hash the file is named after
+    assert etag == content_hash(case_data, [])
+    assert etag[:32] in os.path.basename(path)
+    return path
+
+
+def test_etag_follows_the_content(cache):
+    first = cache.get('W.P.(C).1.2024', {'case_title': 'A vs. B'}, [])[1]
+    assert cache.get('W.P.(C).1.2024', {'case_title': 'A vs. B'}, [])[1] == first
+    assert cache.get('W.P.(C).1.2024', {'case_title': 'A vs. C'}, [])[1] != first
+    assert cache.get('W.P.(C).1.2024', {'case_title': 'A vs. B'}, HISTORY)[1] != first
+
+
+def test_new_version_replaces_the_old_one(cache):
+    old = render(cache, 'W.P.(C).1.2024', 'A vs. B')
+    new = render(cache, 'W.P.(C).1.2024', 'A vs. C')
+    assert new != old
+    assert os.listdir(cache.cache_dir) == [os.path.basename(new)]
+
+
+def test_keys_that_sanitize_alike_keep_their_own_files(cache):
+    # Both keys sanitize to W_P_C_1_2024, and one is a prefix of a third
+    paths = [
+        render(cache, 'W.P.(C).1.2024', 'A vs. B'),
+        render(cache, 'W.P.(C)-1.2024', 'C vs. D'),
+        render(cache, 'W.P.(C).1.20241', 'E vs. F'),
+    ]
+    assert len(set(paths)) == 3
+    assert all(os.path.exists(path) for path in paths)
+    assert render(cache, 'W.P.(C).1.2024', 'A vs. B') == paths[0]
+    assert cache.stats() == {'hits': 1, 'renders': 3}
@@ -0,0 +1,59 @@
+"""
+Asserts that the hot DatabaseManager queries are answered from indexes.
+
+Runs EXPLAIN QUERY PLAN for each statement against a freshly migrated
+database and fails if SQLite would scan a table instead of seeking an index.
+"""
+import pytest
+
+# (name, sql, params, index the plan must use)
+HOT_QUERIES = [
+    (
+        'get_case_data_by_query_id',
+        "SELECT * FROM case_data WHERE query_id = ?", (1,),
+        'idx_case_data_query_id',
+    ),
+    (
+        'get_latest_case_data',
+        "SELECT * FROM case_data WHERE case_key = ?", ('W.P.(C).1234.2024',),
+        'idx_case_data_case_key',
+    ),
+    (
+        'get_query_history: responses join',
+        '''SELECT q.*, r.status, r.timestamp as response_time
+           FROM queries q LEFT JOIN responses r ON q.id = r.query_id
+           ORDER BY q.timestamp DESC LIMIT ?''', (50,),
+        'idx_responses_query_id',
+    ),
+    (
+        'get_query_history: ordering',
+        '''SELECT q.*, r.status, r.timestamp as response_time
+           FROM queries q LEFT JOIN responses r ON q.id = r.query_id
+           ORDER BY q.timestamp DESC LIMIT ?''', (50,),
+        'idx_queries_timestamp',
+    ),
+    (
+        'rebuild_stats: case type counts',
+        "SELECT case_type, COUNT(*) as count FROM queries GROUP BY case_type ORDER BY count DESC LIMIT 5", (),
+        'idx_queries_case_type',
+    ),
+    (
+        'get_latest_response: case lookup',
+        '''SELECT r.parsed_data FROM queries q JOIN responses r ON q.id = r.query_id
+           WHERE rtrim(q.case_type, '.') = ? AND q.case_number = ? AND q.filing_year = ?''',
+        ('W.P.(C)', '1234', '2024'),
+        'idx_queries_case',
+    ),
+    (
+        'get_batch_results',
+        "SELECT q.case_type FROM queries q JOIN responses r ON q.id = r.query_id WHERE q.user_agent = ?",
+        ('batch:x',),
+        'idx_queries_user_agent',
+    ),
+]
+
+
+@pytest.mark.parametrize('name,sql,params,index', HOT_QUERIES, ids=[query[0] for query in HOT_QUERIES])
+def test_query_uses_index(db, name, sql, params, index):
+    plan = db.explain_query_plan(sql, params)
+    assert any(index in detail for detail in plan), f"{name} does not use {index}: {' | '.join(plan)}"
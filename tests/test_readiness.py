@@ -0,0 +1,123 @@
+import pytest
+
+from readiness import BY_CLASS_NAME, BY_ID, BY_XPATH, PageReadiness, ReadinessTimeout
+
+
+class FakeElement:
+    def __init__(self, src=None, options=0):
+        self.src = src
+        self.options = options
+
+    def get_attribute(self, name):
+        return self.src if name == 'src' else None
+
+    def find_elements(self, by, value):
+        return [FakeElement() for _ in range(self.options)]
+
+
+class FakeDriver:
+    """Serves elements from `self.elements` ({(by, value or text): [element]}) after `ready_after` polls."""
+    def __init__(self, ready_after=0):
+        self.ready_after = ready_after
+        self.polls = 0
+        self.elements = {}
+        self.ready_state = 'complete'
+        self.image_loaded = True
+
+    def find_elements(self, by, value):
+        self.polls += 1
+        if self.polls <= self.ready_after:
+            return []
+        if by == BY_XPATH:
+            return [element for (key_by, text), elements in self.elements.items()
+                    if key_by == BY_XPATH and text in value for element in elements]
+        return list(self.elements.get((by, value), []))
+
+    def execute_script(self, script, *args):
+        if 'readyState' in script:
+            return self.ready_state
+        return self.image_loaded
+
+
+def readiness_for(driver, **timeouts):
+    return PageReadiness(driver, step_timeouts=timeouts, poll_interval=0.001)
+
+
+def test_wait_for_page_load_records_its_timing():
+    readiness = readiness_for(FakeDriver())
+    assert readiness.wait_for_page_load()
+    [(step, seconds, ok)] = readiness.timings
+    assert (step, ok) == ('page_load', True)
+    assert readiness.report() == [{'step': 'page_load', 'seconds': round(seconds, 4), 'ok': True}]
+
+
+def test_wait_for_form_needs_populated_options():
+    driver = FakeDriver()
+    select = FakeElement(options=1)
+    driver.elements[(BY_ID, 'c_type')] = [select]
+    readiness = readiness_for(driver, form_ready=0.05)
+    with pytest.raises(ReadinessTimeout) as raised:
+        readiness.wait_for_form()
+    assert raised.value.step == 'form_ready'
+    assert readiness.timings[-1][::2] == ('form_ready', False)
+
+    select.options = 3
+    assert readiness.wait_for_form() is select
+    assert readiness.timings[-1][::2] == ('form_ready', True)
+
+
+def test_wait_returns_as_soon_as_the_condition_holds():
+    driver = FakeDriver(ready_after=3)
+    image = FakeElement(src='/captcha?v=1')
+    driver.elements[(BY_ID, 'captcha-image')] = [image]
+    readiness = readiness_for(driver, captcha_ready=5)
+    assert readiness.wait_for_captcha() is image
+    assert driver.polls == 4
+    assert readiness.total_wait() < 1
+
+
+def test_wait_for_captcha_needs_a_loaded_image():
+    driver = FakeDriver()
+    driver.elements[(BY_ID, 'captcha-image')] = [FakeElement(src='/captcha?v=1')]
+    driver.image_loaded = False
+    with pytest.raises(ReadinessTimeout):
+        readiness_for(driver, captcha_ready=0.05).wait_for_captcha()
+
+
+def test_wait_for_captcha_reload_needs_a_new_src():
+    driver = FakeDriver()
+    image = FakeElement(src='/captcha?v=1')
+    driver.elements[(BY_ID, 'captcha-image')] = [image]
+    readiness = readiness_for(driver, captcha_reload=0.05)
+    assert readiness.captcha_src() == '/captcha?v=1'
+    with pytest.raises(ReadinessTimeout):
+        readiness.wait_for_captcha_reload('/captcha?v=1')
+
+    image.src = '/captcha?v=2'
+    assert readiness.wait_for_captcha_reload('/captcha?v=1') is image
+    assert [ok for _, _, ok in readiness.timings] == [False, True]
+
+
+@pytest.mark.parametrize('key,outcome', [
+    ((BY_CLASS_NAME, 'table-bordered'), 'results'),
+    ((BY_XPATH, 'no record found'), 'not_found'),
+    ((BY_XPATH, 'invalid captcha'), 'captcha_rejected'),
+])
+def test_wait_for_results_returns_the_first_answer(key, outcome):
+    driver = FakeDriver()
+    driver.elements[key] = [FakeElement()]
+    readiness = readiness_for(driver, results=5)
+    assert readiness.wait_for_results() == outcome
+    assert readiness.total_wait() < 1
+
+
+def test_wait_for_results_ignores_a_stale_captcha_message():
+    driver = FakeDriver()
+    driver.elements[(BY_XPATH, 'invalid captcha')] = [FakeElement()]
+    readiness = readiness_for(driver, results=0.05)
+    with pytest.raises(ReadinessTimeout):
+        readiness.wait_for_results(readiness.captcha_errors())
+    assert readiness.report()[-1]['ok'] is False
+
+    driver.elements[(BY_XPATH, 'invalid captcha')].append(FakeElement())
+    assert readiness.wait_for_results(driver.elements[(BY_XPATH, 'invalid captcha')][:1]) == 'captcha_rejected'
@@ -0,0 +1,74 @@
+import gzip
+import json
+import os
+import sqlite3
+import time
+
+import retention
+from database import DatabaseManager
+from retention import RetentionManager, prune_archives
+
+CASE = {'case_title': 'A vs. B', 'case_status': 'Pending', 'next_hearing_date': '10/10/2024'}
+
+
+def log_lookup(db, case_number, status='success'):
+    query_id = db.log_query('W.P.(C)', case_number, '2024')
+    db.log_response(query_id, dict(CASE, case_number=f"{case_number}/2024"), status, case_key=f"W.P.(C).{case_number}.2024")
+    return query_id
+
+
+def read_archive(paths):
+    records = []
+    for path in paths:
+        assert path.endswith('.ndjson.gz')
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+def test_archive_moves_old_responses_to_ndjson_and_deletes_them(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(retention, 'ZSTD_AVAILABLE', False)
+    older = log_lookup(db, '1')
+    current = log_lookup(db, '1')
+    failed = log_lookup(db, '2', status='error')
+    manager = RetentionManager(
+        db, archive_after_days=30, archive_dir=str(tmp_path / 'archive'), vacuum_pages=-1,
+        clock=lambda: time.time() + 60 * retention.DAY
+    )
+
+    report = manager.run_once()
+
+    archived = {record['query_id'] for record in read_archive(report['archive_files'])}
+    # The response behind case 1's current case_data row stays in the database
+    assert archived == {older, failed}
+    assert report['rows_archived'] == 2
+    remaining = [row[0] for row in db.get_connection().execute("SELECT query_id FROM responses")]
+    assert remaining == [current]
+
+
+def test_prune_archives_keeps_the_newest_files(tmp_path):
+    names = [f"responses-2026010{i}T000000Z-001.ndjson.gz" for i in range(1, 5)]
+    for name in names + ['responses-20260105T000000Z-001.ndjson.gz.part']:
+        (tmp_path / name).write_bytes(b'')
+
+    removed = prune_archives(str(tmp_path), keep=2)
+
+    assert sorted(os.path.basename(path) for path in removed) == names[:2]
+    assert sorted(os.listdir(tmp_path)) == sorted(names[2:] + ['responses-20260105T000000Z-001.ndjson.gz.part'])
+    assert prune_archives(str(tmp_path), keep=0) == []
+
+
+def test_scheduled_vacuum_leaves_a_non_incremental_database_alone(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA auto_vacuum = NONE")
+    conn.execute("CREATE TABLE t (x)")
+    conn.commit()
+    conn.close()
+    db = DatabaseManager(path)
+
+    assert db.incremental_vacuum(0)['skipped']
+    assert db.get_connection().execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+
+    assert db.incremental_vacuum(0, full=True)['full']
+    assert db.get_connection().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
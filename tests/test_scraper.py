@@ -0,0 +1,181 @@
+import sys
+import types
+
+import scraper
+from driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.current_url = 'about:blank'
+        self.quit_called = False
+
+    def get(self, url):
+        self.current_url = url
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeSolver:
+    def solve(self, image_bytes):
+        return None
+
+
+def test_pooled_scrape_without_selenium_keeps_pool_intact(monkeypatch):
+    # A None entry in sys.modules makes the import raise ImportError
+    monkeypatch.setitem(sys.modules, 'selenium', None)
+    monkeypatch.setitem(sys.modules, 'selenium.webdriver', None)
+    monkeypatch.setitem(sys.modules, 'selenium.webdriver.common.by', None)
+    monkeypatch.setitem(sys.modules, 'selenium.webdriver.support.ui', None)
+    pool = DriverPool(FakeDriver, size=1)
+    live = scraper.DelhiHighCourtScraper(driver_pool=pool, captcha_solver=FakeSolver())
+
+    success, data, error = live.search_case('W.P.(C)', '1', '2024')
+
+    assert not success
+    assert data == {}
+    assert 'Selenium' in error
+    assert pool.stats()['in_use'] == 0
+
+
+def test_reload_captcha_resolves_by(monkeypatch):
+    by_module = types.ModuleType('selenium.webdriver.common.by')
+    by_module.By = types.SimpleNamespace(ID='id')
+    monkeypatch.setitem(sys.modules, 'selenium.webdriver.common.by', by_module)
+    clicked = []
+
+    class Button:
+        def click(self):
+            clicked.append(True)
+
+    class Driver:
+        def find_element(self, by, value):
+            assert (by, value) == ('id', 'reload-captcha')
+            return Button()
+
+    class Readiness:
+        def captcha_src(self):
+            return 'old.png'
+
+        def wait_for_captcha_reload(self, previous_src):
+            assert previous_src == 'old.png'
+
+    live = scraper.DelhiHighCourtScraper(driver_pool=object(), captcha_solver=FakeSolver())
+    live._reload_captcha(Driver(), Readiness())
+    assert clicked == [True]
+
+
+class FakeField:
+    def __init__(self, page, element_id):
+        self.page = page
+        self.id = element_id
+        self.value = ''
+
+    def clear(self):
+        self.value = ''
+
+    def send_keys(self, value):
+        self.value += value
+
+    def click(self):
+        self.page.click(self.id)
+
+    def find_elements(self, by, value):
+        return [object(), object()]
+
+    def get_attribute(self, name):
+        return self.page.captcha_src
+
+    @property
+    def screenshot_as_png(self):
+        return self.page.captcha_src.encode()
+
+
+class FakeCourtPage:
+    """A browser on the case-status form that rejects the first CAPTCHA answer."""
+    def __init__(self, answers):
+        self.current_url = 'about:blank'
+        self.answers = answers
+        self.captcha_version = 0
+        self.fields = {}
+        self.alert = None
+        self.results = False
+        self.page_source = ''
+        self.submitted = None
+
+    @property
+    def captcha_src(self):
+        return f"/captcha?v={self.captcha_version}"
+
+    def get(self, url):
+        self.current_url = url
+
+    def quit(self):
+        pass
+
+    def _field(self, element_id):
+        return self.fields.setdefault(element_id, FakeField(self, element_id))
+
+    def find_element(self, by, value):
+        return self._field(value)
+
+    def find_elements(self, by, value):
+        if by == 'class name':
+            return [object()] if self.results else []
+        if by == 'xpath':
+            return [self.alert] if self.alert is not None and 'invalid captcha' in value else []
+        return [self._field(value)]
+
+    def execute_script(self, script, *args):
+        return 'complete' if 'readyState' in script else True
+
+    def click(self, element_id):
+        self.captcha_version += 1
+        if element_id != 'search':
+            return
+        if self.fields['captcha'].value != self.answers.pop(0):
+            # The site answers a wrong CAPTCHA with a fresh, empty form and a message
+            self.alert = object()
+            self.fields = {}
+            return
+        from court_simulator import render_result
+        from sample_data import MOCK_CASES
+        self.submitted = (self.fields['c_no'].value, self.fields['c_year'].value)
+        self.page_source = render_result(MOCK_CASES['W.P.(C).1234.2024'])
+        self.results = True
+
+
+class SequenceSolver:
+    def __init__(self, solutions):
+        self.solutions = list(solutions)
+
+    def solve(self, image_bytes):
+        return self.solutions.pop(0)
+
+
+def fake_selenium(monkeypatch):
+    by_module = types.ModuleType('selenium.webdriver.common.by')
+    by_module.By = types.SimpleNamespace(ID='id')
+    ui_module = types.ModuleType('selenium.webdriver.support.ui')
+    ui_module.Select = lambda element: types.SimpleNamespace(select_by_visible_text=lambda text: None)
+    monkeypatch.setitem(sys.modules, 'selenium.webdriver.common.by', by_module)
+    monkeypatch.setitem(sys.modules, 'selenium.webdriver.support.ui', ui_module)
+
+
+def test_rejected_captcha_is_retried_without_waiting_for_the_timeout(monkeypatch):
+    fake_selenium(monkeypatch)
+    page = FakeCourtPage(answers=['right1', 'right2'])
+    pool = DriverPool(lambda: page, size=1)
+    live = scraper.DelhiHighCourtScraper(
+        driver_pool=pool, captcha_solver=SequenceSolver(['wrong', 'right2']), step_timeouts={'results': 30}
+    )
+
+    success, data, error = live.search_case('W.P.(C)', '1234', '2024')
+
+    assert (success, error) == (True, '')
+    assert data['case_title']
+    assert page.submitted == ('1234', '2024')
+    results_waits = [(seconds, ok) for step, seconds, ok in live.last_timings if step == 'results']
+    assert [ok for _, ok in results_waits] == [True, True]
+    assert sum(seconds for seconds, _ in results_waits) < 5
@@ -0,0 +1,76 @@
+from site_guard import (
+    AdaptiveRateLimiter, CircuitBreaker, SiteGuard, SITE_UNAVAILABLE_ERROR, classify_result,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_classify_result():
+    assert classify_result(True, '') == 'ok'
+    assert classify_result(False, 'Case not found on the court website.') == 'ok'
+    assert classify_result(False, 'Failed to solve CAPTCHA after multiple attempts.') == 'captcha'
+    assert classify_result(False, 'The live scraper is busy. Please try again shortly.') == 'local'
+    assert classify_result(False, 'An unexpected error occurred during the live scrape.') == 'error'
+
+
+def test_rate_halves_on_failure_and_grows_back_additively():
+    clock = Clock()
+    limiter = AdaptiveRateLimiter(max_rate=1.0, min_rate=0.1, increase=0.25, clock=clock, sleep=clock.sleep)
+    limiter.on_failure()
+    limiter.on_failure()
+    assert limiter.rate == 0.25
+    for _ in range(4):
+        limiter.on_failure()
+    assert limiter.rate == 0.1
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.rate == 1.0
+
+
+def test_breaker_opens_then_lets_one_probe_through():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_guard_fails_fast_while_the_site_is_down():
+    clock = Clock()
+    guard = SiteGuard(
+        limiter=AdaptiveRateLimiter(10.0, 1.0, burst=10, clock=clock, sleep=clock.sleep),
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=clock),
+        clock=clock, sleep=clock.sleep,
+    )
+    calls = []
+
+    def down():
+        calls.append(True)
+        raise ConnectionError('timed out')
+
+    for _ in range(2):
+        assert not guard.call(down)[0]
+    assert guard.call(down) == (False, {}, SITE_UNAVAILABLE_ERROR)
+    assert len(calls) == 2
+    assert guard.stats()['outcomes']['short_circuited'] == 1
+
+    clock.now += 60
+    assert guard.call(lambda: (True, {'case_title': 'A vs. B'}, '')) == (True, {'case_title': 'A vs. B'}, '')
+    assert guard.stats()['breaker']['state'] == CircuitBreaker.CLOSED
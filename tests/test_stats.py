@@ -0,0 +1,70 @@
+import pytest
+
+from database import histogram_percentile
+
+CASE = {'case_title': 'A vs. B', 'case_status': 'Pending'}
+
+# (case_type, status, latency_ms)
+LOOKUPS = [
+    ('W.P.(C)', 'success', 5),
+    ('W.P.(C)', 'success', 20),
+    ('W.P.(C)', 'cached', None),
+    ('CRL.A.', 'success', 40),
+    ('CRL.A.', 'failed', 3000),
+    ('FAO', 'success', 300),
+]
+
+
+def log_lookups(db):
+    for number, (case_type, status, latency_ms) in enumerate(LOOKUPS):
+        query_id = db.log_query(case_type, str(number), '2024')
+        data = CASE if status != 'failed' else None
+        db.log_response(query_id, data, status, error_message=None if data else 'timeout', latency_ms=latency_ms,
+                        case_key=f"{case_type.rstrip('.')}.{number}.2024" if data else None)
+
+
+def comparable(stats):
+    return dict(stats, top_case_types=[tuple(row) for row in stats['top_case_types']])
+
+
+def test_trigger_rollups_match_a_rebuild(db):
+    log_lookups(db)
+    maintained = comparable(db.get_stats())
+    db.rebuild_stats()
+    assert comparable(db.get_stats()) == maintained
+
+    assert {name: maintained[name] for name in ('total_queries', 'successful_queries', 'failed_queries', 'cached_queries')} == {
+        'total_queries': 6, 'successful_queries': 4, 'failed_queries': 1, 'cached_queries': 1,
+    }
+    assert maintained['top_case_types'] == [('W.P.(C)', 3), ('CRL.A.', 2), ('FAO', 1)]
+    [hour] = maintained['hourly']
+    assert (hour['responses'], hour['successes'], hour['failures'], hour['cached']) == (6, 4, 1, 1)
+    # Latencies land in the 10, 25, 50, 500 and 5000 ms buckets
+    assert (hour['p50_ms'], hour['p95_ms'], hour['p99_ms']) == (50, 5000, 5000)
+
+
+@pytest.mark.parametrize('histogram,q,expected', [
+    ({10: 1, 100: 8, 1000: 1}, 0.5, 100),
+    ({10: 1, 100: 8, 1000: 1}, 0.9, 100),
+    ({10: 1, 100: 8, 1000: 1}, 0.95, 1000),
+    ({10: 1, 100: 8, 1000: 1}, 0.05, 10),
+    ({10: 1, -1: 9}, 0.5, None),  # above the largest bound
+    ({}, 0.5, None),
+])
+def test_histogram_percentile(histogram, q, expected):
+    assert histogram_percentile(histogram, q) == expected
+
+
+def test_hourly_buckets_honour_hours(db):
+    log_lookups(db)
+    with db.get_connection() as conn:
+        conn.execute("UPDATE responses SET timestamp = datetime('now', '-5 hours') WHERE latency_ms >= 300")
+        conn.commit()
+    db.rebuild_stats()
+
+    [recent] = db.get_stats(hours=1)['hourly']
+    assert recent['responses'] == 4
+    assert recent['p95_ms'] == 50
+    older, recent = db.get_stats(hours=24)['hourly']
+    assert (older['responses'], older['failures'], older['p50_ms'], older['p99_ms']) == (2, 1, 500, 5000)
+    assert db.get_stats(hours=24)['total_queries'] == 6
@@ -0,0 +1,144 @@
+import json
+
+import pytest
+
+import watchlist
+from watchlist import WatchlistScheduler, check_interval, RETRY_BASE_SECONDS
+
+START = 1_700_000_000.0
+CASE = {
+    'case_title': 'A vs. B', 'case_number': '1234/2024', 'case_type': 'W.P.(C)', 'filing_year': '2024',
+    'case_status': 'Pending', 'next_hearing_date': '10/10/2030',
+}
+
+
+class FakeClock:
+    def __init__(self, now=START):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeSite:
+    def __init__(self, result=(True, CASE, '')):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self, case_type, case_number, filing_year):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def site():
+    return FakeSite()
+
+
+@pytest.fixture
+def changes():
+    return []
+
+
+@pytest.fixture
+def scheduler(db, site, clock, changes):
+    scheduler = WatchlistScheduler(
+        db, site, on_change=lambda row, data: changes.append((row['case_key'], data)),
+        scrapes_per_minute=0, clock=clock, sleep=clock.sleep
+    )
+    scheduler.add('W.P.(C)', '1234', '2024')
+    return scheduler
+
+
+def claim(db, clock):
+    rows = db.claim_due_watches(clock(), 10, watchlist.CLAIM_LEASE_SECONDS)
+    assert len(rows) == 1
+    return rows[0]
+
+
+def events(db):
+    return [(row['event_type'], json.loads(row['changes'])) for row in db.get_case_events()]
+
+
+def test_first_check_records_a_baseline_only(db, scheduler, clock):
+    assert scheduler.check(claim(db, clock)) == 'baseline'
+    assert events(db) == []
+    [watch] = db.get_watchlist()
+    assert watch['content_hash'] is not None
+    assert watch['next_check_at'] > clock()
+
+
+def test_unchanged_case_is_only_rescheduled(db, scheduler, clock, changes):
+    scheduler.check(claim(db, clock))
+    before = db.get_watchlist()[0]
+    changes.clear()
+    clock.now = before['next_check_at']
+
+    assert scheduler.check(claim(db, clock)) == 'unchanged'
+    after = db.get_watchlist()[0]
+    assert after['content_hash'] == before['content_hash']
+    assert after['last_checked_at'] == clock()
+    assert events(db) == []
+    assert changes == []
+
+
+def test_changed_field_writes_one_event_with_the_diff(db, scheduler, site, clock, changes):
+    scheduler.check(claim(db, clock))
+    changes.clear()
+    clock.now = db.get_watchlist()[0]['next_check_at']
+    site.result = (True, dict(CASE, case_status='Disposed'), '')
+
+    assert scheduler.check(claim(db, clock)) == 'changed'
+    assert events(db) == [('changed', {'case_status': ['Pending', 'Disposed']})]
+    assert [key for key, _ in changes] == ['W.P.(C).1234.2024']
+    assert scheduler.stats()['changed'] == 1
+
+
+def test_not_found_records_an_event(db, scheduler, site, clock, changes):
+    site.result = (False, {}, 'Case not found on the court website.')
+    assert scheduler.check(claim(db, clock)) == 'not_found'
+    assert [event_type for event_type, _ in events(db)] == ['not_found']
+    assert changes == []
+
+
+def test_failures_back_off_exponentially(db, scheduler, site, clock):
+    site.result = RuntimeError('connection reset')
+    delays = []
+    for failures in range(1, 4):
+        assert scheduler.check(claim(db, clock)) == 'failed'
+        watch = db.get_watchlist()[0]
+        assert watch['consecutive_failures'] == failures
+        delays.append(watch['next_check_at'] - clock())
+        clock.now = watch['next_check_at']
+    assert delays == [check_interval(None, START, n) for n in (1, 2, 3)]
+    assert delays == [RETRY_BASE_SECONDS, 2 * RETRY_BASE_SECONDS, 4 * RETRY_BASE_SECONDS]
+    assert events(db) == []
+
+
+def test_claimed_case_is_hidden_from_a_second_claim(db, scheduler, clock):
+    claim(db, clock)
+    assert db.claim_due_watches(clock(), 10, watchlist.CLAIM_LEASE_SECONDS) == []
+    clock.now += watchlist.CLAIM_LEASE_SECONDS
+    assert len(db.claim_due_watches(clock(), 10, watchlist.CLAIM_LEASE_SECONDS)) == 1
+
+
+def test_throttle_keeps_to_scrapes_per_minute(db, site, clock):
+    scheduler = WatchlistScheduler(db, site, scrapes_per_minute=6, clock=clock, sleep=clock.sleep)
+    for number in range(3):
+        scheduler.add('W.P.(C)', str(number), '2024')
+
+    assert scheduler.run_once() == 3
+    assert site.calls == 3
+    assert clock.sleeps == [10.0, 10.0]
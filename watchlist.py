@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+from cache import is_not_found
+from case_parser import CASE_FIELDS, parse_court_date
+from scraper import make_case_key
+
+logger = logging.getLogger(__name__)
+
+WATCHLIST_SCRAPES_PER_MINUTE = float(os.environ.get("WATCHLIST_SCRAPES_PER_MINUTE", "6"))
+WATCHLIST_BATCH_SIZE = 10
+# How long a claimed case is hidden from other schedulers while it is checked
+CLAIM_LEASE_SECONDS = 15 * 60
+
+HOUR = 3600
+DAY = 24 * HOUR
+RETRY_BASE_SECONDS = 10 * 60
+FINAL_STATUSES = ('disposed', 'dismissed', 'withdrawn', 'allowed', 'closed')
+NOT_FOUND_HASH = 'not-found'
+
+# Fields compared between refreshes; the identifying ones never change
+TRACKED_FIELDS = tuple(f for f in CASE_FIELDS if f not in ('case_number', 'case_type', 'filing_year'))
+
+
+def snapshot_of(case_data):
+    """The tracked fields of a lookup result, normalized for comparison."""
+    snapshot = {}
+    for field in TRACKED_FIELDS:
+        value = case_data.get(field)
+        if field == 'pdf_links':
+            snapshot[field] = list(value or ([case_data['pdf_link']] if case_data.get('pdf_link') else []))
+        else:
+            snapshot[field] = ' '.join(str(value or '').split())
+    return snapshot
+
+
+def snapshot_hash(snapshot):
+    return hashlib.sha256(json.dumps(snapshot, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def diff_snapshots(old, new):
+    """Fields that differ, as {field: [old, new]}."""
+    return {
+        field: [old.get(field), new.get(field)]
+        for field in sorted(set(old) | set(new))
+        if old.get(field) != new.get(field)
+    }
+
+
+def check_interval(snapshot, now, failures=0):
+    """
+    Seconds until a tracked case should be checked again. Cases with a
+    hearing coming up (or just held) are checked most often; closed cases
+    and cases without a hearing date rarely. Failures back off exponentially.
+    """
+    if failures:
+        return min(RETRY_BASE_SECONDS * 2 ** (failures - 1), DAY)
+    if snapshot is None:
+        return DAY
+    if snapshot.get('case_status', '').lower() in FINAL_STATUSES:
+        return 7 * DAY
+    hearing = parse_court_date(snapshot.get('next_hearing_date'))
+    if hearing is None:
+        return 3 * DAY
+    days = (hearing.timestamp() - now) / DAY
+    if days < -3:
+        return DAY  # hearing long past and still no new date
+    if days < 0:
+        return 2 * HOUR  # hearing just held: the order and next date are due
+    if days <= 1:
+        return HOUR
+    if days <= 7:
+        return 6 * HOUR
+    if days <= 30:
+        return DAY
+    return 3 * DAY
+
+
+def _hearing_timestamp(snapshot):
+    hearing = parse_court_date((snapshot or {}).get('next_hearing_date'))
+    return hearing.timestamp() if hearing else None
+
+
+class WatchlistScheduler:
+    """
+    Refreshes tracked cases in the background.
+
+    Due cases are claimed from the watchlist table (soonest hearing first),
+    scraped at no more than `scrapes_per_minute`, and compared with the last
+    snapshot by content hash. An unchanged case only has its next check time
+    updated; a changed one gets its new snapshot stored, a case_events row
+    with the field-level diff, and is handed to `on_change` (which refreshes
+    case_data and the cache), so writes grow with the number of changes
+    rather than the size of the watchlist.
+    """
+    def __init__(self, db_manager, fetch, on_change=None, scrapes_per_minute=WATCHLIST_SCRAPES_PER_MINUTE,
+                 batch_size=WATCHLIST_BATCH_SIZE, clock=time.time, sleep=time.sleep):
+        self.db_manager = db_manager
+        self.fetch = fetch  # (case_type, case_number, filing_year) -> (success, data, error)
+        self.on_change = on_change  # (watch_row, case_data) -> None
+        self.min_interval = 60.0 / scrapes_per_minute if scrapes_per_minute > 0 else 0.0
+        self.batch_size = batch_size
+        self.clock = clock
+        self.sleep = sleep
+        self._next_scrape_at = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {'checked': 0, 'unchanged': 0, 'changed': 0, 'not_found': 0, 'failed': 0}
+
+    def add(self, case_type, case_number, filing_year):
+        """Track a case; it is checked on the next run. Returns (watch_id, created)."""
+        case_key = make_case_key(case_type, case_number, filing_year)
+        return self.db_manager.add_watch(
+            case_key, case_type.strip().rstrip('.'), case_number.strip(), filing_year.strip(), self.clock()
+        )
+
+    def remove(self, case_key):
+        return self.db_manager.remove_watch(case_key)
+
+    def _throttle(self):
+        now = self.clock()
+        if now < self._next_scrape_at:
+            self.sleep(self._next_scrape_at - now)
+            now = self._next_scrape_at
+        self._next_scrape_at = now + self.min_interval
+
+    def run_once(self):
+        """Check every case due now, in batches. Returns the number checked."""
+        checked = 0
+        while not self._stop.is_set():
+            rows = self.db_manager.claim_due_watches(self.clock(), self.batch_size, CLAIM_LEASE_SECONDS)
+            if not rows:
+                break
+            for row in rows:
+                if self._stop.is_set():
+                    break
+                self._throttle()
+                self.check(row)
+                checked += 1
+        return checked
+
+    def check(self, row):
+        """Scrape one tracked case and record what changed."""
+        try:
+            success, data, error = self.fetch(row['case_type'], row['case_number'], row['filing_year'])
+        except Exception as e:
+            success, data, error = False, {}, str(e)
+        now = self.clock()
+        self._stats['checked'] += 1
+        previous = json.loads(row['snapshot']) if row['snapshot'] else None
+
+        if not success and not is_not_found(error):
+            failures = row['consecutive_failures'] + 1
+            logger.warning(f"Watchlist check failed for {row['case_key']} ({failures} in a row): {error}")
+            self._stats['failed'] += 1
+            self.db_manager.reschedule_watch(row['id'], now, now + check_interval(previous, now, failures), failed=True)
+            return 'failed'
+
+        if success:
+            snapshot = snapshot_of(data)
+            content_hash = snapshot_hash(snapshot)
+        else:
+            snapshot, content_hash = {}, NOT_FOUND_HASH
+        hearing_at = _hearing_timestamp(snapshot)
+        next_check_at = now + check_interval(snapshot if success else None, now)
+
+        if content_hash == row['content_hash']:
+            self._stats['unchanged'] += 1
+            self.db_manager.reschedule_watch(row['id'], now, next_check_at, hearing_at)
+            return 'unchanged'
+
+        # The first successful check only records a baseline
+        if previous is None and success:
+            event_type = None
+        else:
+            event_type = 'changed' if success else 'not_found'
+        changes = diff_snapshots(previous or {}, snapshot) if event_type else None
+        self.db_manager.record_watch_change(
+            row['id'], row['case_key'], snapshot, content_hash, now, next_check_at,
+            hearing_at, event_type=event_type, changes=changes
+        )
+        if success and self.on_change is not None:
+            self.on_change(row, data)
+
+        if not success:
+            self._stats['not_found'] += 1
+            return 'not_found'
+        if event_type:
+            self._stats['changed'] += 1
+            logger.info(f"Watchlist: {row['case_key']} changed: {', '.join(changes)}")
+        return event_type or 'baseline'
+
+    def _loop(self, poll_interval):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Watchlist run failed: {e}")
+            self._stop.wait(poll_interval)
+
+    def start(self, poll_interval=60):
+        """Run the scheduler on a daemon thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, args=(poll_interval,), name='watchlist', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self):
+        return dict(self._stats)